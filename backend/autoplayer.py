@@ -0,0 +1,401 @@
+"""
+Expectimax autoplayer: picks the next `draw_cards` / `play_hand` move for a
+`GameSession`.  Backs the hint endpoint and the balance-testing bot
+(`python -m benchmarks.autoplay`).
+
+A position is (hand, remaining deck multiset, hands left, draws left, score
+deficit).  Max nodes are the player's choices – the best few plays and a few
+discard patterns (keep the best play, a flush draw, a straight draw) – and
+chance nodes average over draws from the *known contents* of the deck, never
+its order: all outcomes when there are few, a fixed-seed sample otherwise.
+A position's value is the expected score still to be made this round,
+capped at the deficit, so clearing the target is all that counts.  Below the
+depth limit the value is estimated as the hand's best five-card play times
+the hands left.
+
+Search runs with iterative deepening under a node and a time budget; the
+deepest fully searched depth answers, down to the greedy best play.
+
+Speed comes from two tables per scoring context (turbo chips + boss):
+
+* scores    – a play's score keyed by its cards' (rank, effects) tokens,
+              plus suits where the context can see them, plus a flush flag.
+              A few thousand keys cover all plain-card plays, so the table
+              warms up quickly; misses are scored by the session's own
+              `_score_cards`, so the search never disagrees with play_hand.
+              Random card effects count at their average (`expected_score`),
+              not at one roll frozen into the table.
+* positions – the transposition table: canonical position → (depth, value),
+              shared across decisions (the next real position was often a
+              sampled child of the previous search).
+
+Both are bounded and simply cleared when full.
+"""
+from __future__ import annotations
+
+import random
+import time
+from heapq import nlargest
+from itertools import combinations
+from math import comb, lcm
+from operator import itemgetter
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+from .card_effects import MASK_RANDOM, effect_mask
+from .models import Card, Rank, Suit, card_from_id, card_id, card_pool_size
+from .turbo_chips import TURBO_TAKES_PLAYED_CARDS
+
+DEFAULT_DEPTH = 2
+MAX_DEPTH = 4
+DEFAULT_MAX_NODES = 400
+MAX_NODES = 50_000
+DEFAULT_TIME_BUDGET = 0.05   # seconds
+MAX_TIME_BUDGET = 1.0
+CHANCE_SAMPLES = 4           # draws averaged per chance node (all of them when there are fewer)
+ROOT_PLAY_CANDIDATES = 6     # plays searched at the root ...
+PLAY_CANDIDATES = 2          # ... and below it
+DRAW_CANDIDATES = 3          # discard patterns searched per node
+SCORE_TABLE_SIZE = 1 << 16
+POSITION_TABLE_SIZE = 1 << 14
+MAX_CONTEXTS = 32
+MAX_PLAY_SIZE = 5
+
+_RANK_VALUES = {rank: value for value, rank in enumerate(Rank, start=2)}  # 2 … 14 (ace high)
+_SUIT_INDEX = {suit: index for index, suit in enumerate(Suit)}
+
+
+class _OutOfBudget(Exception):
+    pass
+
+
+# ------------------------------------------------------------------ #
+#  Per-card lookups (indexed by pool id, grown with the pool)        #
+# ------------------------------------------------------------------ #
+_RANKS: List[int] = []
+_SUITS: List[int] = []
+_TOKENS: Dict[bool, List[int]] = {False: [], True: []}  # suit-sensitive? → token per pool id
+
+
+def _sync_card_tables():
+    """Extend the per-card tables to every pooled card"""
+    for pool_id in range(len(_RANKS), card_pool_size()):
+        card = card_from_id(pool_id)
+        rank, suit = _RANK_VALUES[card.rank], _SUIT_INDEX[card.suit]
+        effects = effect_mask(card.effects)  # cards with equal masks score alike
+        _RANKS.append(rank)
+        _SUITS.append(suit)
+        _TOKENS[False].append(effects << 4 | rank)
+        _TOKENS[True].append((effects << 2 | suit) << 4 | rank)
+
+
+# Every 1-5 card subset of a hand of n cards, by size, as positions plus a
+# getter returning the subset of any n-tuple (single cards via a slice, so the
+# key is always a tuple), and where the largest and the five-card subsets start
+_Subsets = Tuple[List[Tuple[int, ...]], List[Callable[[tuple], tuple]], int, int]
+_SUBSETS: Dict[int, _Subsets] = {}
+
+
+def _subsets(n: int) -> _Subsets:
+    entry = _SUBSETS.get(n)
+    if entry is None:
+        largest = min(MAX_PLAY_SIZE, n)
+        positions = [idx for k in range(1, largest + 1) for idx in combinations(range(n), k)]
+        getters = [itemgetter(slice(idx[0], idx[0] + 1)) if len(idx) == 1 else itemgetter(*idx) for idx in positions]
+        largest_start = len(positions) - comb(n, largest)
+        entry = _SUBSETS[n] = (positions, getters, largest_start,
+                               largest_start if largest == MAX_PLAY_SIZE else len(positions))
+    return entry
+
+
+# ------------------------------------------------------------------ #
+#  Shared tables, per scoring context                                #
+# ------------------------------------------------------------------ #
+_TABLES: Dict[Hashable, Tuple[Dict[Any, int], Dict[Any, Tuple[int, float]]]] = {}
+
+
+def _tables_for(context: Hashable) -> Tuple[Dict[Any, int], Dict[Any, Tuple[int, float]]]:
+    tables = _TABLES.get(context)
+    if tables is None:
+        if len(_TABLES) >= MAX_CONTEXTS:
+            _TABLES.clear()
+        tables = _TABLES[context] = ({}, {})
+    return tables
+
+
+def clear_tables():
+    _TABLES.clear()
+
+
+class AutoPlayer:
+    """
+    One search configuration over one scoring context.  `score_fn` scores a
+    list of cards exactly as the game would; `suit_sensitive` says whether
+    that score can depend on suits beyond a flush (turbo chips looking at the
+    played cards, suit-blocking bosses).
+    """
+
+    def __init__(self, context: Hashable, score_fn: Callable[[List[Card]], int], suit_sensitive: bool = True,
+                 depth: int = DEFAULT_DEPTH, max_nodes: int = DEFAULT_MAX_NODES,
+                 time_budget: float = DEFAULT_TIME_BUDGET, samples: int = CHANCE_SAMPLES, seed: int = 0):
+        self.score_fn = score_fn
+        self.depth = depth
+        self.max_nodes = max_nodes
+        self.time_budget = time_budget
+        self.samples = samples
+        self.seed = seed
+        self._scores, self._positions = _tables_for(context)
+        self._tokens = _TOKENS[suit_sensitive]
+        self._rng = random.Random(seed)
+        self._nodes = 0
+        self._deadline = 0.0
+
+    # ---------------------------  public  --------------------------- #
+    def decide(self, hand_ids: Sequence[int], deck_ids: Sequence[int], hands_left: int, draws_left: int,
+               deficit: float) -> Dict[str, Any]:
+        """
+        Best move for the position: ``{"action": "play" | "draw", "cards":
+        [positions in hand_ids], "expected_score", "depth", "nodes",
+        "elapsed_ms"}``.
+        """
+        if not hand_ids:
+            raise ValueError("No cards in hand")
+        started = time.perf_counter()
+        _sync_card_tables()
+        self._rng.seed(self.seed)
+        self._nodes = 0
+        self._deadline = started + self.time_budget
+
+        tokens = self._tokens
+        order = sorted(range(len(hand_ids)), key=lambda i: (tokens[hand_ids[i]], hand_ids[i]))
+        hand = tuple(hand_ids[i] for i in order)
+        deck = tuple(sorted(deck_ids))
+        hands_left = max(1, hands_left)
+
+        scores = self._subset_scores(hand)
+        positions = _subsets(len(hand))[0]
+        best_play = max(range(len(scores)), key=scores.__getitem__)
+        value, action, chosen = min(deficit, scores[best_play]), "play", positions[best_play]
+        completed = 0
+        for depth in range(1, self.depth + 1):
+            try:
+                value, action, chosen = self._best_move(hand, deck, hands_left, draws_left, deficit, depth,
+                                                        scores, ROOT_PLAY_CANDIDATES)
+            except _OutOfBudget:
+                break
+            completed = depth
+            if value >= deficit:  # the target is reached for sure – searching deeper can't improve on it
+                break
+
+        return {
+            "action": action,
+            "cards": sorted(order[p] for p in chosen),
+            "expected_score": round(float(value), 1),
+            "depth": completed,
+            "nodes": self._nodes,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    # ---------------------------  search  --------------------------- #
+    def _charge(self):
+        self._nodes += 1
+        if self._nodes > self.max_nodes or time.perf_counter() > self._deadline:
+            raise _OutOfBudget
+
+    def _canonical(self, cards: Sequence[int]) -> Tuple[int, ...]:
+        tokens = self._tokens
+        return tuple(sorted(cards, key=lambda c: (tokens[c], c)))
+
+    def _subset_scores(self, hand: Tuple[int, ...], largest_only: bool = False) -> List[int]:
+        """
+        Score of every 1-5 card play from `hand`, in `_subsets(len(hand))`
+        order – or only of the largest ones, which is what a leaf estimate
+        needs (extra cards add their chips, so they rarely lower a score)
+        """
+        positions, getters, largest, five = _subsets(len(hand))
+        start = largest if largest_only else 0
+        tokens = tuple(map(self._tokens.__getitem__, hand))
+        keys = [get(tokens) for get in getters[start:]]
+        suits = tuple(map(_SUITS.__getitem__, hand))
+        if five < len(positions) and max(map(suits.count, range(4))) >= MAX_PLAY_SIZE:
+            # A flush is possible: five-card keys of one suit get a flag
+            for i in range(max(five, start), len(positions)):
+                if len(set(getters[i](suits))) == 1:
+                    keys[i - start] = (keys[i - start], True)
+
+        table = self._scores
+        scores = list(map(table.get, keys))
+        if None in scores:
+            for i, score in enumerate(scores):
+                if score is None:
+                    if len(table) >= SCORE_TABLE_SIZE:
+                        table.clear()
+                    cards = [card_from_id(hand[p]) for p in positions[start + i]]
+                    scores[i] = table[keys[i]] = self.score_fn(cards)
+        return scores
+
+    def _value(self, hand: Tuple[int, ...], deck: Tuple[int, ...], hands_left: int, draws_left: int,
+               deficit: float, depth: int) -> float:
+        key = (hand, deck, hands_left, draws_left, deficit)
+        known = self._positions.get(key)
+        if known is not None and known[0] >= depth:
+            return known[1]
+        self._charge()
+        if not hand:
+            value = 0.0
+        else:
+            if depth == 0:
+                value = min(deficit, max(self._subset_scores(hand, largest_only=True)) * hands_left)
+            else:
+                value = self._best_move(hand, deck, hands_left, draws_left, deficit, depth,
+                                        self._subset_scores(hand), PLAY_CANDIDATES)[0]
+        if len(self._positions) >= POSITION_TABLE_SIZE:
+            self._positions.clear()
+        self._positions[key] = (depth, value)
+        return value
+
+    def _best_move(self, hand, deck, hands_left, draws_left, deficit, depth, scores, play_candidates):
+        """(value, action, hand positions) of the best candidate move"""
+        positions = _subsets(len(hand))[0]
+        ranked = nlargest(play_candidates, range(len(scores)), key=scores.__getitem__)
+        if scores[ranked[0]] >= deficit:
+            return deficit, "play", positions[ranked[0]]
+
+        best = (-1.0, "play", positions[ranked[0]])
+        for i in ranked:
+            score, idx = scores[i], positions[i]
+            if hands_left == 1:
+                value = score
+            else:
+                kept = tuple(card for p, card in enumerate(hand) if p not in idx)
+                value = score + self._expect(kept, deck, len(idx), hands_left - 1, draws_left,
+                                             deficit - score, depth - 1)
+            if value > best[0]:
+                best = (value, "play", idx)
+
+        if draws_left > 0 and deck:
+            for keep in self._keep_patterns(hand, ranked, positions):
+                value = self._expect(tuple(hand[p] for p in keep), deck, len(hand) - len(keep),
+                                     hands_left, draws_left - 1, deficit, depth - 1)
+                if value > best[0]:
+                    best = (value, "draw", tuple(p for p in range(len(hand)) if p not in keep))
+        return best
+
+    def _expect(self, kept: Tuple[int, ...], deck: Tuple[int, ...], count: int, hands_left: int,
+                draws_left: int, deficit: float, depth: int) -> float:
+        """Average value over the hands made by drawing `count` cards from `deck` to `kept`"""
+        n = len(deck)
+        count = min(count, n)
+        if count == 0:
+            return self._value(self._canonical(kept), deck, hands_left, draws_left, deficit, depth)
+        if comb(n, count) <= self.samples:
+            draws = list(combinations(range(n), count))
+        else:
+            draws = [self._rng.sample(range(n), count) for _ in range(self.samples)]
+        total = 0.0
+        for picked in draws:
+            picked = set(picked)
+            hand = self._canonical(kept + tuple(deck[i] for i in picked))
+            rest = tuple(card for i, card in enumerate(deck) if i not in picked)
+            total += self._value(hand, rest, hands_left, draws_left, deficit, depth)
+        return total / len(draws)
+
+    def _keep_patterns(self, hand, ranked, positions) -> List[Tuple[int, ...]]:
+        """Hand positions worth keeping on a draw: flush / straight draws, then the best plays"""
+        patterns = []
+        by_suit: Dict[int, List[int]] = {}
+        for p, card in enumerate(hand):
+            by_suit.setdefault(_SUITS[card], []).append(p)
+        flush_draw = max(by_suit.values(), key=len)
+        if 3 <= len(flush_draw) < MAX_PLAY_SIZE:  # five or more is a flush already, among the plays
+            patterns.append(tuple(flush_draw))
+
+        by_rank: Dict[int, int] = {}
+        for p, card in enumerate(hand):
+            rank = _RANKS[card]
+            by_rank.setdefault(rank, p)
+            if rank == 14:
+                by_rank.setdefault(1, p)  # the ace also starts A-2-3-4-5
+        window = max(range(1, 11), key=lambda low: sum(r in by_rank for r in range(low, low + 5)))
+        straight_draw = tuple(sorted({by_rank[r] for r in range(window, window + 5) if r in by_rank}))
+        if 3 <= len(straight_draw) < MAX_PLAY_SIZE:
+            patterns.append(straight_draw)
+
+        for i in ranked:
+            patterns.append(positions[i])
+
+        unique = []
+        for keep in patterns:
+            if keep not in unique and len(keep) < len(hand):
+                unique.append(keep)
+        return unique[:DRAW_CANDIDATES]
+
+
+# ------------------------------------------------------------------ #
+#  Sessions                                                          #
+# ------------------------------------------------------------------ #
+def _check_budget(depth: int, max_nodes: int, time_budget: float):
+    if not 0 <= depth <= MAX_DEPTH:
+        raise ValueError(f"Search depth must be 0-{MAX_DEPTH}")
+    if not 1 <= max_nodes <= MAX_NODES:
+        raise ValueError(f"Node budget must be 1-{MAX_NODES}")
+    if not 0 < time_budget <= MAX_TIME_BUDGET:
+        raise ValueError(f"Time budget must be at most {MAX_TIME_BUDGET}s")
+
+
+class _Rotation:
+    """An evaluator `rng` that gives every random effect its `turn`-th outcome"""
+    __slots__ = ("turn",)
+
+    def __init__(self, turn: int):
+        self.turn = turn
+
+    def choice(self, outcomes):
+        return outcomes[self.turn % len(outcomes)]
+
+
+def expected_score(score_cards: Callable[..., Any], cards: List[Card]) -> float:
+    """
+    The score of `cards` (`score_cards(cards, rng)`, e.g. a session's
+    `_score_cards`) with each random effect averaged over its outcomes: every
+    outcome is scored in turn, all such cards rolling alike – exact with one
+    random card, the usual case.  No random generator is drawn from.
+    """
+    turns = 1
+    for card in cards:
+        for outcomes in MASK_RANDOM[effect_mask(card.effects)]:
+            turns = lcm(turns, len(outcomes))
+    return sum(score_cards(cards, _Rotation(turn)).total_score for turn in range(turns)) / turns
+
+
+def player_for_session(session, **options) -> AutoPlayer:
+    """An AutoPlayer scoring exactly like `session` (its turbo chips and boss)"""
+    boss = session.active_boss.type if session.is_boss_round and session.active_boss else None
+    chips = tuple(session.inventory_ids)
+    # Bosses blocking suits make scoring look at suits (the rest are suit-blind, like the base game)
+    blocked_suits = session.boss_modifier.blocked_suits
+    suit_sensitive = bool(blocked_suits) or any(TURBO_TAKES_PLAYED_CARDS[chip] for chip in chips)
+    return AutoPlayer((chips, boss, blocked_suits), lambda cards: expected_score(session._score_cards, cards),
+                      suit_sensitive, **options)
+
+
+def suggest_move(session, depth: int = DEFAULT_DEPTH, max_nodes: int = DEFAULT_MAX_NODES,
+                 time_budget: float = DEFAULT_TIME_BUDGET) -> Dict[str, Any]:
+    """The autoplayer's next move for `session`; `cards` are indices into its hand"""
+    if session.is_game_over:
+        raise ValueError("Game is over")
+    if session.in_shop:
+        raise ValueError("Currently in shop phase")
+    _check_budget(depth, max_nodes, time_budget)
+    return search_session(session, depth, max_nodes, time_budget)
+
+
+def search_session(session, depth: int, max_nodes: int, time_budget: float) -> Dict[str, Any]:
+    """`suggest_move` without its checks and caps (background jobs set their own budgets)"""
+    player = player_for_session(session, depth=depth, max_nodes=max_nodes, time_budget=time_budget)
+    return player.decide(
+        [card_id(card) for card in session.hand],
+        [card_id(card) for card in session.deck.cards],
+        hands_left=session.max_hands - session.hands_played,
+        draws_left=session.max_draws - session.draws_used,
+        deficit=session.ROUND_TARGETS.get(session.current_round, float("inf")) - session.total_score,
+    )
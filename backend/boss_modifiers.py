@@ -0,0 +1,58 @@
+"""
+What each boss does to a round, as data.
+
+Every `BossType` compiles to one `BossModifier`: a mask of suits whose cards
+don't score, a factor on each hand's final score, a hand-size penalty, and
+the action hooks (cards stolen on every draw, a fee before the round's first
+play).  The session, the evaluator, the autoplayer and the simulator all read
+the same modifier; a round without a boss gets `NO_BOSS`, whose values change
+nothing, so no code path needs to ask which boss is active.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+from .models import Boss, BossType, Suit
+
+# One bit per suit, for `BossModifier.blocked_suits`
+SUIT_BITS: Dict[Suit, int] = {suit: 1 << index for index, suit in enumerate(Suit)}
+
+MIN_HAND_SIZE = 3  # a hand-size penalty never deals fewer cards than this
+
+@dataclass(frozen=True)
+class BossModifier:
+    blocked_suits: int = 0       # SUIT_BITS of the suits whose cards don't score
+    score_factor: float = 1.0    # each hand's final score is multiplied by this (and truncated)
+    score_text: str = ""         # applied-bonus line for `score_factor`
+    hand_size_penalty: int = 0   # cards dealt fewer per hand
+    draw_steals: int = 0         # cards taken off the deck on every draw
+    play_fee: int = 0            # $ due before the round's first play
+
+
+NO_BOSS = BossModifier()
+
+BOSS_MODIFIERS: Dict[BossType, BossModifier] = {
+    BossType.THIEF: BossModifier(draw_steals=1),
+    BossType.VAMPIRE: BossModifier(blocked_suits=SUIT_BITS[Suit.HEARTS]),
+    BossType.VIP_ONLY: BossModifier(blocked_suits=SUIT_BITS[Suit.CLUBS]),
+    BossType.FROZEN_GROUND: BossModifier(blocked_suits=SUIT_BITS[Suit.SPADES]),
+    BossType.BLONDE_VIXEN: BossModifier(blocked_suits=SUIT_BITS[Suit.DIAMONDS]),
+    BossType.DRUNK: BossModifier(score_factor=0.75, score_text="The Drunk reduced scoring by 25%"),
+    BossType.BARON: BossModifier(play_fee=5),
+    BossType.DEATH: BossModifier(hand_size_penalty=2),
+}
+
+# Applied-bonus line per blocked-suit mask ("" for none)
+BLOCKED_SUITS_TEXT: List[str] = [
+    "Boss Effect: " + " and ".join(suit.value.capitalize() for suit in Suit if SUIT_BITS[suit] & mask)
+    + " cards don't score" if mask else ""
+    for mask in range(1 << len(SUIT_BITS))
+]
+
+
+def boss_modifier(boss: Optional[Union[Boss, BossType]]) -> BossModifier:
+    """The modifier of `boss` (a Boss or its type), or `NO_BOSS` for None"""
+    if boss is None:
+        return NO_BOSS
+    return BOSS_MODIFIERS[boss.type if isinstance(boss, Boss) else BossType(boss)]
@@ -0,0 +1,109 @@
+"""
+Compact string codes for cards on the wire: ``"AH"``, ``"10S"``, ``"KD+bonus_chips_50"``.
+
+    <rank><suit>[+<effect>...]
+
+The rank is 2-10, J, Q, K or A and the suit H, D, C or S; effects are
+registered effect names, in the card's own order.  On input `T` is accepted
+for 10, full suit names for the letter ("10hearts") and case is ignored in
+the rank / suit part.  The canonical form above is what the API emits.
+
+Both directions are table lookups built at import: a known code maps
+straight to its pooled Card (see `models.intern_card`), so decoding a hand
+costs a few dict lookups instead of a Pydantic validation per card.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Tuple
+
+from .card_effects import EFFECT_REGISTRY
+from .models import Card, Rank, Suit, card_id, intern_card
+
+EFFECT_SEPARATOR = "+"
+
+_SUIT_LETTERS: Dict[Suit, str] = {Suit.HEARTS: "H", Suit.DIAMONDS: "D", Suit.CLUBS: "C", Suit.SPADES: "S"}
+
+
+def _rank_tokens(rank: Rank) -> Tuple[str, ...]:
+    return (rank.value, "T") if rank is Rank.TEN else (rank.value,)
+
+
+# Upper-cased "<rank><suit>" spellings (every alias) → plain pooled card
+_HEADS: Dict[str, Card] = {
+    rank_token + suit_token: intern_card(suit, rank)
+    for suit, letter in _SUIT_LETTERS.items()
+    for rank in Rank
+    for rank_token in _rank_tokens(rank)
+    for suit_token in (letter, suit.value.upper())
+}
+
+# (suit, rank) → canonical head, for formatting; keyed by the enums and by
+# their plain string values, so already-decoded JSON formats as well
+_HEAD_CODES: Dict[Tuple[Any, Any], str] = {}
+for _suit, _letter in _SUIT_LETTERS.items():
+    for _rank in Rank:
+        _HEAD_CODES[_suit, _rank] = _HEAD_CODES[_suit.value, _rank.value] = _rank.value + _letter
+
+# Canonical code → pooled card; seeded with the 52 plain cards, plus every
+# card with effects parsed since (bounded: only validated codes are stored).
+_CARDS_BY_CODE: Dict[str, Card] = {code: _HEADS[code] for code in set(_HEAD_CODES.values())}
+# Pool id → canonical code
+_CODES_BY_POOL_ID: Dict[int, str] = {}
+
+_CARD_FIELDS = {"suit", "rank", "effects"}
+
+
+def format_card_code(suit: Suit, rank: Rank, effects: Tuple[str, ...] = ()) -> str:
+    head = _HEAD_CODES[suit, rank]
+    if not effects:
+        return head
+    return head + EFFECT_SEPARATOR + EFFECT_SEPARATOR.join(effects)
+
+
+def card_code(card: Card) -> str:
+    """Canonical code of `card`"""
+    pool_id = card_id(card)
+    code = _CODES_BY_POOL_ID.get(pool_id)
+    if code is None:
+        code = _CODES_BY_POOL_ID[pool_id] = format_card_code(card.suit, card.rank, card.effects)
+    return code
+
+
+def parse_card_code(code: Any) -> Card:
+    """The pooled Card for `code`; raises ValueError for anything malformed"""
+    card = _CARDS_BY_CODE.get(code) if isinstance(code, str) else None
+    if card is not None:
+        return card
+    if not isinstance(code, str):
+        raise ValueError(f"Card code must be a string, got {type(code).__name__}")
+    head, separator, tail = code.partition(EFFECT_SEPARATOR)
+    plain = _HEADS.get(head.upper())
+    if plain is None:
+        raise ValueError(f"Invalid card code: {code!r}")
+    if not separator:
+        return plain
+    effects = tail.split(EFFECT_SEPARATOR)
+    # Only registered, non-repeated effects: keeps the card pool (and this table) bounded
+    if len(set(effects)) != len(effects) or not all(e in EFFECT_REGISTRY for e in effects):
+        raise ValueError(f"Invalid card effects in {code!r}")
+    card = intern_card(plain.suit, plain.rank, effects)
+    _CARDS_BY_CODE[card_code(card)] = card
+    return card
+
+
+def compact_cards(obj: Any) -> Any:
+    """
+    Copy of a response payload with every serialised Card (a dict with
+    suit / rank / effects) replaced by its code.  A card dict with extra keys,
+    like a shop item, keeps them and gets the code under "code".
+    """
+    if isinstance(obj, dict):
+        if _CARD_FIELDS <= obj.keys():
+            code = format_card_code(obj["suit"], obj["rank"], tuple(obj["effects"]))
+            if len(obj) == len(_CARD_FIELDS):
+                return code
+            return {**{k: compact_cards(v) for k, v in obj.items() if k not in _CARD_FIELDS}, "code": code}
+        return {k: compact_cards(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [compact_cards(v) for v in obj]
+    return obj
@@ -1,32 +1,52 @@
 """
-Central registry and simple strategy objects for **special card effects**.
-
-The goal is to keep each effect self-contained so that new effects can be
-added by simply subclassing `CardEffect` **and** registering the instance
-in `EFFECT_REGISTRY` (or via a helper function later on).
+Central registry of **special card effects**, and their compiled lookup tables.
+
+Effects are plain data: a flat chip bonus, a multiplier bonus, money, or a
+random distribution over such outcomes (drawn uniformly when the card
+scores).  A new effect is one more `_register(CardEffect(...))` line below –
+nothing in the evaluator needs to know about it.
+
+At import the registry is *compiled*: every effect gets a bit, a card's
+effect set becomes an integer mask (`effect_mask`), and the per-mask totals
+(`MASK_CHIPS`, `MASK_MULTIPLIER`, `MASK_MONEY`) and random effects
+(`MASK_RANDOM`) are precomputed, so scoring resolves every bonus of a card
+with a handful of list lookups however many effects exist.
 """
 from __future__ import annotations
 
-from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
 
+class EffectOutcome(NamedTuple):
+    """One possible result of a random effect"""
+    chips: int = 0
+    multiplier: int = 0
+    money: int = 0
+    text: str = ""  # shown in the hand result, after the card's name
 
-class CardEffect(ABC):
+
+class CardEffect:
     """
-    Abstract base for all card effects.
+    Declarative definition of a card effect.
 
-    Effects are intentionally *stateless* – they expose how many bonus chips /
-    multipliers they contribute **per card** whenever that card is used for
-    scoring.  This keeps evaluation logic inside the evaluator simple.
+    Effects are *stateless*: the bonuses apply **per card** whenever that
+    card is used for scoring.  `outcomes`, if given, makes the effect random –
+    one outcome is drawn (uniformly, in the listed order) per scoring card.
     """
 
     # A unique, URL-safe identifier (also persisted in JSON).
     name: str
 
-    def __init__(self, name: str, bonus_chips: int = 0, bonus_multiplier: int = 0):
+    def __init__(self, name: str, bonus_chips: int = 0, bonus_multiplier: int = 0, money: int = 0,
+                 outcomes: Iterable[EffectOutcome] = (), title: str = "", description: str = ""):
         self.name = name
+        # Player-facing text, served through `/api/catalog`
+        self.title = title or name
+        self.description = description
         self._bonus_chips = bonus_chips
         self._bonus_multiplier = bonus_multiplier
+        self.money = money
+        self.outcomes: Tuple[EffectOutcome, ...] = tuple(outcomes)
 
     # ------------------------------------------------------------------ #
     #  Simple value-object interface
@@ -42,6 +62,10 @@ class CardEffect(ABC):
         """
         return self._bonus_multiplier
 
+    @property
+    def is_random(self) -> bool:
+        return bool(self.outcomes)
+
     # Comparison & repr helpers (useful for testing / debugging)
     # ------------------------------------------------------------------ #
     def __repr__(self) -> str:  # pragma: no cover
@@ -51,61 +75,88 @@ class CardEffect(ABC):
         return isinstance(other, CardEffect) and self.name == other.name
 
 
-# ---------------------------------------------------------------------- #
-#  Concrete effect implementations
-# ---------------------------------------------------------------------- #
-
-class BonusChipsEffect(CardEffect):
-    """Adds +50 chips to the card value when scored."""
-
-    def __init__(self):
-        super().__init__(name="bonus_chips_50", bonus_chips=50)
-
-
-class BonusMultiplierEffect(CardEffect):
-    """Adds +5 to the hand multiplier when scored."""
-
-    def __init__(self):
-        super().__init__(name="bonus_multiplier_5", bonus_multiplier=5)
-
-
-# ------------------------------------------------------------------ #
-#  NEW effects                                                       #
-# ------------------------------------------------------------------ #
-
-class BonusMoneyEffect(CardEffect):
-    """Grants +$2 when the card is scored (no chip / mult impact)."""
-
-    def __init__(self):
-        super().__init__(name="bonus_money_2")  # no chip / mult bonuses
-
-class RandomBonusEffect(CardEffect):
-    """
-    '?' mystery card – actual bonus is resolved *at scoring time*
-    so the static definition carries no fixed values.
-    """
-
-    def __init__(self):
-        super().__init__(name="bonus_random")
-
-
 # ---------------------------------------------------------------------- #
 #  Effect registry – lookup by string identifier (stored in JSON)
 # ---------------------------------------------------------------------- #
 
 EFFECT_REGISTRY: Dict[str, CardEffect] = {}
 
+# Every effect is a bit of a card's mask, and the tables below have an entry per mask
+MAX_EFFECTS = 12
+
 def _register(effect: CardEffect):
     if effect.name in EFFECT_REGISTRY:  # pragma: no cover
         raise ValueError(f"Duplicate card effect name registered: {effect.name}")
+    if len(EFFECT_REGISTRY) >= MAX_EFFECTS:  # pragma: no cover
+        raise ValueError(f"At most {MAX_EFFECTS} card effects can be registered")
     EFFECT_REGISTRY[effect.name] = effect
 
 
 # Register default effects
-_register(BonusChipsEffect())
-_register(BonusMultiplierEffect())
-_register(BonusMoneyEffect())     # NEW
-_register(RandomBonusEffect())    # NEW
+_register(CardEffect("bonus_chips_50", bonus_chips=50, title="Bonus Chips",
+                     description="Adds +50 Chips to this card when scored."))
+_register(CardEffect("bonus_multiplier_5", bonus_multiplier=5, title="Bonus Multiplier",
+                     description="Adds +5 to the hand multiplier when this card is part of a scored hand."))
+_register(CardEffect("bonus_money_2", money=2, title="Cash Bonus",
+                     description="Awards $2 immediately when this card scores."))
+# The outcome order is part of the game: saved transcripts replay it (backend.replay)
+_register(CardEffect("bonus_random", title="Mystery Bonus",
+                     outcomes=(EffectOutcome(money=1, text="Mystery → +$1"),
+                               EffectOutcome(multiplier=5, text="Mystery → +5× Mult"),
+                               EffectOutcome(chips=25, text="Mystery → +25 Chips")),
+                     description="When scored, randomly grants +$1, +5× multiplier or +25 chips."))
 
 # Convenience export – only the names are needed when serialising.
 AVAILABLE_EFFECT_NAMES = list(EFFECT_REGISTRY.keys())
+
+# Effects whose outcome is rolled at evaluation time
+RANDOM_EFFECT_NAMES = frozenset(name for name, effect in EFFECT_REGISTRY.items() if effect.is_random)
+
+# Client-facing metadata (see `backend.catalog`); cards only carry the ids.
+EFFECT_CATALOG = [
+    {
+        "effect_id": effect.name,
+        "name": effect.title,
+        "description": effect.description,
+        "bonus_chips": effect.bonus_chips(),
+        "bonus_multiplier": effect.bonus_multiplier(),
+    }
+    for effect in EFFECT_REGISTRY.values()
+]
+
+
+# ---------------------------------------------------------------------- #
+#  Compiled tables                                                        #
+# ---------------------------------------------------------------------- #
+EFFECT_BITS: Dict[str, int] = {name: 1 << bit for bit, name in enumerate(EFFECT_REGISTRY)}
+
+# Indexed by mask: totals over the effects in it, and its random effects' outcomes (in bit order)
+MASK_CHIPS: List[int] = [0]
+MASK_MULTIPLIER: List[int] = [0]
+MASK_MONEY: List[int] = [0]
+MASK_RANDOM: List[Tuple[Tuple[EffectOutcome, ...], ...]] = [()]
+
+# Masks are built up from the lowest bit: mask = rest | lowest, with rest < mask already done
+for _mask in range(1, 1 << len(EFFECT_REGISTRY)):
+    _rest = _mask & (_mask - 1)
+    _effect = EFFECT_REGISTRY[AVAILABLE_EFFECT_NAMES[(_mask ^ _rest).bit_length() - 1]]
+    MASK_CHIPS.append(MASK_CHIPS[_rest] + _effect.bonus_chips())
+    MASK_MULTIPLIER.append(MASK_MULTIPLIER[_rest] + _effect.bonus_multiplier())
+    MASK_MONEY.append(MASK_MONEY[_rest] + _effect.money)
+    MASK_RANDOM.append(((_effect.outcomes,) + MASK_RANDOM[_rest]) if _effect.is_random else MASK_RANDOM[_rest])
+del _mask, _rest, _effect
+
+# Effect tuple (as on a Card) → mask; every combination seen is kept (cards are interned, so few)
+_MASKS: Dict[Tuple[str, ...], int] = {(): 0}
+
+
+def effect_mask(effects: Tuple[str, ...]) -> int:
+    """The mask of a card's effects (unregistered names are ignored, repeats count once)"""
+    mask = _MASKS.get(effects)
+    if mask is None:
+        mask = 0
+        for name in effects:
+            mask |= EFFECT_BITS.get(name, 0)
+        if len(_MASKS) < 4096:  # client-supplied cards (legacy preview) are not interned
+            _MASKS[effects] = mask
+    return mask
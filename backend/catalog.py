@@ -0,0 +1,47 @@
+"""
+Static game metadata – card effects, turbo chips and bosses – in one payload.
+
+Game states, shop items and cards refer to these entries by id only (an
+effect name, a turbo chip `effect_id`, a boss `type`); clients fetch the
+catalog once and resolve names / descriptions locally.
+
+The catalog is serialized once at import.  `CATALOG_VERSION` is a hash of
+the sections, so it only changes when the metadata does: the index page
+links to `/api/catalog?v=<version>`, which browsers may cache for good,
+while plain `/api/catalog` revalidates through its ETag.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, List
+
+from .card_effects import EFFECT_CATALOG
+from .models import BOSS_REGISTRY
+from .turbo_chips import TURBO_CHIP_CATALOG
+
+VERSION_LENGTH = 10
+
+BOSS_CATALOG: List[Dict[str, Any]] = [boss.dict() for boss in BOSS_REGISTRY.values()]
+
+CATALOG_SECTIONS: Dict[str, List[Dict[str, Any]]] = {
+    "effects": EFFECT_CATALOG,
+    "turbo_chips": TURBO_CHIP_CATALOG,
+    "bosses": BOSS_CATALOG,
+}
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+CATALOG_VERSION = hashlib.sha256(
+    json.dumps(CATALOG_SECTIONS, sort_keys=True, separators=(",", ":")).encode("utf-8")
+).hexdigest()[:VERSION_LENGTH]
+
+CATALOG_JSON = _dumps({"success": True, "version": CATALOG_VERSION, **CATALOG_SECTIONS})
+
+
+def catalog_url() -> str:
+    """Versioned (long-cacheable) URL of the catalog"""
+    return f"/api/catalog?v={CATALOG_VERSION}"
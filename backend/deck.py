@@ -1,91 +1,149 @@
 import random
-from typing import List, Tuple
-from .models import Card, Suit, Rank
+from array import array
+from collections.abc import MutableSequence
+from typing import Iterable, Iterator, List, Optional, Tuple
+from .models import Card, STANDARD_DECK, card_from_id, card_id
+from .card_codes import parse_card_code
+
+
+class CardArray(MutableSequence):
+    """
+    List-like sequence of cards stored as 2-byte pool ids (see
+    `models.intern_card`) instead of 8-byte object pointers.  Reads return the
+    shared Card instances; anything stored is interned on the way in.
+    """
+    __slots__ = ("_ids",)
+
+    def __init__(self, cards: Iterable[Card] = ()):
+        self._ids = array("H", [card_id(c) for c in cards])
+
+    @classmethod
+    def standard(cls) -> "CardArray":
+        """The 52 plain cards in suit-major order, without per-card lookups"""
+        cards = cls.__new__(cls)
+        cards._ids = array("H", _STANDARD_DECK_IDS)
+        return cards
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [card_from_id(i) for i in self._ids[index]]
+        return card_from_id(self._ids[index])
+
+    def __setitem__(self, index, card):
+        if isinstance(index, slice):
+            self._ids[index] = array("H", [card_id(c) for c in card])
+        else:
+            self._ids[index] = card_id(card)
+
+    def __delitem__(self, index):
+        del self._ids[index]
+
+    def __iter__(self) -> Iterator[Card]:
+        return map(card_from_id, self._ids)
+
+    def __repr__(self) -> str:
+        return f"CardArray({[str(c) for c in self]})"
+
+    def insert(self, index: int, card: Card):
+        self._ids.insert(index, card_id(card))
+
+    # Fast paths for the operations the game uses (the mixins would go card by card)
+    def append(self, card: Card):
+        self._ids.append(card_id(card))
+
+    def extend(self, cards: Iterable[Card]):
+        if isinstance(cards, CardArray):
+            self._ids.extend(cards._ids)
+        else:
+            self._ids.extend(card_id(c) for c in cards)
+
+    def pop(self, index: int = -1) -> Card:
+        return card_from_id(self._ids.pop(index))
+
+    def remove(self, card: Card):
+        self._ids.remove(card_id(card))
+
+    def pop_many(self, count: int) -> List[Card]:
+        """Pop `count` cards off the end, in pop order"""
+        if count <= 0:
+            return []
+        taken = self._ids[-count:]
+        del self._ids[-count:]
+        taken.reverse()
+        return [card_from_id(i) for i in taken]
+
+    def shuffle(self, rng: Optional[random.Random] = None):
+        (rng or random).shuffle(self._ids)
+
+    def copy(self) -> "CardArray":
+        cards = CardArray.__new__(CardArray)
+        cards._ids = array("H", self._ids)
+        return cards
+
+
+_STANDARD_DECK_IDS = array("H", [card_id(c) for c in STANDARD_DECK])
+
 
 class Deck:
     """Manages a standard 52-card deck"""
+    __slots__ = ("_cards", "_discarded")
     
-    def __init__(self):
-        self.cards: List[Card] = []
-        self.discarded: List[Card] = []
-        self.reset()
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.reset(rng)
+
+    @property
+    def cards(self) -> CardArray:
+        return self._cards
+
+    @cards.setter
+    def cards(self, cards: Iterable[Card]):
+        self._cards = cards if isinstance(cards, CardArray) else CardArray(cards)
+
+    @property
+    def discarded(self) -> CardArray:
+        return self._discarded
     
-    def reset(self):
-        """Create a fresh shuffled deck"""
-        self.cards = []
-        self.discarded = []
+    def reset(self, rng: Optional[random.Random] = None):
+        """Create a fresh shuffled deck (shuffled with `rng`, default the module's generator)"""
+        self._discarded = CardArray()
         
-        # Create all 52 cards
-        for suit in Suit:
-            for rank in Rank:
-                self.cards.append(Card(suit=suit, rank=rank))
+        # All 52 cards – stored as pool ids of the shared, immutable instances
+        self._cards = CardArray.standard()
         
         # Shuffle the deck
-        random.shuffle(self.cards)
+        self.shuffle(rng)
+
+    def shuffle(self, rng: Optional[random.Random] = None):
+        self._cards.shuffle(rng)
+
+    def copy(self) -> "Deck":
+        deck = Deck.__new__(Deck)
+        deck._cards = self._cards.copy()
+        deck._discarded = self._discarded.copy()
+        return deck
     
     def draw(self, count: int = 1) -> List[Card]:
         """Draw cards from the deck"""
-        if count > len(self.cards):
-            raise ValueError(f"Cannot draw {count} cards, only {len(self.cards)} remaining")
+        if count > len(self._cards):
+            raise ValueError(f"Cannot draw {count} cards, only {len(self._cards)} remaining")
         
-        drawn_cards = []
-        for _ in range(count):
-            drawn_cards.append(self.cards.pop())
-        
-        return drawn_cards
+        return self._cards.pop_many(count)
     
     def discard(self, cards: List[Card]):
         """Add cards to discard pile"""
-        self.discarded.extend(cards)
+        self._discarded.extend(cards)
     
     def remaining_count(self) -> int:
         """Get number of cards remaining in deck"""
-        return len(self.cards)
+        return len(self._cards)
     
     def can_draw(self, count: int) -> bool:
         """Check if we can draw the requested number of cards"""
-        return len(self.cards) >= count
+        return len(self._cards) >= count
 
 def card_from_string(card_str: str) -> Card:
-    """Convert string representation to Card object"""
-    if len(card_str) < 2:
-        raise ValueError(f"Invalid card string: {card_str}")
-    
-    # Handle 10 specially
-    if card_str.startswith("10"):
-        rank_str = "10"
-        suit_str = card_str[2:]
-    else:
-        rank_str = card_str[0]
-        suit_str = card_str[1:]
-    
-    # Map suit strings to enum
-    suit_map = {
-        "h": Suit.HEARTS,
-        "hearts": Suit.HEARTS,
-        "d": Suit.DIAMONDS, 
-        "diamonds": Suit.DIAMONDS,
-        "c": Suit.CLUBS,
-        "clubs": Suit.CLUBS,
-        "s": Suit.SPADES,
-        "spades": Suit.SPADES
-    }
-    
-    suit = suit_map.get(suit_str.lower())
-    if not suit:
-        raise ValueError(f"Invalid suit: {suit_str}")
-    
-    # Map rank strings to enum
-    rank_map = {
-        "2": Rank.TWO, "3": Rank.THREE, "4": Rank.FOUR, "5": Rank.FIVE,
-        "6": Rank.SIX, "7": Rank.SEVEN, "8": Rank.EIGHT, "9": Rank.NINE,
-        "10": Rank.TEN, "T": Rank.TEN,
-        "J": Rank.JACK, "Q": Rank.QUEEN, "K": Rank.KING, "A": Rank.ACE
-    }
-    
-    rank = rank_map.get(rank_str.upper())
-    if not rank:
-        raise ValueError(f"Invalid rank: {rank_str}")
-    
-    return Card(suit=suit, rank=rank)
-
+    """Convert string representation ("Ah", "10hearts", "KD+bonus_chips_50") to Card object"""
+    return parse_card_code(card_str)
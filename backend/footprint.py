@@ -0,0 +1,75 @@
+"""
+Approximate memory footprint of live objects, for capacity diagnostics.
+
+`deep_sizeof` adds up `sys.getsizeof` over everything reachable from an
+object – container items, `__dict__` and `__slots__` attributes – except
+objects that are shared by every session and therefore not part of any one
+session's cost: pooled cards, turbo-chip registry entries, bosses, enum members,
+classes, functions and the engine itself.
+"""
+from __future__ import annotations
+
+import sys
+import types
+from array import array
+from enum import Enum
+from typing import Any, Iterable, Iterator, Set
+
+from .models import pooled_cards, BOSS_REGISTRY
+from .turbo_chips import TURBO_CHIP_REGISTRY
+from .card_effects import AVAILABLE_EFFECT_NAMES
+
+_ATOMIC = (str, bytes, int, float, bool, type(None), array)
+_NEVER_COUNTED = (type, types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.ModuleType, Enum)
+
+
+def shared_object_ids(extra: Iterable[Any] = ()) -> Set[int]:
+    """ids of objects shared across sessions (excluded from per-session sizes)"""
+    shared = {id(card) for card in pooled_cards()}
+    for chip_id, chip in TURBO_CHIP_REGISTRY.items():
+        shared.add(id(chip_id))
+        shared.add(id(chip))
+        shared.update(id(v) for v in vars(chip).values())
+    shared.update(id(name) for name in AVAILABLE_EFFECT_NAMES)
+    shared.update(id(boss) for boss in BOSS_REGISTRY.values())
+    shared.update(id(obj) for obj in extra)
+    return shared
+
+
+def _children(obj: Any) -> Iterator[Any]:
+    if isinstance(obj, dict):
+        yield from obj.keys()
+        yield from obj.values()
+        return
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        yield from obj
+        return
+    d = getattr(obj, "__dict__", None)
+    if d is not None:
+        yield d
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if slot in ("__dict__", "__weakref__"):
+                continue
+            try:
+                yield getattr(obj, slot)
+            except AttributeError:
+                pass
+
+
+def deep_sizeof(obj: Any, shared: Set[int]) -> int:
+    """Bytes reachable from `obj`, not counting anything in `shared` (ids)"""
+    seen: Set[int] = set(shared)
+    total = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _NEVER_COUNTED):
+            continue
+        seen.add(id(o))
+        if o is None or isinstance(o, bool) or (isinstance(o, int) and -5 <= o <= 256):
+            continue  # singletons and CPython's cached small ints
+        total += sys.getsizeof(o)
+        if not isinstance(o, _ATOMIC):
+            stack.extend(_children(o))
+    return total
@@ -0,0 +1,126 @@
+"""
+Name → handler table for the per-session game actions.
+
+The HTTP routes in `main.py` each call one `GameEngine` method; transports
+that multiplex several actions over one connection (the WebSocket channel)
+dispatch through this table instead so both paths run the exact same engine
+code and return the same result shapes as the corresponding HTTP route
+(minus the `success` flag, which the transport adds).
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List
+
+from .autoplayer import DEFAULT_DEPTH
+from .game_engine import GameEngine
+
+ActionHandler = Callable[[GameEngine, str, Dict[str, Any]], Dict[str, Any]]
+
+
+def _indices(payload: Dict[str, Any]) -> List[int]:
+    cards = payload.get("cards", payload.get("selected_cards"))
+    if not isinstance(cards, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in cards):
+        raise ValueError("'cards' must be a list of hand indices")
+    return list(cards)
+
+
+def _index(payload: Dict[str, Any]) -> int:
+    idx = payload.get("index")
+    if not isinstance(idx, int) or isinstance(idx, bool):
+        raise ValueError("'index' must be an integer")
+    return idx
+
+
+def _depth(payload: Dict[str, Any]) -> int:
+    depth = payload.get("depth", DEFAULT_DEPTH)
+    if not isinstance(depth, int) or isinstance(depth, bool):
+        raise ValueError("'depth' must be an integer")
+    return depth
+
+
+ACTIONS: Dict[str, ActionHandler] = {
+    "state":      lambda engine, sid, p: {"game_state": engine.get_game_state(sid).dict()},
+    "draw":       lambda engine, sid, p: {"game_state": engine.draw_cards(sid, _indices(p)).dict()},
+    "play":       lambda engine, sid, p: engine.play_hand(sid, _indices(p)),
+    "preview":    lambda engine, sid, p: {"preview": engine.preview_hand(sid, _indices(p))},
+    "hint":       lambda engine, sid, p: {"hint": engine.get_hint(sid, depth=_depth(p))},
+    "shop":       lambda engine, sid, p: {"shop_state": engine.get_shop_state(sid)},
+    "reroll":     lambda engine, sid, p: engine.reroll_shop(sid),
+    "buy":        lambda engine, sid, p: engine.buy_card(sid, _index(p)),
+    "next_round": lambda engine, sid, p: engine.proceed_to_next_round(sid),
+    "batch":      lambda engine, sid, p: run_batch(engine, sid, p.get("actions"), p.get("atomic", True)),
+}
+
+# Actions that change session state (everything else is read-only)
+MUTATING_ACTIONS = frozenset({"draw", "play", "reroll", "buy", "next_round", "batch"})
+
+MAX_BATCH_ACTIONS = 32
+
+
+def dispatch_action(engine: GameEngine, session_id: str, action: Any, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one named action; raises `ValueError` for unknown actions or invalid moves."""
+    handler = ACTIONS.get(action) if isinstance(action, str) else None
+    if handler is None:
+        raise ValueError(f"Unknown action: {action!r}")
+    return handler(engine, session_id, payload)
+
+
+def _detached(obj: Any) -> Any:
+    """Copy of a result's dicts / lists, so later actions in a batch can't change it"""
+    if isinstance(obj, dict):
+        return {k: _detached(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_detached(v) for v in obj]
+    return obj
+
+
+def run_batch(engine: GameEngine, session_id: str, actions: Any, atomic: Any = True) -> Dict[str, Any]:
+    """
+    Apply `actions` – ``[{"action": "buy", "index": 0}, {"action": "next_round"}, ...]``
+    – to one session in order, stopping at the first one that fails.  With
+    `atomic` the session is then rolled back to where it was before the
+    batch; without it the actions before the failure stay applied.
+
+    Per-action results leave out `game_state`; the combined result carries
+    the final state once.  `success` is True only if every action applied.
+    """
+    if not isinstance(actions, list) or not actions:
+        raise ValueError("'actions' must be a non-empty list")
+    if len(actions) > MAX_BATCH_ACTIONS:
+        raise ValueError(f"At most {MAX_BATCH_ACTIONS} actions per batch")
+    if not isinstance(atomic, bool):
+        raise ValueError("'atomic' must be a boolean")
+    session = engine._get_session(session_id)
+    saved = session.checkpoint() if atomic else None
+
+    results: List[Dict[str, Any]] = []
+    failed = None
+    for index, step in enumerate(actions):
+        name = step.get("action") if isinstance(step, dict) else None
+        try:
+            if not isinstance(step, dict):
+                raise ValueError("Each batch entry must be an object")
+            if name == "batch":
+                raise ValueError("Batches can't be nested")
+            result = dispatch_action(engine, session_id, name, step)
+        except ValueError as e:
+            failed = {"index": index, "action": name, "detail": str(e)}
+            break
+        except Exception:
+            if saved is not None:
+                session.restore(saved)
+            raise
+        result.pop("game_state", None)
+        results.append({"action": name, **_detached(result)})
+
+    rolled_back = failed is not None and saved is not None
+    if rolled_back:
+        session.restore(saved)
+    return {
+        "success": failed is None,
+        "applied": 0 if rolled_back else len(results),
+        "rolled_back": rolled_back,
+        "results": results,
+        "failed": failed,
+        "game_state": session._build_state().dict(),
+    }
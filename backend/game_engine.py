@@ -3,13 +3,30 @@ import json
 import os
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Set
-from .models import GameState, Card, HandResult, HighScore, Suit, Rank
-from .deck import Deck
+from .models import GameState, Card, HandResult, HighScore, Suit, Rank, BOSS_REGISTRY, intern_card
+from .deck import CardArray, Deck
+from .footprint import deep_sizeof, shared_object_ids
+from .card_codes import card_code, compact_cards, parse_card_code
+from .idempotency import ResponseRing
+from .transcript import DRAW, PLAY, REROLL, BUY, NEXT_ROUND, encode_action, from_text, header, to_text
+from .snapshot import SessionSnapshot, encode_record, write_snapshot
+from .leaderboard import Leaderboard
+from .autoplayer import DEFAULT_DEPTH, DEFAULT_MAX_NODES, DEFAULT_TIME_BUDGET, suggest_move
 from .poker_evaluator import PokerEvaluator #PokerEvaluator
-from .turbo_chips import TurboChip, TURBO_CHIP_REGISTRY, AVAILABLE_TURBO_IDS
+from .boss_modifiers import BossModifier, MIN_HAND_SIZE, boss_modifier
+from .turbo_chips import TurboChip, TURBO_CHIP_REGISTRY, AVAILABLE_TURBO_IDS, TURBO_TAKES_PLAYED_CARDS, turbo_shop_item
 import logging
 import random
-import inspect
+import sys
+from array import array
+from contextlib import contextmanager
+from itertools import chain
+from functools import wraps
+
+try:  # POSIX only – used to serialise highscore writes between worker processes
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
 
 # Configure basic logging for the server
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - SERVER: %(levelname)s - %(message)s')
@@ -18,16 +35,14 @@ logger = logging.getLogger(__name__)
 # ------------------------------------------------------------------ #
 #  Turbo-Chip → PokerEvaluator integration via monkey-patch         #
 # ------------------------------------------------------------------ #
-_SESSION_INVENTORIES: dict[str, list[TurboChip]] = {}
-
-def _inject_turbo(session_id: str, res: "HandResult", played_cards: list["Card"] | None = None):
-    inv = _SESSION_INVENTORIES.get(session_id, [])
+def _inject_turbo(inventory_ids: list[str], res: "HandResult", played_cards: list["Card"] | None = None):
+    """Apply the owned turbo chips (`inventory_ids`, a session's own list) to `res`"""
     total = res.total_score
     applied = list(res.applied_bonuses)
-    for chip in inv:
-        sig = inspect.signature(chip.apply_fn)
+    for chip_id in inventory_ids:
+        chip = TURBO_CHIP_REGISTRY[chip_id]
         # Check if the chip's function is designed to receive the played cards
-        if 'played_cards' in sig.parameters:
+        if TURBO_TAKES_PLAYED_CARDS[chip_id]:
             total = chip.apply_fn(total, res=res, played_cards=played_cards)
         else:
             # Legacy chip that only takes the total score
@@ -45,18 +60,34 @@ PokerEvaluator._apply_turbo = staticmethod(_inject_turbo)  # type: ignore
 class GameEngine:
     """Main game engine handling all game logic and state management"""
     
-    def __init__(self):
+    def __init__(self, session_prefix: str = "", highscores_file: str = "highscores.json"):
         self.sessions: Dict[str, GameSession] = {}
-        self.highscores_file = "highscores.json"
-        self._load_highscores()
+        # Prepended to every new session id; multi-worker deployments use it
+        # to route requests to the process owning the session (see serve.py).
+        self.session_prefix = session_prefix
+        # Its lock file and the score log (`scores_file`) live next to it
+        self.highscores_file = highscores_file
+        # Loaded on first use (see _refresh_highscores) so constructing the
+        # engine – and importing the app – never touches the disk.
+        self.highscores: List[HighScore] = []
+        self._highscores_loaded = False
+        self._highscores_mtime: Optional[float] = None
+        self._highscores_locked = False
+        # Every saved score (not just the top 10), for rank and percentile queries:
+        # indexed from the score log on first use, then kept up to date (see _refresh_leaderboard)
+        self.leaderboard = Leaderboard()
+        self._leaderboard_loaded = False
+        self._scores_read = 0  # bytes of the score log already in `leaderboard`
+        # Sessions of the previous process, restored on first lookup (see load_snapshot)
+        self._snapshot: Optional[SessionSnapshot] = None
     
     def new_game(self, debug_mode: bool = False) -> GameState:
         """Start a new game session"""
-        session_id = str(uuid.uuid4())
+        session_id = f"{self.session_prefix}{uuid.uuid4()}"
         logger.info(f"Starting new game. Session ID: {session_id}, Debug Mode: {debug_mode}")
-        session = GameSession(session_id, is_debug_mode=debug_mode)
+        session = GameSession(session_id, self, is_debug_mode=debug_mode)
         self.sessions[session_id] = session
-        return session.get_state()
+        return session._build_state()  # not cached: most sessions are never polled
     
     def draw_cards(self, session_id: str, selected_indices: List[int]) -> GameState:
         """Draw new cards by discarding selected ones"""
@@ -74,14 +105,35 @@ class GameEngine:
         logger.info(f"Session {session_id}: Play hand complete. New hand: {[str(c) for c in result['game_state']['hand']]}. Hand result: {result['hand_result']['hand_type']}")
         return result
     
+    def preview_hand(self, session_id: str, selected_indices: List[int]) -> Dict:
+        """Score the selected hand cards exactly as play_hand would, without playing them"""
+        session = self._get_session(session_id)
+        return session.preview_hand(selected_indices)
+
+    def get_hint(self, session_id: str, depth: int = DEFAULT_DEPTH, max_nodes: int = DEFAULT_MAX_NODES,
+                 time_budget: float = DEFAULT_TIME_BUDGET) -> Dict:
+        """The autoplayer's suggested next move (draw or play, and which cards)"""
+        session = self._get_session(session_id)
+        return suggest_move(session, depth=depth, max_nodes=max_nodes, time_budget=time_budget)
+
     def get_game_state(self, session_id: str) -> GameState:
         """Get current game state"""
         logger.info(f"Session {session_id}: Get game state request.")
         session = self._get_session(session_id)
         return session.get_state()
     
-    def save_score(self, session_id: str, name: str) -> List[HighScore]:
-        """Save player score to highscores, verifying from server-side state."""
+    def save_score(self, session_id: str, name: str) -> Tuple[List[HighScore], Dict]:
+        """
+        Save player score to highscores, verifying from server-side state.
+        Returns the top highscores and the new score's placement among all saved scores.
+        (The API runs the three steps itself, replaying off the event loop.)
+        """
+        from .replay import verify_entry  # the replay module builds on this one
+        entry = self.score_entry(session_id, name)
+        return self.record_score(session_id, entry, verify_entry(entry))
+
+    def score_entry(self, session_id: str, name: str) -> Dict:
+        """The highscore entry a finished game saves, still to be verified by replaying it"""
         session = self._get_session(session_id)
 
         # Security check: Do not save scores from debug sessions.
@@ -93,34 +145,174 @@ class GameEngine:
         if not session.is_game_over:
             raise ValueError("Cannot save score for a game that is not over.")
 
-        # The score is retrieved from the server-side session, not the client request.
-        score = session.total_score
+        # Each game is recorded once (the score log counts every entry)
+        if session.score_saved:
+            raise ValueError("Score already saved for this game.")
+
+        # The score is retrieved from the server-side session, not the client request,
+        # and confirmed by replaying the game from its seed and transcript.
+        return {"name": name, "score": session.total_score, "seed": session.seed,
+                "transcript": to_text(session.transcript)}
+
+    def record_score(self, session_id: str, entry: Dict, check: Dict) -> Tuple[List[HighScore], Dict]:
+        """Save a `score_entry` whose replay `check` (`backend.replay.verify_entry`) passed"""
+        session = self._get_session(session_id)
+        if session.score_saved:  # saved by another request while this one was replaying
+            raise ValueError("Score already saved for this game.")
+        score = entry["score"]
+        if not check["verified"]:
+            logger.error(f"Session {session_id}: score {score} failed replay verification: {check['reason']}")
+            raise ValueError("Score could not be verified.")
 
         timestamp = datetime.now().isoformat()
-        new_score = HighScore(name=name, score=score, timestamp=timestamp)
-        logger.info(f"Saving verified score for session {session_id}: Name={name}, Score={score}")
-        
-        self.highscores.append(new_score)
-        self.highscores.sort(key=lambda x: x.score, reverse=True)
-        self.highscores = self.highscores[:10]  # Keep top 10
-        
-        self._save_highscores()
-        return self.highscores
+        new_score = HighScore(timestamp=timestamp, **entry)
+        logger.info(f"Saving verified score for session {session_id}: Name={entry['name']}, Score={score}")
+        
+        with self._highscores_lock():
+            # Other worker processes may have saved since we last looked
+            self._refresh_highscores()
+            self._refresh_leaderboard()  # before the new entry: a first run seeds the log from the file
+            self.highscores.append(new_score)
+            self.highscores.sort(key=lambda x: x.score, reverse=True)
+            self.highscores = self.highscores[:10]  # Keep top 10
+
+            self._save_highscores()
+            self._append_scores([score])
+            self._refresh_leaderboard()
+            placement = self.leaderboard.placement(score)
+        session.score_saved = True
+        logger.info(f"Session {session_id}: score {score} placed #{placement['rank']} of {placement['total']}")
+        return self.highscores, placement
     
     def get_highscores(self) -> List[HighScore]:
         """Get top highscores"""
         logger.info("Fetching highscores.")
+        self._refresh_highscores()
         return self.highscores
+
+    def leaderboard_placement(self, score: int) -> Dict:
+        """
+        Where `score` would stand among every saved score: rank, total and top
+        percent, counting it in the total as if it were saved
+        """
+        self._refresh_leaderboard()
+        return self.leaderboard.placement(score, stored=False)
+
+    def leaderboard_threshold(self, top_percent: float) -> Dict:
+        """The score needed to be within the best `top_percent` % of every saved score"""
+        if not 0 < top_percent <= 100:
+            raise ValueError("top_percent must be above 0 and at most 100")
+        self._refresh_leaderboard()
+        return self.leaderboard.threshold(top_percent)
     
+    def session_footprint(self, sample: Optional[int] = None) -> Dict:
+        """
+        Approximate bytes per live session.  With `sample`, only that many
+        randomly chosen sessions are measured and the total is extrapolated.
+        """
+        sessions = list(self.sessions.values())
+        measured = sessions if sample is None or sample >= len(sessions) else random.sample(sessions, sample)
+        shared = shared_object_ids((self,))
+        sizes = [session.footprint_bytes(shared) for session in measured]
+        avg = sum(sizes) / len(sizes) if sizes else 0.0
+        return {
+            "sessions": len(sessions),
+            "sampled": len(sizes),
+            "avg_bytes": round(avg),
+            "max_bytes": max(sizes, default=0),
+            "estimated_total_bytes": round(avg * len(sessions)),
+            "sessions_per_gb": int(2**30 // avg) if avg else None,
+        }
+
+    def find_session(self, session_id: str) -> Optional['GameSession']:
+        """The session, restoring it from the startup snapshot on first lookup; None if unknown"""
+        session = self.sessions.get(session_id)
+        if session is None and self._snapshot is not None:
+            try:
+                record = self._snapshot.take(session_id)
+                if record is not None:
+                    session = self.sessions[session_id] = GameSession.from_record(record, self)
+            except Exception as e:  # e.g. a card effect removed since: the game can't continue
+                logger.error(f"Session {session_id}: could not be restored from the snapshot: {e}", exc_info=True)
+        return session
+
     def _get_session(self, session_id: str) -> 'GameSession':
         """Get session or raise error"""
-        if session_id not in self.sessions:
+        session = self.find_session(session_id)
+        if session is None:
             raise ValueError(f"Session {session_id} not found")
-        return self.sessions[session_id]
+        return session
+
+    # ----------------------------------------------------------------- #
+    #  Warm restarts                                                     #
+    # ----------------------------------------------------------------- #
+    def save_snapshot(self, path: str) -> int:
+        """
+        Write every session to `path` (see backend.snapshot) – the live ones,
+        plus those of the previous snapshot that were never looked up.
+        Returns how many were written.
+        """
+        started = datetime.now()
+        live = ((session_id, encode_record(session.to_record())) for session_id, session in self.sessions.items())
+        carried = self._snapshot.remaining() if self._snapshot is not None else ()
+        count = write_snapshot(path, chain(live, carried))
+        logger.info(f"Snapshot: {count} sessions written to {path} in {(datetime.now() - started).total_seconds():.2f}s")
+        return count
+
+    def load_snapshot(self, path: str) -> int:
+        """
+        Map the snapshot at `path`; its sessions are restored lazily by `find_session`.
+        The file is removed once mapped: a later crash must not bring back
+        sessions that have moved on since.  Returns how many sessions it holds.
+        """
+        if not os.path.exists(path):
+            return 0
+        try:
+            snapshot = SessionSnapshot(path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Snapshot: ignoring {path}: {e}")
+            return 0
+        try:
+            os.unlink(path)
+        except OSError:  # pragma: no cover – e.g. Windows keeps mapped files
+            pass
+        if self._snapshot is not None:
+            self._snapshot.close()
+        self._snapshot = snapshot
+        logger.info(f"Snapshot: {len(snapshot)} sessions from {path}, restored on first use")
+        return len(snapshot)
     
+    def _highscores_file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.highscores_file).st_mtime
+        except OSError:
+            return None
+
+    def _refresh_highscores(self):
+        """Load highscores on first use, or reload if the file was rewritten (e.g. by another worker)"""
+        if not self._highscores_loaded or self._highscores_file_mtime() != self._highscores_mtime:
+            self._load_highscores()
+
+    @contextmanager
+    def _highscores_lock(self):
+        """Exclusive lock around read-modify-write of the highscores file"""
+        if fcntl is None or self._highscores_locked:  # re-entered: this process holds it already
+            yield
+            return
+        with open(f"{self.highscores_file}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._highscores_locked = True
+            try:
+                yield
+            finally:
+                self._highscores_locked = False
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
     def _load_highscores(self):
         """Load highscores from file"""
         self.highscores = []
+        self._highscores_loaded = True
+        self._highscores_mtime = self._highscores_file_mtime()
         if os.path.exists(self.highscores_file):
             try:
                 with open(self.highscores_file, 'r') as f:
@@ -130,12 +322,57 @@ class GameEngine:
                 logger.error(f"Error loading highscores: {e}", exc_info=True)
                 self.highscores = []
     
+    @property
+    def scores_file(self) -> str:
+        """Append-only log of every saved score, as little-endian int64s"""
+        return f"{self.highscores_file}.scores"
+
+    def _append_scores(self, scores: List[int]):
+        data = array("q", scores)
+        if sys.byteorder == "big":
+            data.byteswap()
+        with open(self.scores_file, "ab") as f:
+            f.write(data.tobytes())
+
+    def _refresh_leaderboard(self):
+        """Index the scores appended to the score log (by any worker) since we last looked"""
+        if not self._leaderboard_loaded:
+            self._leaderboard_loaded = True
+            if not os.path.exists(self.scores_file):
+                # First run with a score log: start it from the existing highscores
+                with self._highscores_lock():
+                    self._refresh_highscores()
+                    if not os.path.exists(self.scores_file) and self.highscores:
+                        self._append_scores([entry.score for entry in self.highscores])
+        try:
+            size = os.path.getsize(self.scores_file)
+        except OSError:
+            size = 0
+        size -= size % 8  # a record being appended right now is read next time
+        if size < self._scores_read:  # the log was replaced: start over
+            self.leaderboard = Leaderboard()
+            self._scores_read = 0
+        if size == self._scores_read:
+            return
+        with open(self.scores_file, "rb") as f:
+            f.seek(self._scores_read)
+            scores = array("q", f.read(size - self._scores_read))
+        if sys.byteorder == "big":
+            scores.byteswap()
+        if len(self.leaderboard):
+            for score in scores:
+                self.leaderboard.add(score)
+        else:  # startup: one linear build
+            self.leaderboard = Leaderboard(scores)
+        self._scores_read = size
+
     def _save_highscores(self):
         """Save highscores to file"""
         try:
             with open(self.highscores_file, 'w') as f:
                 data = [score.dict() for score in self.highscores]
                 json.dump(data, f, indent=2)
+            self._highscores_mtime = self._highscores_file_mtime()
         except Exception as e:
             logger.error(f"Error saving highscores: {e}", exc_info=True)
 
@@ -163,7 +400,7 @@ class GameEngine:
         session = self._get_session(session_id)
         return session.proceed_to_next_round()
 
-    def _generate_random_card(self) -> Card:
+    def _generate_random_card(self, rng: Optional[random.Random] = None) -> Card:
         """
         Generate a **special card** for the shop.
 
@@ -172,7 +409,7 @@ class GameEngine:
         """
         from .models import Suit, Rank
         from .card_effects import AVAILABLE_EFFECT_NAMES
-        import random as _rnd
+        _rnd = rng or random
         
         # Get all possible suits and ranks
         all_suits = list(Suit)
@@ -185,48 +422,108 @@ class GameEngine:
         # Pick one random effect for the card
         effect = _rnd.choice(AVAILABLE_EFFECT_NAMES)
         
-        # Create and return a new card with the effect
-        return Card(suit=random_suit, rank=random_rank, effects=[effect])
+        # Return the (shared) card with the effect
+        return intern_card(random_suit, random_rank, (effect,))
     
     # -------- NEW -------- #
-    def generate_shop_items(self, count: int = 3) -> list[dict]:
+    def generate_shop_items(self, count: int = 3, rng: Optional[random.Random] = None) -> list[dict]:
         """
-        Return a list of `count` shop items. 
+        Return a list of `count` shop items, drawn with `rng` (default: the random module).
         85 % Card • 15 % TurboChip
-        Each item is serialisable and contains a key `item_type`.
+        Each item is serialisable and contains a key `item_type`; turbo chips
+        are registry references (`effect_id` only, see `turbo_shop_item`).
         """
+        rng = rng or random
         items: list[dict] = []
         for _ in range(count):
-            if random.random() < 0.15:  # Turbo-Chip (15% chance)
-                chip_id = random.choice(AVAILABLE_TURBO_IDS)
-                chip = TURBO_CHIP_REGISTRY[chip_id]
-                items.append({"item_type": "turbo", **chip.dict()})
+            if rng.random() < 0.15:  # Turbo-Chip (15% chance)
+                items.append(turbo_shop_item(rng.choice(AVAILABLE_TURBO_IDS)))
             else:
-                card = self._generate_random_card()
+                card = self._generate_random_card(rng)
                 items.append({"item_type": "card", **card.dict()})
         return items
 
+class _CardNames:
+    """Cards for a log line, named only if the line is emitted (replays run with logging off)"""
+    __slots__ = ("cards",)
+
+    def __init__(self, cards):
+        self.cards = cards
+
+    def __str__(self) -> str:
+        return str([str(c) for c in self.cards])
+
+def _mutates_state(method):
+    """Mark a GameSession method as changing what `get_state()` returns"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Dropped up front, so a partial change before a ValueError can't leave a stale snapshot
+        self._state_changed()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+def _recorded(opcode: int):
+    """Append each successful call of a GameSession action to its transcript (see backend.transcript)"""
+    def decorate(method):
+        @wraps(method)
+        def wrapper(self, *args):
+            # Copied up front: draw_cards sorts its index list in place
+            recorded = [i for arg in args for i in (arg if isinstance(arg, list) else [arg])]
+            result = method(self, *args)
+            self.transcript += encode_action(opcode, recorded)
+            return result
+        return wrapper
+    return decorate
+
 class GameSession:
     """Individual game session managing one player's game"""
     
     # Round progression requirements
     ROUND_TARGETS = {1: 300, 2: 750, 3: 1250}
     ROUNDS_PER_LEG = 3
+
+    # Game configuration (identical for every session, so kept on the class)
+    total_legs = 10
+    shop_reroll_cost = 1
+    shop_card_cost = 3
+    turbo_chip_cost = 1
+    max_hands = 4
+    max_hand_size = 8
+    max_draws = 3
+
+    # Thousands of sessions live at once: no per-instance __dict__
+    __slots__ = (
+        "session_id", "engine", "current_round", "hands_played", "is_debug_mode", "draws_used",
+        "total_score", "money", "deck", "hand", "is_game_over", "is_victory", "current_leg",
+        "is_boss_round", "active_boss", "in_shop", "shop_items", "inventory_ids", "_purchased_cards",
+        "cards_stolen_this_round", "baron_fee_paid", "hand_version", "_preview_cache",
+        "state_version", "_state_snapshot", "_state_json", "_responses", "seed", "rng_events", "transcript",
+        "score_saved",
+    )
     
-    def __init__(self, session_id: str, is_debug_mode: bool = False):
+    def __init__(self, session_id: str, engine: GameEngine, is_debug_mode: bool = False, seed: Optional[int] = None):
         self.session_id = session_id
+        self.engine = engine  # the engine that owns this session (shop generation)
+
+        # Every random event of the game (shuffles, shop offers, bosses, mystery cards)
+        # draws from a generator derived from `seed` (see `_rng`); with the transcript
+        # of actions it replays the game exactly (backend.replay).
+        self.seed = random.getrandbits(53) if seed is None else seed  # exact as a JSON number anywhere
+        self.rng_events = 0
+        self.transcript = header()
+        self.score_saved = False  # set once its highscore is recorded (see GameEngine.record_score)
+
         self.current_round = 1
         self.hands_played = 0
         self.is_debug_mode = is_debug_mode # Store debug mode status
         self.draws_used = 0
         self.total_score = 0
         self.money = 0  # Player's accumulated money
-        self.deck = Deck()
+        self.deck = Deck(self._rng())
         self.hand: List[Card] = []
         self.is_game_over = False
         self.is_victory = False
         self.current_leg = 1
-        self.total_legs = 10
         self.is_boss_round = False
         self.active_boss = None
 
@@ -234,81 +531,239 @@ class GameSession:
         self.in_shop = False
         self.shop_items: list[dict] = []
 
-        self.shop_reroll_cost = 1
-        self.shop_card_cost = 3
-        self.turbo_chip_cost = 1
+        # Turbo inventory, as TURBO_CHIP_REGISTRY ids (see the `inventory` property)
+        self.inventory_ids: List[str] = []
 
-        # Turbo inventory
-        self.inventory: list[TurboChip] = []
-
-        self.purchased_cards: List[Card] = []  # Cards bought in shop, shuffled into deck next round
-        
-        # Game configuration
-        self.max_hands = 4
-        self.max_hand_size = 8
-        self.max_draws = 3
+        self.purchased_cards = CardArray()  # Cards bought in shop, shuffled into deck next round
 
         # Boss effects tracking
         self.cards_stolen_this_round = 0
         self.baron_fee_paid = False
+
+        # Bumped whenever the hand (or anything else that changes its score) changes;
+        # previews are cached per version and dropped on every bump.
+        self.hand_version = 0
+        self._preview_cache: Dict[Tuple[int, ...], Dict] = {}
+
+        # Bumped by every mutating action (see `_mutates_state`).  Read paths
+        # (`get_state()`, `state_json()`) build the state once per version and
+        # keep it until the next mutation; actions return a fresh, uncached
+        # `_build_state()` so idle sessions don't carry a snapshot around.
+        # Code changing session attributes directly must call `_state_changed()`.
+        self.state_version = 0
+        self._state_snapshot: Optional[GameState] = None
+        self._state_json: Optional[Dict[str, bytes]] = None
+
+        # Responses to recent actions sent with an idempotency key (see `response_ring`)
+        self._responses: Optional[ResponseRing] = None
         
         if self.is_debug_mode:
             logger.info(f"Session {self.session_id}: Initializing in DEBUG MODE.")
             self.money = 100
-            self.inventory = [TURBO_CHIP_REGISTRY[chip_id] for chip_id in AVAILABLE_TURBO_IDS] # One of each
+            self.inventory_ids = list(AVAILABLE_TURBO_IDS) # One of each
             
             # Special deck setup for debug mode
-            self.deck.reset() # Start with a standard shuffled deck
+            rng = self._rng()
+            self.deck.reset(rng) # Start with a standard shuffled deck
             
             # Select 10 random cards to make special
             if len(self.deck.cards) >= 10:
-                cards_to_make_special_indices = random.sample(range(len(self.deck.cards)), 10)
+                cards_to_make_special_indices = rng.sample(range(len(self.deck.cards)), 10)
                 from .card_effects import AVAILABLE_EFFECT_NAMES # Local import
                 
                 for index in cards_to_make_special_indices:
                     original_card = self.deck.cards[index]
-                    # Replace with a new card instance that has the same suit/rank but a random effect
-                    self.deck.cards[index] = Card(
-                        suit=original_card.suit,
-                        rank=original_card.rank,
-                        effects=[random.choice(AVAILABLE_EFFECT_NAMES)]
+                    # Replace with the card of the same suit/rank carrying a random effect
+                    self.deck.cards[index] = intern_card(
+                        original_card.suit,
+                        original_card.rank,
+                        (rng.choice(AVAILABLE_EFFECT_NAMES),)
                     )
                 logger.info(f"Session {self.session_id} (Debug): Made 10 cards special.")
-            random.shuffle(self.deck.cards) # Re-shuffle after modification
+            self.deck.shuffle(rng) # Re-shuffle after modification
             self._deal_initial_hand()
         else:
             # Deal initial hand for normal mode
             self._deal_initial_hand()
-        logger.info(f"Session {self.session_id}: Initial hand dealt: {[str(c) for c in self.hand]}")
+        logger.info("Session %s: Initial hand dealt: %s", self.session_id, _CardNames(self.hand))
     
+    # ----------------------------------------------------------------- #
+    #  Compact storage accessors                                         #
+    # ----------------------------------------------------------------- #
+    @property
+    def inventory(self) -> List[TurboChip]:
+        """Owned turbo chips, resolved from the registry"""
+        return [TURBO_CHIP_REGISTRY[chip_id] for chip_id in self.inventory_ids]
+
+    @inventory.setter
+    def inventory(self, chips: List[TurboChip]):
+        self._state_changed()
+        self.inventory_ids = [chip.effect_id for chip in chips]
+
+    @property
+    def purchased_cards(self) -> CardArray:
+        return self._purchased_cards
+
+    @purchased_cards.setter
+    def purchased_cards(self, cards: List[Card]):
+        self._purchased_cards = cards if isinstance(cards, CardArray) else CardArray(cards)
+
+    def _rng(self) -> random.Random:
+        """A generator for the next random event, derived from `seed` and the event count"""
+        # Derived per event rather than kept: a Random object's state is ~2.5 KB per session
+        self.rng_events += 1
+        return random.Random(self.rng_events << 64 | self.seed)
+
+    def footprint_bytes(self, shared: Optional[Set[int]] = None) -> int:
+        """Approximate memory held by this session alone (shared cards/chips excluded)"""
+        if shared is None:
+            shared = shared_object_ids((self.engine,))
+        return deep_sizeof(self, shared)
+
     def get_state(self) -> GameState:
-        """Get current game state"""
-        return GameState(
+        """Current game state – a snapshot shared until the next mutation, so treat it as read-only"""
+        state = self._state_snapshot
+        if state is None:
+            state = self._state_snapshot = self._build_state()
+        return state
+
+    def state_json(self, cards: str = "object") -> bytes:
+        """`get_state()` as JSON bytes (cards as objects, or as codes with "code"), cached per version"""
+        if self._state_json is None:
+            self._state_json = {}
+        body = self._state_json.get(cards)
+        if body is None:
+            state = self.get_state()
+            if cards == "code":
+                body = json.dumps(compact_cards(state.dict()), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            else:
+                body = state.model_dump_json().encode("utf-8")
+            self._state_json[cards] = body
+        return body
+
+    # Not rolled back: identity, owner, caches derived from the rest, and the
+    # version counters (kept monotonic so clients never see a number twice)
+    _NOT_CHECKPOINTED = frozenset({"session_id", "engine", "_responses", "_state_snapshot", "_state_json",
+                                   "_preview_cache", "hand_version", "state_version"})
+
+    def checkpoint(self) -> Dict[str, object]:
+        """Copy of everything an action can change, for `restore` (see game_actions.run_batch)"""
+        saved = {}
+        for name in self.__slots__:
+            if name in self._NOT_CHECKPOINTED:
+                continue
+            value = getattr(self, name)
+            if isinstance(value, (Deck, CardArray)):
+                value = value.copy()
+            elif isinstance(value, list):  # hand, inventory ids, shop items (dicts, replaced not edited)
+                value = [dict(v) if isinstance(v, dict) else v for v in value]
+            saved[name] = value  # everything else is immutable or shared (ints, strs, bosses)
+        return saved
+
+    def restore(self, saved: Dict[str, object]):
+        """Roll back to a `checkpoint()`"""
+        for name, value in saved.items():
+            setattr(self, name, value)
+        self._hand_changed()
+        self._state_changed()
+
+    # Copied as is by `to_record` (plain JSON values); cards, the boss and the
+    # transcript are encoded, and caches are rebuilt on demand
+    _RECORD_FIELDS = ("current_round", "hands_played", "is_debug_mode", "draws_used", "total_score", "money",
+                      "is_game_over", "is_victory", "current_leg", "is_boss_round", "in_shop", "shop_items",
+                      "inventory_ids", "cards_stolen_this_round", "baron_fee_paid", "hand_version",
+                      "state_version", "seed", "rng_events")
+
+    def to_record(self) -> Dict[str, object]:
+        """Everything needed to resume this session in another process (see `from_record`)"""
+        record: Dict[str, object] = {name: getattr(self, name) for name in self._RECORD_FIELDS}
+        record.update(
+            session_id=self.session_id,
+            hand=" ".join(map(card_code, self.hand)),
+            deck=" ".join(map(card_code, self.deck.cards)),
+            discarded=" ".join(map(card_code, self.deck.discarded)),
+            purchased_cards=" ".join(map(card_code, self.purchased_cards)),
+            active_boss=self.active_boss.type.value if self.active_boss else None,
+            transcript=to_text(self.transcript),
+            score_saved=self.score_saved,
+            responses=[(key, fingerprint, status, body.decode("utf-8"))
+                       for key, fingerprint, status, body in self._responses.items()] if self._responses else None,
+        )
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, object], engine: GameEngine) -> "GameSession":
+        """The session `to_record` describes, owned by `engine` (no new deal, nothing logged)"""
+        def cards(codes: str) -> List[Card]:
+            return [parse_card_code(code) for code in codes.split()]
+
+        session = cls.__new__(cls)
+        for name in cls._RECORD_FIELDS:
+            setattr(session, name, record[name])
+        # JSON gave card offers string suits/ranks and list effects; restore them as generated
+        session.shop_items = [{"item_type": "card", **intern_card(item["suit"], item["rank"], item["effects"]).dict()}
+                              if item["item_type"] == "card" else item for item in record["shop_items"]]
+        session.session_id = record["session_id"]
+        session.engine = engine
+        session.hand = cards(record["hand"])
+        session.deck = Deck.__new__(Deck)
+        session.deck.cards = cards(record["deck"])
+        session.deck._discarded = CardArray(cards(record["discarded"]))
+        session.purchased_cards = cards(record["purchased_cards"])
+        session.active_boss = BOSS_REGISTRY[record["active_boss"]] if record["active_boss"] else None
+        session.transcript = from_text(record["transcript"])
+        session.score_saved = record["score_saved"]
+        session._responses = (ResponseRing.from_items((key, fingerprint, status, body.encode("utf-8"))
+                                                      for key, fingerprint, status, body in record["responses"])
+                              if record["responses"] else None)
+        session._preview_cache = {}
+        session._state_snapshot = None
+        session._state_json = None
+        return session
+
+    def response_ring(self) -> ResponseRing:
+        """Replayable responses to this session's keyed actions, created on first use"""
+        if self._responses is None:
+            self._responses = ResponseRing()
+        return self._responses
+
+    def _state_changed(self):
+        self.state_version += 1
+        self._state_snapshot = None
+        self._state_json = None
+
+    def _build_state(self) -> GameState:
+        # Every value comes from the session itself (pooled cards, registry ids),
+        # so the model is assembled without re-validating it.
+        return GameState.model_construct(
             session_id=self.session_id,
             current_round=self.current_round,
             hands_played=self.hands_played,
             draws_used=self.draws_used,
             total_score=self.total_score,
             money=self.money,
-            hand=self.hand.copy(),
+            hand=list(self.hand),
             deck_remaining=self.deck.remaining_count(),
-            round_target=self.ROUND_TARGETS.get(self.current_round, 0),
-            max_hands=self.max_hands,
-            max_hand_size=self.max_hand_size, 
             in_shop=self.in_shop,
             shop_cards=[],
-            shop_items=self.shop_items.copy() if self.shop_items else [],
+            round_target=self.ROUND_TARGETS.get(self.current_round, 0),
+            max_hands=self.max_hands,
+            max_hand_size=self.max_hand_size,
             max_draws=self.max_draws,
             is_game_over=self.is_game_over,
             is_victory=self.is_victory,
+            inventory=list(self.inventory_ids),
+            is_debug_mode=self.is_debug_mode,
             current_leg=self.current_leg,
             total_legs=self.total_legs,
             is_boss_round=self.is_boss_round,
-            active_boss=self.active_boss,
-            inventory=self.inventory.copy(),
-            is_debug_mode=self.is_debug_mode,
+            active_boss=self.active_boss.type if self.active_boss else None,
+            hand_version=self.hand_version,
+            state_version=self.state_version,
         )
     
+    @_mutates_state
+    @_recorded(DRAW)
     def draw_cards(self, selected_indices: List[int]) -> GameState:
         """Draw new cards by discarding selected ones"""
         if self.is_game_over:
@@ -317,26 +772,26 @@ class GameSession:
         if self.draws_used >= self.max_draws:
             raise ValueError("No draws remaining")
         
-        # Apply boss effects before drawing
-        if self.is_boss_round and self.active_boss and self.active_boss.type == "thief":
-            self._apply_thief_effect()
-            self.cards_stolen_this_round += 1
-        
         if len(selected_indices) == 0:
             raise ValueError("Must select at least one card to discard")
         
-        logger.info(f"Session {self.session_id}: Hand before discard: {[str(c) for c in self.hand]}")
+        logger.info("Session %s: Hand before discard: %s", self.session_id, _CardNames(self.hand))
         # Validate indices
         for idx in selected_indices:
             if idx < 0 or idx >= len(self.hand):
                 raise ValueError(f"Invalid card index: {idx}")
         
+        # Apply boss effects before drawing (after validation: a rejected draw changes nothing)
+        for _ in range(self.boss_modifier.draw_steals):
+            self._apply_thief_effect()
+            self.cards_stolen_this_round += 1
+        
         # Remove selected cards (in reverse order to maintain indices)
         selected_indices.sort(reverse=True)
         discarded_cards = []
         for idx in selected_indices:
             discarded_cards.append(self.hand.pop(idx))
-        logger.info(f"Session {self.session_id}: Discarded cards: {[str(c) for c in discarded_cards]}")
+        logger.info("Session %s: Discarded cards: %s", self.session_id, _CardNames(discarded_cards))
         
         # Discard cards
         self.deck.discard(discarded_cards)
@@ -347,27 +802,30 @@ class GameSession:
         if cards_to_draw > 0:
             new_cards = self.deck.draw(cards_to_draw)
             self.hand.extend(new_cards)
-        logger.info(f"Session {self.session_id}: Drew new cards: {[str(c) for c in new_cards]}")
-        logger.info(f"Session {self.session_id}: Hand after drawing new cards: {[str(c) for c in self.hand]}")
+        logger.info("Session %s: Drew new cards: %s", self.session_id, _CardNames(new_cards))
+        logger.info("Session %s: Hand after drawing new cards: %s", self.session_id, _CardNames(self.hand))
         
         self.draws_used += 1
+        self._hand_changed()
         
-        return self.get_state()
+        return self._build_state()
     
+    @_mutates_state
+    @_recorded(PLAY)
     def play_hand(self, selected_indices: List[int]) -> Dict:
         """Play the selected cards and calculate score"""
         if self.is_game_over:
             raise ValueError("Game is over")
         
         # Apply boss effects before playing
-        if self.is_boss_round and self.active_boss and self.active_boss.type == "baron" and not self.baron_fee_paid:
-            if self.money < 5:  # $1 per card, 5 cards total
-                raise ValueError(f"The Baron demands $5 to play your hand. You only have ${self.money}.")
+        fee = 0 if self.baron_fee_paid else self.boss_modifier.play_fee
+        if self.money < fee:
+            raise ValueError(f"{self.active_boss.name} demands ${fee} to play your hand. You only have ${self.money}.")
         
         if len(selected_indices) < 1 or len(selected_indices) > 5:
             raise ValueError("Must select between 1 and 5 cards to play")
         
-        logger.info(f"Session {self.session_id}: Hand before playing selected cards: {[str(c) for c in self.hand]}")
+        logger.info("Session %s: Hand before playing selected cards: %s", self.session_id, _CardNames(self.hand))
         # Validate indices
         for idx in selected_indices:
             if idx < 0 or idx >= len(self.hand):
@@ -375,7 +833,7 @@ class GameSession:
         
         # Get the actual Card objects that were selected by the player for this hand
         played_cards_for_eval = [self.hand[idx] for idx in selected_indices]
-        logger.info(f"Session {self.session_id}: Cards selected for play: {[str(c) for c in played_cards_for_eval]}")
+        logger.info("Session %s: Cards selected for play: %s", self.session_id, _CardNames(played_cards_for_eval))
 
         # Determine which cards from the original hand were *not* played (these are kept)
         # and which were played (these are discarded).
@@ -393,11 +851,11 @@ class GameSession:
         
         # Update the player's hand to only contain the cards they kept
         self.hand = kept_cards_in_hand
-        logger.info(f"Session {self.session_id}: Cards kept in hand: {[str(c) for c in self.hand]}")
+        logger.info("Session %s: Cards kept in hand: %s", self.session_id, _CardNames(self.hand))
         
         # Add the played cards to the deck's discard pile
         self.deck.discard(played_cards_to_discard_pile)
-        logger.info(f"Session {self.session_id}: Played cards added to discard pile: {[str(c) for c in played_cards_to_discard_pile]}")
+        logger.info("Session %s: Played cards added to discard pile: %s", self.session_id, _CardNames(played_cards_to_discard_pile))
 
         # Replenish the player's hand by drawing new cards to replace those that were played
         num_cards_that_were_played = len(played_cards_to_discard_pile) # This will be between 1 and 5
@@ -410,29 +868,14 @@ class GameSession:
             newly_drawn_cards = self.deck.draw(actual_draw_count)
             self.hand.extend(newly_drawn_cards) # Add newly drawn cards to the kept cards
         
-        logger.info(f"Session {self.session_id}: Replenished hand with: {[str(c) for c in newly_drawn_cards]}. Current hand now: {[str(c) for c in self.hand]}")
+        logger.info("Session %s: Replenished hand with: %s. Current hand now: %s", self.session_id, _CardNames(newly_drawn_cards), _CardNames(self.hand))
 
-        # Provide inventory to turbo hook, then compute base score and apply any turbo chips
-        _SESSION_INVENTORIES[self.session_id] = self.inventory
-        
-        # Apply boss effects to the played cards if needed
-        if self.is_boss_round and self.active_boss:
-            played_cards_for_eval = self._apply_boss_effects_to_cards(played_cards_for_eval)
-            
-            # Pay the Baron's fee if applicable
-            if self.active_boss.type == "baron" and not self.baron_fee_paid:
-                self.money -= 5  # $1 per card, 5 cards total
-                self.baron_fee_paid = True
+        # Pay the boss's fee if applicable (once per round)
+        if fee:
+            self.money -= fee
+            self.baron_fee_paid = True
 
-        # 1) Evaluate base hand
-        raw_result = PokerEvaluator.evaluate_hand(played_cards_for_eval)
-        # 2) Apply any active turbo‐chips (monkey-patched hook).  We now pass
-        #    `played_cards_for_eval` as an extra argument so suit-specific
-        #    chips can inspect which cards actually scored.
-        hand_result = PokerEvaluator._apply_turbo(self.session_id, raw_result, played_cards_for_eval)
-
-        # Apply boss effects to scoring
-        hand_result = self._apply_boss_effects_to_scoring(hand_result, played_cards_for_eval)
+        hand_result = self._score_cards(played_cards_for_eval, self._rng())
 
         # Update score (already turbo-adjusted)
         self.total_score += hand_result.total_score
@@ -468,10 +911,10 @@ class GameSession:
                 self._check_for_boss_round()
                 # Instead of immediately advancing to next round, we enter shop mode
                 # The actual round advancement happens in proceed_to_next_round
-                logger.info(f"Session {self.session_id}: Entering shop for round {self.current_round + 1}. Hand carried over: {[str(c) for c in self.hand]}")
+                logger.info("Session %s: Entering shop for round %s. Hand carried over: %s", self.session_id, self.current_round + 1, _CardNames(self.hand))
                 
                 # Generate shop items
-                self.shop_items = game_engine.generate_shop_items(3)
+                self.shop_items = self.engine.generate_shop_items(3, self._rng())
         else:
             # Check if game over (max hands reached)
             if self.hands_played >= self.max_hands and not self.is_debug_mode: # Game over only if not debug and max hands
@@ -485,13 +928,68 @@ class GameSession:
         if self.is_debug_mode:
             self.is_game_over = False # Prevent game over screen from blocking debug play
             self.is_victory = False   # Prevent victory screen from blocking debug play
+        self._hand_changed()
         return {
             "hand_result": hand_result.dict(),
-            "game_state": self.get_state().dict(),
+            "game_state": self._build_state().dict(),
             "round_complete": round_complete,
             "money_awarded_this_round": money_awarded_this_round
         }
     
+    def _score_cards(self, cards: List[Card], rng: Optional[random.Random] = None) -> HandResult:
+        """
+        Evaluate `cards` with this session's turbo chips and boss effects applied.
+        Only played hands pass the session's `rng`: previews must not use up its events.
+        """
+        boss = self.boss_modifier
+
+        # 1) Evaluate base hand (cards of the boss's blocked suits don't score)
+        raw_result = PokerEvaluator.evaluate_hand(cards, rng, boss.blocked_suits)
+        # 2) Apply any active turbo‐chips (monkey-patched hook).  We now pass
+        #    `cards` as an extra argument so suit-specific chips can inspect
+        #    which cards actually scored.
+        hand_result = PokerEvaluator._apply_turbo(self.inventory_ids, raw_result, cards)
+
+        # Apply boss effects to scoring
+        return self._apply_boss_effects_to_scoring(hand_result, boss)
+
+    def preview_hand(self, selected_indices: List[int]) -> Dict:
+        """Score the selected hand cards exactly as play_hand would, without playing them"""
+        if self.is_game_over:
+            raise ValueError("Game is over")
+
+        if len(selected_indices) < 1 or len(selected_indices) > 5:
+            raise ValueError("Must select between 1 and 5 cards to preview")
+
+        key = tuple(sorted(selected_indices))
+        if len(set(key)) != len(key):
+            raise ValueError("Duplicate card index in selection")
+        for idx in key:
+            if idx < 0 or idx >= len(self.hand):
+                raise ValueError(f"Invalid card index: {idx}")
+
+        cached = self._preview_cache.get(key)
+        if cached is not None:
+            return cached
+
+        cards = [self.hand[idx] for idx in key]
+        hand_result = self._score_cards(cards)
+        chips = hand_result.base_chips + hand_result.card_chips
+        preview = {
+            **hand_result.dict(),
+            # Indices into the session hand rather than into the selection
+            "triggered_indices": [key[i] for i in hand_result.triggered_indices],
+            "score_info": f"{chips} × {hand_result.multiplier} = {hand_result.total_score}",
+            "hand_version": self.hand_version,
+        }
+        self._preview_cache[key] = preview
+        return preview
+
+    def _hand_changed(self):
+        """Invalidate per-hand caches after the hand, inventory or boss changed"""
+        self.hand_version += 1
+        self._preview_cache.clear()
+
     def get_shop_state(self) -> Dict:
         """Get the current shop state"""
         if not self.in_shop:
@@ -505,6 +1003,8 @@ class GameSession:
             "next_round": self.current_round + 1
         }
     
+    @_mutates_state
+    @_recorded(REROLL)
     def reroll_shop(self) -> Dict:
         """Reroll the shop cards for $1"""
         if not self.in_shop:
@@ -518,13 +1018,15 @@ class GameSession:
         logger.info(f"Session {self.session_id}: Rerolled shop cards for ${self.shop_reroll_cost}. Money remaining: ${self.money}")
         
         # Generate new shop items
-        self.shop_items = game_engine.generate_shop_items(3)
+        self.shop_items = self.engine.generate_shop_items(3, self._rng())
         
         return {
             "shop_items": self.shop_items,
             "money": self.money
         }
     
+    @_mutates_state
+    @_recorded(BUY)
     def buy_card(self, card_index: int) -> Dict:
         """Buy a card or turbo chip from the shop"""
         if not self.in_shop:
@@ -537,18 +1039,18 @@ class GameSession:
         cost = self.turbo_chip_cost if item["item_type"] == "turbo" else self.shop_card_cost
         if self.money < cost:
             raise ValueError(f"Not enough money. Need ${cost}, have ${self.money}")
+        if item["item_type"] != "card" and len(self.inventory_ids) >= 8:
+            raise ValueError("Inventory full (8).")
         self.money -= cost
 
         if item["item_type"] == "card":
-            card_to_buy = Card(**item)
+            card_to_buy = intern_card(item["suit"], item["rank"], item.get("effects", ()))
             self.deck.cards.append(card_to_buy)
-            random.shuffle(self.deck.cards)
+            self.deck.shuffle(self._rng())
             self.purchased_cards.append(card_to_buy)
         else:
-            if len(self.inventory) >= 8:
-                raise ValueError("Inventory full (8).")
-            chip = TurboChip(**item)
-            self.inventory.append(chip)
+            self.inventory_ids.append(item["effect_id"])
+            self._hand_changed()  # turbo chips change what the hand scores
 
         # Remove item from shop
         self.shop_items.pop(card_index)
@@ -562,32 +1064,27 @@ class GameSession:
             self.deck.remaining_count(),
         )
         
-        return {"game_state": self.get_state().dict()}
+        return {"game_state": self._build_state().dict()}
     
     def _deal_initial_hand(self):
         """Deal initial hand of cards"""
         self.hand = self.deck.draw(self._get_effective_max_hand_size())
+        self._hand_changed()
     
     def get_remaining_deck_cards(self) -> List[Card]:
         """Returns a copy of the cards currently in the deck."""
         logger.info(f"Session {self.session_id}: Fetching remaining deck cards. Count: {len(self.deck.cards)}")
-        return self.deck.cards.copy()
+        return list(self.deck.cards)
     
+    @_mutates_state
+    @_recorded(NEXT_ROUND)
     def proceed_to_next_round(self) -> Dict:
         """Proceed to the next round after shopping"""
         if not self.in_shop:
             raise ValueError("Not currently in shop phase")
         
-        # Set up boss effects for the next round if it's a boss round
-        if self.is_boss_round and self.active_boss:
-            boss_type = self.active_boss.type
-            blocked_suits = {
-                "vampire": Suit.HEARTS, "vip_only": Suit.CLUBS,
-                "frozen_ground": Suit.SPADES, "blonde_vixen": Suit.DIAMONDS
-            }
-            PokerEvaluator.set_blocked_suit(self.session_id, blocked_suits.get(boss_type))
-        
-        # Reset boss-related state for the new round
+        # Reset boss-related state for the new round (the boss itself, if any, was
+        # picked on entering the shop and takes effect through `boss_modifier`)
         self.cards_stolen_this_round = 0
         self.baron_fee_paid = False
         
@@ -595,7 +1092,7 @@ class GameSession:
         if self.current_round % self.ROUNDS_PER_LEG == 0:
             self.current_leg += 1
         
-        logger.info(f"Session {self.session_id}: Proceeding to Round {self.current_round + 1}. Current hand: {[str(c) for c in self.hand]}. Purchased cards accumulated: {[str(c) for c in self.purchased_cards]}")
+        logger.info("Session %s: Proceeding to Round %s. Current hand: %s. Purchased cards accumulated: %s", self.session_id, self.current_round + 1, _CardNames(self.hand), _CardNames(self.purchased_cards))
         
         # Advance to next round
         self.current_round += 1
@@ -607,11 +1104,8 @@ class GameSession:
 
         self.shop_items.clear() # Clear shop offerings for the new round
 
-        # 1. Create a new, full standard 52-card deck.
-        new_round_draw_pile_cards: List[Card] = []
-        for suit_enum in Suit:
-            for rank_enum in Rank:
-                new_round_draw_pile_cards.append(Card(suit=suit_enum, rank=rank_enum, effects=[]))
+        # 1. Start from a full standard 52-card deck (pool ids of the shared cards).
+        new_round_draw_pile_cards = CardArray.standard()
         
         # 2. Add all cards from self.purchased_cards to this list.
         #    self.purchased_cards accumulates all cards bought throughout the game.
@@ -620,20 +1114,20 @@ class GameSession:
         # 3. The player's current hand (self.hand) was carried through the shop.
         #    These cards are effectively "out of the deck" for the initial deal of the new round.
         #    Remove one instance of each card in self.hand from new_round_draw_pile_cards.
-        #    This relies on Card.__eq__ for exact matching (suit, rank, effects).
-        temp_deck_for_removal = list(new_round_draw_pile_cards) # Work on a copy
+        #    Equal cards (suit, rank, effects) share one pool id, so this matches
+        #    exactly what Card.__eq__ would, on 2-byte ids.
         successfully_removed_count = 0
         for card_in_hand_instance in self.hand:
             try:
-                temp_deck_for_removal.remove(card_in_hand_instance) # list.remove uses Card.__eq__
+                new_round_draw_pile_cards.remove(card_in_hand_instance)
                 successfully_removed_count += 1
             except ValueError:
                 logger.warning(f"Session {self.session_id}: Card '{str(card_in_hand_instance)}' (effects: {card_in_hand_instance.effects}) from player's hand was not found for removal from the new round's deck.")
         
-        self.deck.cards = temp_deck_for_removal
+        self.deck.cards = new_round_draw_pile_cards
         
         # 4. Shuffle the draw pile.
-        random.shuffle(self.deck.cards)
+        self.deck.shuffle(self._rng())
         
         # 5. IMPORTANT: self.purchased_cards is NOT cleared. It persists all purchased cards.
         
@@ -648,36 +1142,23 @@ class GameSession:
         # 6. Deal a fresh hand for the new gameplay round from this correctly assembled custom deck.
         self._deal_initial_hand()
         
-        logger.info(f"Session {self.session_id}: Dealt new hand for Round {self.current_round}: {[str(c) for c in self.hand]}")
+        logger.info("Session %s: Dealt new hand for Round %s: %s", self.session_id, self.current_round, _CardNames(self.hand))
         
         return {
-            "game_state": self.get_state().dict()
+            "game_state": self._build_state().dict()
         }
 
+    @property
+    def boss_modifier(self) -> BossModifier:
+        """What the current round's boss changes (`NO_BOSS` outside boss rounds, see backend.boss_modifiers)"""
+        return boss_modifier(self.active_boss if self.is_boss_round else None)
+
     def _apply_thief_effect(self):
         """The Thief steals a random card from the deck"""
         if self.deck.remaining_count() > 0:
             stolen_card = self.deck.cards.pop()
             logger.info(f"Session {self.session_id}: The Thief stole a card: {stolen_card}")
     
-    def _apply_boss_effects_to_cards(self, cards: List[Card]) -> List[Card]:
-        """Apply boss effects to the played cards"""
-        if not self.is_boss_round or not self.active_boss:
-            return cards
-        
-        boss_type = self.active_boss.type
-        
-        # For suit-blocking bosses, we'll return the cards but they'll be handled in the evaluator
-        if boss_type in ["vampire", "vip_only", "frozen_ground", "blonde_vixen"]:
-            return cards
-        
-        # For The Drunk, we'll handle the scoring reduction in the evaluator
-        if boss_type == "drunk":
-            return cards
-        
-        # For other bosses, we don't modify the cards directly
-        return cards
-    
     def _check_for_boss_round(self):
         """Check if the next round is a boss round and set up accordingly"""
         next_round = self.current_round + 1
@@ -686,7 +1167,7 @@ class GameSession:
         if next_round % self.ROUNDS_PER_LEG == 0:
             from .models import Boss
             self.is_boss_round = True
-            self.active_boss = Boss.get_random_boss()
+            self.active_boss = Boss.get_random_boss(self._rng())
             logger.info(f"Session {self.session_id}: Next round will be a boss round with {self.active_boss.name}")
         else:
             self.is_boss_round = False
@@ -694,35 +1175,11 @@ class GameSession:
     
     def _get_effective_max_hand_size(self) -> int:
         """Get the effective maximum hand size, accounting for boss effects"""
-        if self.is_boss_round and self.active_boss and self.active_boss.type == "death":
-            return max(3, self.max_hand_size - 2)  # Ensure at least 3 cards in hand
-        return self.max_hand_size
+        return max(MIN_HAND_SIZE, self.max_hand_size - self.boss_modifier.hand_size_penalty)
     
-    def _apply_boss_effects_to_scoring(self, hand_result: HandResult, played_cards: List[Card]) -> HandResult:
-        """Apply boss effects to the scoring"""
-        if not self.is_boss_round or not self.active_boss:
-            return hand_result
-        
-        boss_type = self.active_boss.type
-        
-        # The Drunk reduces scoring by 25%
-        if boss_type == "drunk":
-            hand_result.total_score = int(hand_result.total_score * 0.75)
-            hand_result.applied_bonuses.append("The Drunk reduced scoring by 25%")
-        
-        # Suit-blocking bosses
-        blocked_suits = {
-            "vampire": Suit.HEARTS,
-            "vip_only": Suit.CLUBS,
-            "frozen_ground": Suit.SPADES,
-            "blonde_vixen": Suit.DIAMONDS
-        }
-        
-        if boss_type in blocked_suits:
-            # This is now handled in the poker evaluator
-            pass
-        
+    def _apply_boss_effects_to_scoring(self, hand_result: HandResult, boss: BossModifier) -> HandResult:
+        """Apply the boss's score factor (blocked suits were applied by the evaluator)"""
+        if boss.score_factor != 1.0:
+            hand_result.total_score = int(hand_result.total_score * boss.score_factor)
+            hand_result.applied_bonuses.append(boss.score_text)
         return hand_result
-
-# Create a global instance of the game engine
-game_engine = GameEngine()
@@ -0,0 +1,237 @@
+"""
+Precomputed hand classification, shared between processes through one mapped file.
+
+What a hand is (its `HandType`) and which of its cards score depend only on
+the ranks in order – plus, for five cards, whether they share a suit.  The
+build step runs `PokerEvaluator`'s rules once over every rank sequence of one
+to five cards (402,233 of them) and stores the answers as a flat array of
+32-bit entries::
+
+    bits  0-4   scoring positions (bit i = card i), suits mixed
+    bits  5-8   HandType index, suits mixed
+    bits  9-13  scoring positions, all one suit (five-card sequences only)
+    bits 14-17  HandType index, all one suit
+
+A sequence's index is its ranks read as a base-13 number, after the
+sequences of fewer cards.
+
+The file starts with a header: magic, format version, a key hashing the
+source of the rules and the enum orders it was built from, the entry count,
+and a CRC32 of the entries.  A file whose key or checksum doesn't match is
+rebuilt (under a lock, so concurrent workers build it once).  Every process
+maps the same file read-only, so all uvicorn workers, job and replay pools
+share one copy of the physical pages and none pays the ~10 s build.
+
+Build it ahead of time with ``python -m backend.hand_tables`` (the Dockerfile
+and serve.py do); the app's startup hook and the benchmark CLIs build it too
+if it is missing (`load_tables`), but lookups never do: building takes
+seconds.  BALLANTRO_HAND_TABLES overrides where it lives.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import inspect
+import itertools
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+from .models import Card, HandType, Rank, Suit, intern_card
+
+try:  # POSIX only – lets one process build the file while the others wait
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TABLE_FORMAT_VERSION = 1
+TABLES_MAGIC = b"BALLANTRO-HANDS\n"
+_HEADER = struct.Struct("<16sI32sII")  # magic, version, key, entries, crc32 of the entries
+_PAYLOAD_OFFSET = 128  # entries start here (aligned, room to grow the header)
+
+DEFAULT_PATH = os.environ.get("BALLANTRO_HAND_TABLES",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_tables.bin"))
+
+MAX_CARDS = 5
+RANKS: List[Rank] = list(Rank)
+HAND_TYPES: List[HandType] = list(HandType)
+RANK_INDEX = {rank: index for index, rank in enumerate(RANKS)}
+
+# Index of the first sequence of n cards
+OFFSETS = [sum(len(RANKS) ** k for k in range(1, n)) for n in range(MAX_CARDS + 1)]
+TABLE_SIZE = OFFSETS[MAX_CARDS] + len(RANKS) ** MAX_CARDS
+
+# Scoring-position mask → the positions, in hand order
+MASK_POSITIONS: List[Tuple[int, ...]] = [tuple(i for i in range(MAX_CARDS) if mask >> i & 1)
+                                         for mask in range(1 << MAX_CARDS)]
+
+_TABLE: Optional[memoryview] = None
+
+
+def table_index(cards: Sequence[Card]) -> int:
+    index = 0
+    for card in cards:
+        index = index * 13 + RANK_INDEX[card.rank]
+    return OFFSETS[len(cards)] + index
+
+
+def classify(cards: Sequence[Card]) -> Tuple[HandType, List[int]]:
+    """(hand type, scoring card indices) of 1–5 cards, from the shared table"""
+    entry = (_TABLE if _TABLE is not None else hand_table())[table_index(cards)]
+    if len(cards) == MAX_CARDS and len({card.suit for card in cards}) == 1:
+        entry >>= 9
+    return HAND_TYPES[entry >> 5 & 0xF], list(MASK_POSITIONS[entry & 0x1F])
+
+
+def hand_table() -> memoryview:
+    """
+    The table, mapped from `DEFAULT_PATH` on first use.  Never built here – that
+    takes seconds, and this runs inside requests: the app builds it at startup
+    (`load_tables`), and child processes only map what it left on disk.
+    """
+    global _TABLE
+    if _TABLE is None:
+        table = map_table(DEFAULT_PATH, source_key())
+        if table is None:
+            raise RuntimeError(f"Hand tables missing or stale at {DEFAULT_PATH}: "
+                               f"run 'python -m backend.hand_tables' (or start the app, which builds them)")
+        _TABLE = table
+    return _TABLE
+
+
+def load_tables(path: Optional[str] = None) -> int:
+    """Map the table for this process, building the file first if needed – a startup step"""
+    global _TABLE
+    path = path or DEFAULT_PATH
+    try:
+        _TABLE = load_or_build(path)
+    except Exception as e:
+        raise RuntimeError(f"Hand tables could not be built at {path}: {e}") from e
+    return len(_TABLE)
+
+
+# ---------------------------------------------------------------------- #
+#  Building                                                              #
+# ---------------------------------------------------------------------- #
+def source_key() -> bytes:
+    """Hash of everything an entry depends on; a file built from anything else is stale"""
+    from .poker_evaluator import PokerEvaluator
+    digest = hashlib.sha256(f"{TABLE_FORMAT_VERSION} {sys.byteorder}".encode())
+    for rule in (PokerEvaluator._get_hand_type, PokerEvaluator._get_partial_hand_type,
+                 PokerEvaluator._is_straight, PokerEvaluator._get_triggered_indices):
+        digest.update(inspect.getsource(rule).encode())
+    digest.update(repr([(rank.value, PokerEvaluator.RANK_VALUES[rank]) for rank in RANKS]).encode())
+    digest.update(repr([hand_type.value for hand_type in HAND_TYPES]).encode())
+    return digest.digest()
+
+
+def build_table() -> array:
+    """Run the evaluator's rules over every rank sequence (the slow part: seconds)"""
+    from .poker_evaluator import PokerEvaluator
+    from collections import Counter
+
+    def entry(cards: List[Card]) -> int:
+        hand_type = PokerEvaluator._get_hand_type(cards)
+        positions = PokerEvaluator._get_triggered_indices(cards, hand_type, Counter(c.rank for c in cards))
+        return HAND_TYPES.index(hand_type) << 5 | sum(1 << i for i in positions)
+
+    mixed = [intern_card(Suit.SPADES, rank) for rank in RANKS]  # the first card's suit differs
+    suited = [intern_card(Suit.HEARTS, rank) for rank in RANKS]
+    table = array("I")
+    for n in range(1, MAX_CARDS + 1):
+        for sequence in itertools.product(range(len(RANKS)), repeat=n):
+            cards = [mixed[sequence[0]]] + [suited[r] for r in sequence[1:]]
+            value = entry(cards)
+            if n == MAX_CARDS:
+                value |= entry([suited[r] for r in sequence]) << 9
+            table.append(value)
+    assert len(table) == TABLE_SIZE and table.itemsize == 4
+    return table
+
+
+def write_table(path: str, table: array, key: bytes):
+    payload = table.tobytes()
+    header = _HEADER.pack(TABLES_MAGIC, TABLE_FORMAT_VERSION, key, len(table), zlib.crc32(payload))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header.ljust(_PAYLOAD_OFFSET, b"\0"))
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def map_table(path: str, key: bytes) -> Optional[memoryview]:
+    """The entries of the file at `path`, mapped read-only – None if missing, stale or corrupt"""
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):  # missing, unreadable or empty
+        return None
+    payload = memoryview(mapped)[_PAYLOAD_OFFSET:]
+    if len(mapped) < _PAYLOAD_OFFSET:
+        magic, version, file_key, count, crc = b"", 0, b"", 0, 0
+    else:
+        magic, version, file_key, count, crc = _HEADER.unpack_from(mapped)
+    if (magic != TABLES_MAGIC or version != TABLE_FORMAT_VERSION or file_key != key
+            or count != TABLE_SIZE or len(payload) != count * 4 or zlib.crc32(payload) != crc):
+        payload.release()
+        mapped.close()
+        return None
+    return payload.cast("I")  # keeps the mapping alive
+
+
+def load_or_build(path: str) -> memoryview:
+    """Map the table at `path`, (re)building the file first if needed"""
+    key = source_key()
+    table = map_table(path, key)
+    if table is not None:
+        return table
+    lock_file = open(f"{path}.lock", "w") if fcntl is not None and _writable(path) else None
+    try:
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            table = map_table(path, key)  # another process may have built it meanwhile
+            if table is not None:
+                return table
+        started = time.perf_counter()
+        built = build_table()
+        logger.info(f"Hand tables: built {len(built)} entries in {time.perf_counter() - started:.1f}s")
+        try:
+            write_table(path, built, key)
+        except OSError as e:
+            logger.warning(f"Hand tables: could not write {path} ({e}); this process keeps a private copy")
+            return memoryview(built)
+        return map_table(path, key) or memoryview(built)
+    finally:
+        if lock_file is not None:
+            lock_file.close()
+
+
+def _writable(path: str) -> bool:
+    return os.access(os.path.dirname(os.path.abspath(path)), os.W_OK)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build (or check) the shared hand tables file")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    parser.add_argument("--force", action="store_true", help="rebuild even if the file is current")
+    args = parser.parse_args(argv)
+    key = source_key()
+    if not args.force and map_table(args.path, key) is not None:
+        print(f"{args.path}: current")
+        return 0
+    started = time.perf_counter()
+    write_table(args.path, build_table(), key)
+    print(f"{args.path}: built {TABLE_SIZE} entries in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
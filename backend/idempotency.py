@@ -0,0 +1,68 @@
+"""
+Replay cache for retried game actions.
+
+A client that timed out does not know whether its action was applied, so it
+retries with the same `Idempotency-Key`.  Each session remembers the
+serialized responses to its last few keyed actions in a small ring; a retry
+is answered from there and never reaches the engine, so it can't be applied
+twice.  Reusing a key for a *different* request is a client bug and is
+rejected rather than replayed.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+IDEMPOTENCY_RING_SIZE = 16   # keyed responses remembered per session
+MAX_KEY_LENGTH = 128
+
+
+class IdempotencyKeyReused(ValueError):
+    """The key was already used for a different request"""
+
+
+class ResponseRing:
+    """
+    The last `maxsize` keyed responses, as key → (request fingerprint,
+    status code, body).  Insertion-ordered dict: lookups are O(1) and the
+    oldest entry is evicted when full.
+    """
+    __slots__ = ("maxsize", "_entries")
+
+    def __init__(self, maxsize: int = IDEMPOTENCY_RING_SIZE):
+        self.maxsize = maxsize
+        self._entries: Dict[str, Tuple[str, int, bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, fingerprint: str) -> Optional[Tuple[int, bytes]]:
+        """(status, body) recorded for `key`, or None; raises IdempotencyKeyReused on a mismatch"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != fingerprint:
+            raise IdempotencyKeyReused(f"Idempotency key {key!r} was already used for a different request")
+        return entry[1], entry[2]
+
+    def items(self) -> List[Tuple[str, str, int, bytes]]:
+        """(key, fingerprint, status, body), oldest first – see `from_items`"""
+        return [(key, *entry) for key, entry in self._entries.items()]
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[str, str, int, bytes]], maxsize: int = IDEMPOTENCY_RING_SIZE) -> "ResponseRing":
+        ring = cls(maxsize)
+        for key, fingerprint, status, body in items:
+            ring.put(key, fingerprint, status, body)
+        return ring
+
+    def put(self, key: str, fingerprint: str, status: int, body: bytes):
+        if key not in self._entries and len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (fingerprint, status, body)
+
+
+def validate_key(key: Any) -> str:
+    """`key` if it is usable as an idempotency key (HTTP header or WebSocket "key"); ValueError if not"""
+    if not isinstance(key, str) or not 0 < len(key) <= MAX_KEY_LENGTH:
+        raise ValueError(f"Idempotency key must be a string of 1-{MAX_KEY_LENGTH} characters")
+    return key
@@ -0,0 +1,371 @@
+"""
+Background jobs: simulations, balance sweeps and deep hint searches, run off
+the request path.
+
+A job is split into *chunks* (ten games of a sweep, one depth of a hint
+search, a slice of the highscores to verify) planned when it is submitted.
+The `JobManager` – an asyncio task per job, in the server's event loop –
+sends the chunks one at a time to a small, lazily started process pool whose
+workers run at a lower CPU priority, so request handlers and interactive
+latency are unaffected.  The workers are
+started fresh (forkserver, or spawn where there is none), never forked from
+the running server with its event loop, threads and sockets; each maps the
+hand tables the server built at startup.  Between chunks it:
+
+* records the chunk's partial result (pollable / streamable right away) and
+  folds it into the job's result;
+* stops the job when it was cancelled, ran past its wall-clock limit or used
+  up its CPU-second budget (measured in the worker).  Chunks are short and
+  also get the deadline, so a limit is overshot by at most part of a chunk.
+
+Finished jobs are kept for `JOB_RETENTION` seconds, and at most `MAX_JOBS`
+jobs are held at all; the oldest finished ones make room for new ones.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from .autoplayer import DEFAULT_MAX_NODES, DEFAULT_TIME_BUDGET, MAX_DEPTH, MAX_NODES, MAX_TIME_BUDGET, search_session
+from .card_codes import card_code, parse_card_code
+from .game_engine import GameEngine, GameSession
+from .hand_tables import hand_table
+from .models import BOSS_REGISTRY
+from .replay import summarize as summarize_verification, verify_entry
+from .simulation import merge_stats, play_games, summarize
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get("BALLANTRO_JOB_WORKERS", "1"))  # processes shared by all jobs
+JOB_NICENESS = 10            # workers yield the CPU to the request-serving process
+MAX_JOBS = 64                # jobs held (queued, running and finished)
+JOB_RETENTION = 600.0        # seconds a finished job's result is kept
+DEFAULT_TIME_LIMIT = 60.0    # wall-clock seconds per job
+MAX_TIME_LIMIT = 600.0
+DEFAULT_CPU_LIMIT = 60.0     # CPU seconds per job, summed over its chunks
+MAX_CPU_LIMIT = 600.0
+MAX_GAMES = 10_000
+GAMES_PER_CHUNK = 10
+SCORES_PER_CHUNK = 50
+# How pool workers are started: never by forking the server process
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+FINISHED = frozenset({"done", "failed", "cancelled", "timed_out", "over_budget"})
+
+
+# ------------------------------------------------------------------ #
+#  Job kinds                                                         #
+# ------------------------------------------------------------------ #
+@dataclass
+class JobKind:
+    """
+    plan(engine, params)  → chunk payloads (validates `params`; runs in the server)
+    run(chunk, deadline)  → partial result (runs in a worker process)
+    merge(total, partial) → running total (None before the first chunk)
+    report(total)         → the job's reported result
+    """
+    plan: Callable[[GameEngine, Dict[str, Any]], List[Dict[str, Any]]]
+    run: Callable[[Dict[str, Any], float], Any]
+    merge: Callable[[Any, Any], Any]
+    report: Callable[[Any], Any]
+
+
+def _int_param(params: Dict[str, Any], name: str, default: int, low: int, high: int) -> int:
+    value = params.get(name, default)
+    if not isinstance(value, int) or isinstance(value, bool) or not low <= value <= high:
+        raise ValueError(f"'{name}' must be an integer in {low}-{high}")
+    return value
+
+
+def _search_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    time_ms = params.get("time_ms", DEFAULT_TIME_BUDGET * 1000)
+    if not isinstance(time_ms, (int, float)) or not 0 < time_ms <= MAX_TIME_BUDGET * 1000:
+        raise ValueError(f"'time_ms' must be a number in (0, {MAX_TIME_BUDGET * 1000:g}]")
+    return {
+        "depth": _int_param(params, "depth", 1, 0, MAX_DEPTH),
+        "max_nodes": _int_param(params, "max_nodes", DEFAULT_MAX_NODES, 1, MAX_NODES),
+        "time_budget": time_ms / 1000,
+    }
+
+
+# --- "autoplay": a balance sweep with the autoplayer ------------------ #
+def _plan_autoplay(engine: GameEngine, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    games = _int_param(params, "games", 100, 1, MAX_GAMES)
+    seed = _int_param(params, "seed", 1234, 0, 2**32 - 1)
+    search = _search_params(params)
+    return [{**search, "games": min(GAMES_PER_CHUNK, games - start), "seed": seed + start}
+            for start in range(0, games, GAMES_PER_CHUNK)]
+
+
+def _run_autoplay(chunk: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+    return play_games(chunk["games"], chunk["depth"], chunk["max_nodes"], chunk["time_budget"], chunk["seed"],
+                      deadline=deadline)
+
+
+# --- "hint": a deep search of a session's current position ----------- #
+def _plan_hint(engine: GameEngine, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    session = engine._get_session(params.get("session_id"))
+    if session.is_game_over or session.in_shop:
+        raise ValueError("No hand to play")
+    depth = _int_param(params, "depth", MAX_DEPTH, 1, MAX_DEPTH)
+    max_nodes = _int_param(params, "max_nodes", MAX_NODES, 1, MAX_NODES)
+    # A snapshot, as card codes: pool ids are local to each process
+    position = {
+        "hand": [card_code(c) for c in session.hand],
+        "deck": [card_code(c) for c in session.deck.cards],
+        "inventory": list(session.inventory_ids),
+        "boss": session.active_boss.type.value if session.is_boss_round and session.active_boss else None,
+        "current_round": session.current_round,
+        "total_score": session.total_score,
+        "hands_played": session.hands_played,
+        "draws_used": session.draws_used,
+    }
+    # Iterative deepening, one chunk per depth: each finished depth streams out as a better hint
+    return [{"position": position, "depth": d, "max_nodes": max_nodes} for d in range(1, depth + 1)]
+
+
+def _run_hint(chunk: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+    position = chunk["position"]
+    session = GameSession("job", GameEngine())
+    session.hand = [parse_card_code(c) for c in position["hand"]]
+    session.deck.cards = [parse_card_code(c) for c in position["deck"]]
+    session.inventory_ids = list(position["inventory"])
+    session.is_boss_round = position["boss"] is not None
+    session.active_boss = BOSS_REGISTRY[position["boss"]] if position["boss"] else None
+    for name in ("current_round", "total_score", "hands_played", "draws_used"):
+        setattr(session, name, position[name])
+    return search_session(session, depth=chunk["depth"], max_nodes=chunk["max_nodes"],
+                          time_budget=max(0.001, deadline - time.monotonic()))
+
+
+def _deepest_hint(total, partial):
+    # A depth that ran out of budget answers from a shallower one; keep the deepest
+    return partial if total is None or partial["depth"] >= total["depth"] else total
+
+
+# --- "verify_scores": replay the top highscores (backend.replay) ------- #
+
+
+def _plan_verify(engine: GameEngine, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    entries = [entry.dict() for entry in engine.get_highscores()]
+    return [{"entries": entries[start:start + SCORES_PER_CHUNK]}
+            for start in range(0, len(entries), SCORES_PER_CHUNK)] or [{"entries": []}]
+
+
+def _run_verify(chunk: Dict[str, Any], deadline: float) -> List[Dict[str, Any]]:
+    results = []
+    for entry in chunk["entries"]:
+        if time.monotonic() > deadline:
+            break
+        results.append(verify_entry(entry))
+    return results
+
+
+JOB_KINDS: Dict[str, JobKind] = {
+    "autoplay": JobKind(plan=_plan_autoplay, run=_run_autoplay, merge=merge_stats,
+                        report=lambda total: summarize(total) if total is not None else None),
+    "hint": JobKind(plan=_plan_hint, run=_run_hint, merge=_deepest_hint, report=lambda total: total),
+    "verify_scores": JobKind(plan=_plan_verify, run=_run_verify, merge=lambda total, part: (total or []) + part,
+                             report=lambda total: summarize_verification(total or [])),
+}
+
+
+# ------------------------------------------------------------------ #
+#  Worker side                                                       #
+# ------------------------------------------------------------------ #
+def _init_worker():
+    try:
+        os.nice(JOB_NICENESS)
+    except OSError:  # pragma: no cover – not permitted / not POSIX
+        pass
+    logging.disable(logging.INFO)  # the engine logs every action (this process only runs jobs)
+    hand_table()  # mapped from the file the server built at startup
+
+
+def _run_chunk(kind: str, chunk: Dict[str, Any], deadline: float):
+    """(partial result, CPU seconds) – `deadline` is in `time.monotonic()` terms, shared by all processes"""
+    started = time.process_time()
+    partial = JOB_KINDS[kind].run(chunk, deadline)
+    return partial, time.process_time() - started
+
+
+# ------------------------------------------------------------------ #
+#  Jobs                                                              #
+# ------------------------------------------------------------------ #
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    chunks: List[Dict[str, Any]]
+    time_limit: float
+    cpu_limit: float
+    status: str = "queued"
+    submitted: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    chunks_done: int = 0
+    cpu_seconds: float = 0.0
+    partials: List[Any] = field(default_factory=list)
+    total: Any = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = None
+    changed: Optional[asyncio.Condition] = None
+
+    def summary(self, after: Optional[int] = None) -> Dict[str, Any]:
+        """Status and progress; with `after`, the partial results from that index on"""
+        summary = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.chunks_done / len(self.chunks),
+            "chunks_done": self.chunks_done,
+            "chunks_total": len(self.chunks),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "elapsed_seconds": round((self.finished or time.time()) - self.submitted, 3),
+            "time_limit": self.time_limit,
+            "cpu_limit": self.cpu_limit,
+            "error": self.error,
+            "result": JOB_KINDS[self.kind].report(self.total),
+        }
+        if after is not None:
+            summary["partials"] = [JOB_KINDS[self.kind].report(p) for p in self.partials[after:]]
+            summary["next"] = len(self.partials)
+        return summary
+
+
+def _limit(value: Optional[float], default: float, maximum: float, name: str) -> float:
+    if value is None:
+        return default
+    if not 0 < value <= maximum:
+        raise ValueError(f"'{name}' must be in (0, {maximum:g}] seconds")
+    return float(value)
+
+
+class JobManager:
+    """Submits, tracks, streams and cancels the jobs of one server process"""
+
+    def __init__(self, engine: GameEngine, id_prefix: str = "", max_workers: int = JOB_WORKERS,
+                 max_jobs: int = MAX_JOBS, retention: float = JOB_RETENTION):
+        self.engine = engine
+        self.id_prefix = id_prefix  # the worker prefix, so serve.py routes job URLs like session URLs
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.retention = retention
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                             mp_context=multiprocessing.get_context(POOL_START_METHOD))
+        return self._pool
+
+    def _make_room(self):
+        now = time.time()
+        for job_id, job in list(self.jobs.items()):
+            if job.finished is not None and now - job.finished > self.retention:
+                del self.jobs[job_id]
+        if len(self.jobs) >= self.max_jobs:
+            oldest = next((job_id for job_id, job in self.jobs.items() if job.finished is not None), None)
+            if oldest is None:
+                raise ValueError(f"Too many running jobs (max {self.max_jobs})")
+            del self.jobs[oldest]
+
+    def submit(self, kind: str, params: Dict[str, Any], time_limit: Optional[float] = None,
+               cpu_limit: Optional[float] = None) -> Job:
+        """Plan and start a job; raises ValueError for unknown kinds or bad parameters"""
+        job_kind = JOB_KINDS.get(kind)
+        if job_kind is None:
+            raise ValueError(f"Unknown job kind: {kind!r}")
+        job = Job(
+            job_id=f"{self.id_prefix}job-{uuid.uuid4().hex}",
+            kind=kind,
+            chunks=job_kind.plan(self.engine, params),
+            time_limit=_limit(time_limit, DEFAULT_TIME_LIMIT, MAX_TIME_LIMIT, "time_limit"),
+            cpu_limit=_limit(cpu_limit, DEFAULT_CPU_LIMIT, MAX_CPU_LIMIT, "cpu_limit"),
+        )
+        self._make_room()
+        job.changed = asyncio.Condition()
+        job.task = asyncio.get_running_loop().create_task(self._run(job))
+        self.jobs[job.job_id] = job
+        logger.info(f"Job {job.job_id}: {kind} submitted, {len(job.chunks)} chunks")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Job {job_id} not found")
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """Stop a job after its current chunk; what it computed so far is kept"""
+        job = self.get(job_id)
+        if job.status not in FINISHED and job.task is not None:
+            job.task.cancel()
+        return job
+
+    async def stream(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Each partial result as it arrives, then the final summary"""
+        job = self.get(job_id)
+        sent = 0
+        while True:
+            async with job.changed:
+                await job.changed.wait_for(lambda: len(job.partials) > sent or job.status in FINISHED)
+            while sent < len(job.partials):
+                yield {"index": sent, "partial": JOB_KINDS[job.kind].report(job.partials[sent])}
+                sent += 1
+            if job.status in FINISHED:
+                yield {"job": job.summary()}
+                return
+
+    async def _finish(self, job: Job, status: str, error: Optional[str] = None):
+        job.status, job.error, job.finished = status, error, time.time()
+        logger.info(f"Job {job.job_id}: {status} after {job.chunks_done}/{len(job.chunks)} chunks"
+                    f" ({job.cpu_seconds:.2f} CPU s)")
+        async with job.changed:
+            job.changed.notify_all()
+
+    async def _run(self, job: Job):
+        loop = asyncio.get_running_loop()
+        kind = JOB_KINDS[job.kind]
+        deadline = time.monotonic() + job.time_limit
+        try:
+            for chunk in job.chunks:
+                if job.cpu_seconds >= job.cpu_limit:
+                    return await self._finish(job, "over_budget")
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return await self._finish(job, "timed_out")
+                job.status = "running"
+                future = loop.run_in_executor(self._get_pool(), _run_chunk, job.kind, chunk, deadline)
+                try:
+                    partial, cpu = await asyncio.wait_for(future, remaining)
+                except asyncio.TimeoutError:
+                    return await self._finish(job, "timed_out")
+                job.cpu_seconds += cpu
+                job.partials.append(partial)
+                job.total = kind.merge(job.total, partial)
+                job.chunks_done += 1
+                async with job.changed:
+                    job.changed.notify_all()
+            await self._finish(job, "done")
+        except asyncio.CancelledError:
+            await self._finish(job, "cancelled")
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+            await self._finish(job, "failed", str(e))
+
+    def shutdown(self):
+        for job in self.jobs.values():
+            if job.status not in FINISHED and job.task is not None:
+                job.task.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
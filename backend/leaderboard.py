@@ -0,0 +1,135 @@
+"""
+Order statistics over every saved score: rank, percentile and score-at-rank.
+
+`Leaderboard` is a Fenwick (binary indexed) tree of counts indexed by score,
+so adding a score, counting the scores above one, and finding the score at a
+given rank each take O(log S) steps, S being the highest score seen (rounded
+up to a power of two) – a few dozen list operations however many millions of
+scores are stored.  The tree grows by doubling: when a higher score arrives,
+the new upper half is empty and its top node is the running total, so growing
+never revisits old entries.
+
+The tree stops growing at `MAX_SCORE` (8 MB).  The rare scores above it are
+kept exactly, in a sorted list ranked ahead of the whole tree, so no score is
+ever rounded into a tie.
+
+Ties share the better rank: a score's rank is one plus the number of strictly
+higher scores.  `GameEngine` keeps the scores in an append-only log next to
+the highscores file and rebuilds this index from it in one linear pass.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_right, insort
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+MIN_CAPACITY = 1 << 12
+MAX_SCORE = (1 << 20) - 1  # highest score the tree indexes; higher ones go to the sorted overflow list
+
+
+class Leaderboard:
+    def __init__(self, scores: Iterable[int] = ()):
+        counts: Counter = Counter()
+        overflow: List[int] = []
+        for score, count in Counter(scores).items():  # counted in C, bucketed per distinct score
+            if score > MAX_SCORE:
+                overflow += [score] * count
+            else:
+                counts[max(score, 0)] += count
+        capacity = MIN_CAPACITY
+        while capacity <= max(counts, default=0):
+            capacity <<= 1
+        # tree[i] counts the scores in (i - lowbit(i), i], score s sitting at index s + 1
+        tree = array("q", bytes(8 * (capacity + 1)))
+        for score, count in counts.items():
+            tree[score + 1] = count
+        for i in range(1, capacity + 1):
+            parent = i + (i & -i)
+            if parent <= capacity:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._capacity = capacity
+        self._in_tree = sum(counts.values())
+        self._overflow = sorted(overflow)
+
+    def __len__(self) -> int:
+        return self._in_tree + len(self._overflow)
+
+    def add(self, score: int):
+        if score > MAX_SCORE:
+            insort(self._overflow, score)
+            return
+        score = max(score, 0)
+        while score >= self._capacity:
+            # The new upper half holds no scores yet; its top node covers everything
+            self._tree.extend(bytes(8 * self._capacity))
+            self._capacity <<= 1
+            self._tree[self._capacity] = self._in_tree
+        i = score + 1
+        tree, capacity = self._tree, self._capacity
+        while i <= capacity:
+            tree[i] += 1
+            i += i & -i
+        self._in_tree += 1
+
+    def count_at_most(self, score: int) -> int:
+        """How many stored scores are <= `score`"""
+        if score < 0:
+            return 0
+        if score > MAX_SCORE:
+            return self._in_tree + bisect_right(self._overflow, score)
+        i = min(score + 1, self._capacity)
+        count = 0
+        tree = self._tree
+        while i:
+            count += tree[i]
+            i &= i - 1
+        return count
+
+    def rank(self, score: int) -> int:
+        """1 + how many stored scores beat `score`"""
+        return 1 + len(self) - self.count_at_most(score)
+
+    def score_at_rank(self, rank: int) -> Optional[int]:
+        """The `rank`-th highest stored score (1 = best), None if there are fewer"""
+        if not 1 <= rank <= len(self):
+            return None
+        if rank <= len(self._overflow):
+            return self._overflow[-rank]
+        remaining = len(self) - rank + 1  # ... which is this many from the bottom
+        position, step = 0, self._capacity
+        tree = self._tree
+        while step:
+            if position + step <= self._capacity and tree[position + step] < remaining:
+                position += step
+                remaining -= tree[position]
+            step >>= 1
+        return position  # index position + 1 holds score `position`
+
+    def placement(self, score: int, stored: bool = True) -> Dict[str, Any]:
+        """
+        Where `score` stands among the stored scores (e.g. #4312 of 36000, top 11.98%).
+        With `stored=False` the score is not among them: it is placed as if it
+        were added, so the total counts it too.
+        """
+        rank = self.rank(score)
+        total = len(self) + (not stored)
+        return {
+            "score": score,
+            "rank": rank,
+            "total": total,
+            "top_percent": round(min(100.0, 100.0 * rank / max(total, 1)), 2),
+        }
+
+    def threshold(self, top_percent: float) -> Dict[str, Any]:
+        """The score a player needs to be within the best `top_percent` % (None while empty)"""
+        total = len(self)
+        rank = max(1, math.ceil(total * top_percent / 100))
+        return {
+            "top_percent": top_percent,
+            "score": self.score_at_rank(rank),
+            "rank": rank,
+            "total": total,
+        }
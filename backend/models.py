@@ -1,7 +1,8 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any, Union
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, Dict, Any, Union, Tuple, Iterable
 from enum import Enum, auto
 from .turbo_chips import TurboChip
+from .card_effects import MASK_CHIPS, MASK_MULTIPLIER, effect_mask
 
 class Suit(str, Enum):
     HEARTS = "hearts"
@@ -25,13 +26,27 @@ class Rank(str, Enum):
     ACE = "A"
 
 class Card(BaseModel):
+    # Cards are immutable so identical ones can be shared between sessions –
+    # build them with `intern_card` (see below) rather than `Card(...)`.
+    model_config = ConfigDict(frozen=True)
+
     suit: Suit
     rank: Rank
-    # List of *effect identifiers* applied to this specific card.
-    effects: list[str] = []  # resolved via `backend.card_effects.EFFECT_REGISTRY`
+    # *Effect identifiers* applied to this specific card (serialised as a JSON list).
+    effects: Tuple[str, ...] = ()  # resolved via `backend.card_effects` (see `effect_mask`)
     
     def __str__(self):
         return f"{self.rank}{self.suit}"
+
+    def __eq__(self, other):
+        if self is other:  # interned cards: identity is equality
+            return True
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.suit == other.suit and self.rank == other.rank and self.effects == other.effects
+
+    def __hash__(self):
+        return hash((self.suit, self.rank, self.effects))
     
     # ----------------------------  Scoring helpers  ---------------------------- #
     def _base_chip_value(self) -> int:
@@ -54,13 +69,11 @@ class Card(BaseModel):
     # ------------------------------------------------------------------------- #
     def _effect_bonus_chips(self) -> int:
         """Sum of flat chip bonuses contributed by all effects on this card."""
-        from .card_effects import EFFECT_REGISTRY  # local import to avoid cycles
-        return sum(EFFECT_REGISTRY[eff].bonus_chips() for eff in self.effects if eff in EFFECT_REGISTRY)
+        return MASK_CHIPS[effect_mask(self.effects)]
 
     def _effect_bonus_multiplier(self) -> int:
         """Sum of multiplier bonuses contributed by all effects on this card."""
-        from .card_effects import EFFECT_REGISTRY
-        return sum(EFFECT_REGISTRY[eff].bonus_multiplier() for eff in self.effects if eff in EFFECT_REGISTRY)
+        return MASK_MULTIPLIER[effect_mask(self.effects)]
 
     # Public helpers used by the evaluator
     def bonus_chips(self) -> int:
@@ -69,6 +82,63 @@ class Card(BaseModel):
     def bonus_multiplier(self) -> int:
         return self._effect_bonus_multiplier()
 
+# ---------------------------------------------------------------------- #
+#  Card interning (flyweight)                                            #
+# ---------------------------------------------------------------------- #
+# One shared instance per distinct (suit, rank, effects).  The key space is
+# small – 52 plain cards plus 52 per effect combination actually handed out –
+# so the pool is never evicted.  Only server-generated cards are interned;
+# client-supplied cards (e.g. the legacy preview route) stay ordinary objects.
+#
+# Every pooled card also gets a small integer *pool id*, so card collections
+# can be stored compactly as arrays of ids (see `backend.deck.CardArray`).
+_CARD_POOL: Dict[Tuple[Suit, Rank, Tuple[str, ...]], Card] = {}
+_CARDS_BY_ID: List[Card] = []
+_CARD_IDS: Dict[int, int] = {}  # id(pooled card) → pool id
+MAX_CARD_POOL = 0xFFFF  # pool ids are stored as unsigned 16-bit ints
+
+
+def intern_card(suit: Union[Suit, str], rank: Union[Rank, str], effects: Iterable[str] = ()) -> Card:
+    """The shared Card for (suit, rank, effects), created on first request"""
+    key = (Suit(suit), Rank(rank), tuple(effects))
+    card = _CARD_POOL.get(key)
+    if card is None:
+        if len(_CARDS_BY_ID) >= MAX_CARD_POOL:
+            raise ValueError("Card pool exhausted")
+        card = _CARD_POOL[key] = Card(suit=key[0], rank=key[1], effects=key[2])
+        _CARD_IDS[id(card)] = len(_CARDS_BY_ID)
+        _CARDS_BY_ID.append(card)
+    return card
+
+
+def interned(card: Card) -> Card:
+    """The pooled instance equal to `card`"""
+    return intern_card(card.suit, card.rank, card.effects)
+
+
+def card_id(card: Card) -> int:
+    """Pool id of `card` (interning an equal card first if it isn't pooled)"""
+    pool_id = _CARD_IDS.get(id(card))
+    if pool_id is None:
+        pool_id = _CARD_IDS[id(interned(card))]
+    return pool_id
+
+
+def card_from_id(pool_id: int) -> Card:
+    return _CARDS_BY_ID[pool_id]
+
+
+def pooled_cards() -> List[Card]:
+    return list(_CARDS_BY_ID)
+
+
+def card_pool_size() -> int:
+    return len(_CARD_POOL)
+
+
+# The 52 plain cards, in suit-major order
+STANDARD_DECK: Tuple[Card, ...] = tuple(intern_card(suit, rank) for suit in Suit for rank in Rank)
+
 class HandType(str, Enum):
     HIGH_CARD = "high_card"
     ONE_PAIR = "one_pair"
@@ -108,23 +178,46 @@ class Boss(BaseModel):
     type: BossType
     name: str
     description: str
+    # Presentation only (boss selection screen), served through `/api/catalog`
+    emoji: str = ""
+    flavor: str = ""
     
     @classmethod
-    def get_random_boss(cls) -> 'Boss':
-        """Return a random boss from the available bosses"""
+    def get_random_boss(cls, rng=None) -> 'Boss':
+        """Return a random boss from the available bosses (drawn with `rng`, default the random module)"""
         import random
-        boss_types = {
-            BossType.THIEF: {"name": "The Thief", "description": "Every time you click draw or play, he steals 1 card (it disappears)"},
-            BossType.VAMPIRE: {"name": "The Vampire", "description": "Heart cards don't score"},
-            BossType.VIP_ONLY: {"name": "VIP Only", "description": "Club cards don't score"},
-            BossType.FROZEN_GROUND: {"name": "Frozen Ground", "description": "Spade cards don't score"},
-            BossType.BLONDE_VIXEN: {"name": "Blonde Vixen", "description": "Diamond cards don't score"},
-            BossType.DRUNK: {"name": "The Drunk", "description": "25% less scoring"},
-            BossType.BARON: {"name": "The Baron", "description": "Costs $1 for each card played (scored)"},
-            BossType.DEATH: {"name": "Death", "description": "Your hand size is reduced by 2"}
-        }
-        boss_type = random.choice(list(boss_types.keys()))
-        return cls(type=boss_type, **boss_types[boss_type])
+        boss_type = (rng or random).choice(list(BOSS_REGISTRY.keys()))
+        return BOSS_REGISTRY[boss_type]
+
+# One shared, never-mutated Boss per type; sessions and states refer to it by `type`
+BOSS_REGISTRY: Dict[BossType, Boss] = {
+    boss.type: boss for boss in (
+        Boss(type=BossType.THIEF, name="The Thief", emoji="🥷",
+             description="Every time you click draw or play, he steals 1 card (it disappears)",
+             flavor="Every time you click draw or play, he steals 1 card from your deck (it disappears forever)."),
+        Boss(type=BossType.VAMPIRE, name="The Vampire", emoji="🧛",
+             description="Heart cards don't score",
+             flavor="Heart cards don't score any points. Your romantic cards are powerless against this creature of the night."),
+        Boss(type=BossType.VIP_ONLY, name="VIP Only", emoji="🎩",
+             description="Club cards don't score",
+             flavor="Club cards don't score any points. This exclusive establishment doesn't recognize your club membership."),
+        Boss(type=BossType.FROZEN_GROUND, name="Frozen Ground", emoji="❄️",
+             description="Spade cards don't score",
+             flavor="Spade cards don't score any points. The frozen earth makes digging impossible."),
+        Boss(type=BossType.BLONDE_VIXEN, name="Blonde Vixen", emoji="💎",
+             description="Diamond cards don't score",
+             flavor="Diamond cards don't score any points. She's already taken all the diamonds for herself."),
+        Boss(type=BossType.DRUNK, name="The Drunk", emoji="🍺",
+             description="25% less scoring",
+             flavor="All scoring is reduced by 25%. His intoxication affects your concentration and performance."),
+        Boss(type=BossType.BARON, name="The Baron", emoji="👑",
+             description="Costs $1 for each card played (scored)",
+             flavor="Costs $5 to play any hand. This greedy noble demands payment for every action you take."),
+        Boss(type=BossType.DEATH, name="Death", emoji="💀",
+             description="Your hand size is reduced by 2",
+             flavor="Your hand size is reduced by 2 cards. The grim reaper limits your options in life and cards."),
+    )
+}
 
 class GameState(BaseModel):
     session_id: str
@@ -143,22 +236,44 @@ class GameState(BaseModel):
     max_draws: int = 3
     is_game_over: bool = False
     is_victory: bool = False
-    # active turbo chips (max 8)
-    inventory: list[TurboChip] = []
+    # active turbo chips (max 8), as `effect_id`s – see /api/catalog
+    inventory: List[str] = []
     is_debug_mode: bool = False
     current_leg: int = 1
     total_legs: int = 10
     is_boss_round: bool = False
-    active_boss: Optional[Boss] = None
+    active_boss: Optional[BossType] = None  # boss id – see /api/catalog
+    # Incremented whenever the hand's cards or scoring context change
+    hand_version: int = 0
+    # Incremented by every state-changing action (the /api/game_state ETag)
+    state_version: int = 0
 
 class GameAction(BaseModel):
     session_id: str
     selected_cards: List[int]  # Indices of selected cards
 
+class PreviewRequest(BaseModel):
+    selected_cards: List[int]  # Indices into the session's current hand
+
+class BatchRequest(BaseModel):
+    # Ordered actions, each shaped like a WebSocket message: {"action": "buy", "index": 0}
+    actions: List[Dict[str, Any]]
+    atomic: bool = True  # roll everything back if any action fails
+
+class JobRequest(BaseModel):
+    kind: str                          # "autoplay", "hint" or "verify_scores" – see backend.jobs.JOB_KINDS
+    session_id: Optional[str] = None   # the session a "hint" job searches
+    params: Dict[str, Any] = {}
+    time_limit: Optional[float] = None  # wall-clock seconds
+    cpu_limit: Optional[float] = None   # CPU seconds
+
 class HighScore(BaseModel):
     name: str
     score: int
     timestamp: str
+    # The game, for replay verification (backend.replay); absent on older entries
+    seed: Optional[int] = None
+    transcript: Optional[str] = None  # backend.transcript, as text
 
 class SaveScoreRequest(BaseModel):
     name: str
@@ -1,9 +1,10 @@
 from typing import List, Dict, Tuple, Optional, Any
 from collections import Counter, defaultdict
 from .models import Card, HandType, HandResult, Rank, Suit
-import logging
+from .card_effects import MASK_CHIPS, MASK_MONEY, MASK_MULTIPLIER, MASK_RANDOM, effect_mask
+from .boss_modifiers import BLOCKED_SUITS_TEXT, SUIT_BITS
+from .hand_tables import classify
 import random
-import inspect
 
 class PokerEvaluator:
     """Comprehensive poker hand evaluation with exact scoring"""
@@ -31,104 +32,73 @@ class PokerEvaluator:
     # Low Ace straight (A-2-3-4-5)
     LOW_ACE_STRAIGHT = [14, 2, 3, 4, 5]
     
-    # Boss effects tracking
-    _blocked_suits = {}  # session_id -> Suit
-    
     @classmethod
-    def evaluate_hand(cls, cards: List[Card]) -> HandResult:
-        """Evaluate a poker hand and return complete scoring information"""
+    def evaluate_hand(cls, cards: List[Card], rng: Optional[random.Random] = None,
+                      blocked_suits: int = 0) -> HandResult:
+        """
+        Evaluate a poker hand and return complete scoring information.
+        Random card effects draw from `rng` (default: the random module);
+        cards of the suits in `blocked_suits` (a boss's `SUIT_BITS` mask,
+        see backend.boss_modifiers) add no chips and no static bonuses.
+        """
         if len(cards) < 1 or len(cards) > 5:
             raise ValueError("Hand must contain between 1 and 5 cards")
         
-        # Pre-compute rank occurrences for helper use
-        rank_counts = Counter([card.rank for card in cards])
-
-        # Determine hand type first
-        hand_type = cls._get_hand_type(cards)
-        
-        # Get session ID from the monkey-patched _apply_turbo method
-        session_id = None
-        for frame in inspect.stack():
-            if '_apply_turbo' in frame.function:
-                # Extract session_id from the frame's arguments
-                if 'session_id' in frame.frame.f_locals:
-                    session_id = frame.frame.f_locals['session_id']
-                    break
-        
-        # Check for blocked suits from boss effects
-        blocked_suit = cls._blocked_suits.get(session_id)
-        
-        # Filter out cards with blocked suits for scoring
-        scoring_cards = cards
-        if blocked_suit:
-            scoring_cards = [card for card in cards if card.suit != blocked_suit]
-            if not scoring_cards:  # If all cards are blocked, use original cards but with zero value
-                scoring_cards = cards
-                logging.info(f"All cards blocked by boss effect. Using original cards with zero value.")
-
-        # Figure out which concrete cards actually contribute to the
-        # scored combination (see _get_triggered_indices docstring).
-        triggered_indices = cls._get_triggered_indices(cards, hand_type, rank_counts)
+        # Hand type, and which concrete cards actually contribute to the
+        # scored combination: looked up in the precomputed tables, built
+        # from _get_hand_type / _get_triggered_indices (backend.hand_tables)
+        hand_type, triggered_indices = classify(cards)
         triggered_cards   = [cards[i] for i in triggered_indices]
 
         # ------------------------------------------------------------------ #
         # 1)  Calculate **card chips** & accumulated bonuses (triggered)     #
         # ------------------------------------------------------------------ #
-        base_card_chips = sum(c._base_chip_value() for c in cards if blocked_suit is None or c.suit != blocked_suit)
+        base_card_chips = sum(c._base_chip_value() for c in cards if not SUIT_BITS[c.suit] & blocked_suits)
         bonus_chips     = 0
         bonus_multiplier = 0
         money_bonus     = 0
 
+        # Every bonus comes from the compiled effect tables (see backend.card_effects)
+        masks = [effect_mask(card.effects) for card in triggered_cards]
         applied_bonuses_descriptions: List[str] = []
-        for card in triggered_cards:
+        for card, mask in zip(triggered_cards, masks):
+            if not mask:
+                continue
             # Static chip / mult bonuses
-            if blocked_suit is None or card.suit != blocked_suit:
-                bonus_chips += card.bonus_chips()
-                bonus_multiplier += card.bonus_multiplier()
+            if not SUIT_BITS[card.suit] & blocked_suits:
+                bonus_chips += MASK_CHIPS[mask]
+                bonus_multiplier += MASK_MULTIPLIER[mask]
 
-            # --- dynamic / money effects --------------------------------- #
-            for eff in card.effects:
-                if eff.startswith("bonus_money_"):
-                    try:
-                        money_bonus += int(eff.split("_")[-1])
-                    except ValueError:
-                        pass
-                elif eff == "bonus_random":
-                    outcome = random.choice(["money", "mult", "chips"])
-                    if outcome == "money":
-                        money_bonus    += 1
-                        applied_bonuses_descriptions.append(
-                            f"{card.rank.value}{card.suit.value[0].upper()}: Mystery → +$1"
-                        )
-                    elif outcome == "mult":
-                        bonus_multiplier += 5
-                        applied_bonuses_descriptions.append(
-                            f"{card.rank.value}{card.suit.value[0].upper()}: Mystery → +5× Mult"
-                        )
-                    else:  # chips
-                        bonus_chips += 25
-                        applied_bonuses_descriptions.append(
-                            f"{card.rank.value}{card.suit.value[0].upper()}: Mystery → +25 Chips"
-                        )
+            # --- money / random effects ---------------------------------- #
+            money_bonus += MASK_MONEY[mask]
+            for outcomes in MASK_RANDOM[mask]:
+                outcome = (rng or random).choice(outcomes)
+                bonus_chips += outcome.chips
+                bonus_multiplier += outcome.multiplier
+                money_bonus += outcome.money
+                applied_bonuses_descriptions.append(
+                    f"{card.rank.value}{card.suit.value[0].upper()}: {outcome.text}"
+                )
 
         card_chips = base_card_chips + bonus_chips
 
         # Collect applied bonus descriptions for static bonuses as well
-        for card in triggered_cards:
+        for card, mask in zip(triggered_cards, masks):
+            if not (MASK_CHIPS[mask] or MASK_MULTIPLIER[mask]) or SUIT_BITS[card.suit] & blocked_suits:
+                continue
             card_name_str = f"{card.rank.value} of {card.suit.value.capitalize()}" # e.g. "Ace of Spades"
-            if card.bonus_chips() > 0 and (blocked_suit is None or card.suit != blocked_suit):
+            if MASK_CHIPS[mask] > 0:
                 applied_bonuses_descriptions.append(
-                    f"{card_name_str}: +{card.bonus_chips()} Bonus Chips"
+                    f"{card_name_str}: +{MASK_CHIPS[mask]} Bonus Chips"
                 )
-            if card.bonus_multiplier() > 0 and (blocked_suit is None or card.suit != blocked_suit):
+            if MASK_MULTIPLIER[mask] > 0:
                 applied_bonuses_descriptions.append(
-                    f"{card_name_str}: +{card.bonus_multiplier()} Bonus Multiplier"
+                    f"{card_name_str}: +{MASK_MULTIPLIER[mask]} Bonus Multiplier"
                 )
         
         # Add boss effect description if applicable
-        if blocked_suit:
-            suit_name = blocked_suit.value.capitalize()
-            applied_bonuses_descriptions.append(f"Boss Effect: {suit_name} cards don't score")
+        if blocked_suits:
+            applied_bonuses_descriptions.append(BLOCKED_SUITS_TEXT[blocked_suits])
         
         # Get scoring information
         score_info = cls.HAND_SCORES[hand_type]
@@ -160,19 +130,6 @@ class PokerEvaluator:
             triggered_indices=triggered_indices,
         )
     
-    @classmethod
-    def set_blocked_suit(cls, session_id: str, suit: Optional[Suit]):
-        """Set a blocked suit for a session (for boss effects)"""
-        if suit:
-            cls._blocked_suits[session_id] = suit
-        elif session_id in cls._blocked_suits:
-            del cls._blocked_suits[session_id]
-    
-    @classmethod
-    def clear_session(cls, session_id: str):
-        """Clear any session-specific data when a session ends"""
-        cls._blocked_suits.pop(session_id, None)
-    
     @classmethod
     def _get_hand_type(cls, cards: List[Card]) -> HandType:
         """Determine the poker hand type"""
@@ -470,8 +427,9 @@ class PokerEvaluator:
         base_chips = score_config["base_chips"]
         base_multiplier = score_config["multiplier"]
         # Include possible bonuses from special cards during preview
-        bonus_chips = sum(card.bonus_chips() for card in cards)
-        bonus_multiplier = sum(card.bonus_multiplier() for card in cards)
+        masks = [effect_mask(card.effects) for card in cards]
+        bonus_chips = sum(MASK_CHIPS[mask] for mask in masks)
+        bonus_multiplier = sum(MASK_MULTIPLIER[mask] for mask in masks)
         multiplier = base_multiplier + bonus_multiplier
 
         return {
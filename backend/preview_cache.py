@@ -0,0 +1,114 @@
+"""
+Bounded LRU cache for `/api/preview_hand` responses.
+
+A preview only depends on the *multiset* of selected cards (rank, suit and
+effects) – never on the order in which the player clicked them – so the key
+is a sorted tuple of per-card tuples.  Values are the fully serialised JSON
+response bodies, which lets a cache hit skip Pydantic validation, evaluation
+and JSON encoding altogether.
+"""
+from __future__ import annotations
+
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .models import Suit, Rank
+from .card_codes import parse_card_code
+from .card_effects import RANDOM_EFFECT_NAMES
+
+# Effects whose outcome is rolled at evaluation time – previews containing
+# them must be recomputed on every request, exactly as before caching.
+NONDETERMINISTIC_EFFECTS = RANDOM_EFFECT_NAMES
+
+_VALID_SUITS = frozenset(s.value for s in Suit)
+_VALID_RANKS = frozenset(r.value for r in Rank)
+
+CardKey = Tuple[str, str, Tuple[str, ...]]
+SelectionKey = Tuple[CardKey, ...]
+
+
+def canonical_card_key(card: Any) -> CardKey:
+    """
+    (rank, suit, sorted effects) for a raw JSON card dict or card code.
+
+    Only the three fields that influence scoring are looked at, and their
+    values are checked against the enums so that malformed input can never
+    produce a key that collides with a valid selection.
+    """
+    if isinstance(card, str):  # compact code, e.g. "KD+bonus_chips_50"
+        card = parse_card_code(card)
+        return card.rank.value, card.suit.value, tuple(sorted(card.effects))
+    if not isinstance(card, dict):
+        raise ValueError("Each card must be an object or a card code")
+    rank, suit = card.get("rank"), card.get("suit")
+    if rank not in _VALID_RANKS:
+        raise ValueError(f"Invalid rank: {rank!r}")
+    if suit not in _VALID_SUITS:
+        raise ValueError(f"Invalid suit: {suit!r}")
+    effects = card.get("effects") or ()
+    if not isinstance(effects, (list, tuple)) or not all(isinstance(e, str) for e in effects):
+        raise ValueError("Card effects must be a list of strings")
+    return rank, suit, tuple(sorted(effects))
+
+
+def canonical_selection_key(cards: Iterable[Any]) -> SelectionKey:
+    """Order-independent key for a whole selection."""
+    return tuple(sorted(canonical_card_key(c) for c in cards))
+
+
+def is_cacheable(key: SelectionKey) -> bool:
+    return not any(eff in NONDETERMINISTIC_EFFECTS for _, _, effects in key for eff in effects)
+
+
+class PreviewCache:
+    """Plain LRU over an `OrderedDict`, with hit / miss / eviction counters."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[SelectionKey, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncacheable = 0
+
+    def get(self, key: SelectionKey) -> Optional[bytes]:
+        payload = self._data.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, key: SelectionKey, payload: bytes):
+        self._data[key] = payload
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = self.evictions = self.uncacheable = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "uncacheable": self.uncacheable,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+def serialize_preview(preview: Optional[Dict[str, Any]]) -> bytes:
+    """Exactly the body the endpoint used to return via FastAPI's JSON encoder."""
+    return json.dumps({"success": True, "preview": preview}, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,132 @@
+"""
+Replay verification of saved games.
+
+A finished session keeps its `seed` and a transcript of its actions (see
+`backend.transcript`), and `GameEngine.save_score` stores both with the
+highscore.  `replay` re-executes them directly on a `GameSession` – no HTTP,
+no engine bookkeeping, the engine's info logging muted for the replaying
+context only – and `verify_entry` checks that the replayed game is over with
+exactly the claimed score.  Entries without a transcript, or recorded under
+rules this build doesn't play, are skipped (`skipped`), not failed.
+
+`verify_entries` checks a whole leaderboard, spread over worker processes:
+`python -m benchmarks.replay --highscores highscores.json` from the command
+line, or the "verify_scores" background job on a live server.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from .game_engine import GameEngine, GameSession
+from .game_engine import logger as engine_logger
+from .transcript import ACTION_METHODS, DRAW, PLAY, RULES_VERSION, decode, from_text, rules_version
+
+REPLAY_SESSION_ID = "replay"
+MIN_ENTRIES_PER_WORKER = 8  # smaller leaderboards are verified in-process
+
+_ENGINE = GameEngine()  # only generates shop items; holds no sessions
+
+
+# Set while the current thread or task replays; other requests keep logging
+_REPLAYING: ContextVar[bool] = ContextVar("replaying", default=False)
+
+
+def _not_replaying(record: logging.LogRecord) -> bool:
+    return record.levelno >= logging.WARNING or not _REPLAYING.get()
+
+
+engine_logger.addFilter(_not_replaying)
+
+
+@contextmanager
+def quiet_logging() -> Iterator[None]:
+    """The engine logs every action; replays don't"""
+    token = _REPLAYING.set(True)
+    try:
+        yield
+    finally:
+        _REPLAYING.reset(token)
+
+
+def replay(seed: int, transcript: bytes) -> GameSession:
+    """The session after re-running `transcript` from `seed`; ValueError if an action is rejected"""
+    session = GameSession(REPLAY_SESSION_ID, _ENGINE, seed=seed)
+    for number, (opcode, args) in enumerate(decode(transcript)):
+        method = getattr(session, ACTION_METHODS[opcode])
+        try:
+            if opcode in (DRAW, PLAY):
+                method(args)
+            else:
+                method(*args)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Action {number} ({ACTION_METHODS[opcode]}) rejected: {e}") from None
+    return session
+
+
+def verify_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replay one highscore entry (a `HighScore` as a dict).  Returns the claimed
+    and replayed scores, `verified`, and the `reason` when it is not.
+    """
+    claimed = entry.get("score")
+    result = {"name": entry.get("name"), "timestamp": entry.get("timestamp"), "claimed": claimed,
+              "replayed": None, "verified": False, "skipped": False, "reason": None}
+    if entry.get("seed") is None or entry.get("transcript") is None:
+        result["skipped"] = True  # saved before games were recorded: nothing to replay
+        result["reason"] = "no transcript recorded"
+        return result
+    try:
+        transcript = from_text(entry["transcript"])
+        version = rules_version(transcript)
+        if version != RULES_VERSION:
+            result["skipped"] = True
+            result["reason"] = f"recorded under rules version {version}; this build replays version {RULES_VERSION}"
+            return result
+        with quiet_logging():
+            session = replay(entry["seed"], transcript)
+    except ValueError as e:
+        result["reason"] = str(e)
+        return result
+    except Exception as e:  # a corrupt entry must not stop a batch
+        result["reason"] = f"replay failed: {e}"
+        return result
+    result["replayed"] = session.total_score
+    if not session.is_game_over:
+        result["reason"] = "replayed game is not over"
+    elif session.total_score != claimed:
+        result["reason"] = f"replayed score {session.total_score} differs from the claimed {claimed}"
+    else:
+        result["verified"] = True
+    return result
+
+
+def _init_worker():
+    logging.disable(logging.INFO)
+
+
+def verify_entries(entries: List[Dict[str, Any]], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """`verify_entry` for every entry, in order, spread over `workers` processes (default: all cores)"""
+    workers = min(workers or os.cpu_count() or 1, len(entries) // MIN_ENTRIES_PER_WORKER)
+    if workers <= 1:
+        return [verify_entry(entry) for entry in entries]
+    # Several entries per task: a replay takes milliseconds, a round trip to a worker not much less
+    chunksize = max(1, len(entries) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(verify_entry, entries, chunksize=chunksize))
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Counts, plus the entries that failed verification (skipped ones are only counted)"""
+    failed = [r for r in results if not r["verified"] and not r["skipped"]]
+    skipped = sum(1 for r in results if r["skipped"])
+    return {
+        "entries": len(results),
+        "verified": len(results) - len(failed) - skipped,
+        "skipped": skipped,
+        "failed": failed,
+    }
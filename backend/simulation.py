@@ -0,0 +1,109 @@
+"""
+Whole games played by the autoplayer (`backend.autoplayer`), for balance runs
+– `python -m benchmarks.autoplay` and the "autoplay" background job.
+
+`play_games` returns raw, mergeable counters so a long run can be split into
+chunks (see `backend.jobs`); `summarize` turns them into the reported numbers.
+"""
+from __future__ import annotations
+
+import random
+import statistics
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from .autoplayer import suggest_move
+from .game_engine import GameEngine, GameSession
+from .transcript import to_text
+
+
+def _shop(engine: GameEngine, session: GameSession):
+    """Buy affordable turbo chips (room permitting), then continue"""
+    # The next round's boss is already known: keep its play fee (the Baron's) in hand
+    budget = session.money - session.boss_modifier.play_fee
+    bought = True
+    while bought and len(session.inventory_ids) < 8:
+        bought = False
+        for index, item in enumerate(session.shop_items):
+            if item["item_type"] == "turbo" and budget >= session.turbo_chip_cost:
+                budget -= session.turbo_chip_cost
+                engine.buy_card(session.session_id, index)
+                bought = True
+                break
+    engine.proceed_to_next_round(session.session_id)
+
+
+def play_games(games: int, depth: int, max_nodes: int, time_budget: float, seed: int,
+               deadline: Optional[float] = None, record: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Play `games` games with the autoplayer: every draw / play comes from
+    `suggest_move`, and in the shop it buys turbo chips while it can afford
+    them.  Stops early (fewer games) once `deadline` (`time.monotonic()`) passes.
+    With `record`, each game is appended to it as a highscore-style entry
+    (score, seed, transcript) for `backend.replay`.
+    """
+    random.seed(seed)
+    engine = GameEngine()
+    stats = {"games": 0, "victories": 0, "rounds_cleared": Counter(), "lost_in_round": Counter(),
+             "decision_times": [], "completed_depths": Counter()}
+    for _ in range(games):
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        session = engine.sessions[engine.new_game().session_id]
+        cleared = 0
+        while not session.is_game_over:
+            if session.in_shop:
+                cleared += 1
+                _shop(engine, session)
+                continue
+            started = time.perf_counter()
+            move = suggest_move(session, depth=depth, max_nodes=max_nodes, time_budget=time_budget)
+            stats["decision_times"].append(time.perf_counter() - started)
+            stats["completed_depths"][move["depth"]] += 1
+            if move["action"] == "play":
+                engine.play_hand(session.session_id, move["cards"])
+            else:
+                engine.draw_cards(session.session_id, move["cards"])
+        stats["games"] += 1
+        if session.is_victory:
+            stats["victories"] += 1
+        else:
+            stats["lost_in_round"][session.current_round] += 1
+        stats["rounds_cleared"][cleared + session.is_victory] += 1
+        if record is not None:
+            record.append({"name": "autoplayer", "score": session.total_score, "seed": session.seed,
+                           "transcript": to_text(session.transcript)})
+        del engine.sessions[session.session_id]
+    return stats
+
+
+def merge_stats(total: Optional[Dict[str, Any]], part: Dict[str, Any]) -> Dict[str, Any]:
+    """`total` plus another `play_games` result"""
+    if total is None:
+        return part
+    return {
+        "games": total["games"] + part["games"],
+        "victories": total["victories"] + part["victories"],
+        "rounds_cleared": total["rounds_cleared"] + part["rounds_cleared"],
+        "lost_in_round": total["lost_in_round"] + part["lost_in_round"],
+        "decision_times": total["decision_times"] + part["decision_times"],
+        "completed_depths": total["completed_depths"] + part["completed_depths"],
+    }
+
+
+def summarize(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Reported numbers for (merged) `play_games` results"""
+    cleared = list(stats["rounds_cleared"].elements())
+    times = sorted(stats["decision_times"])
+    return {
+        "games": stats["games"],
+        "victories": stats["victories"],
+        "rounds_cleared_mean": statistics.mean(cleared) if cleared else 0.0,
+        "rounds_cleared_median": statistics.median(cleared) if cleared else 0,
+        "lost_in_round": dict(sorted(stats["lost_in_round"].items())),
+        "decisions": len(times),
+        "decisions_per_second": len(times) / sum(times) if times else 0.0,
+        "decision_ms_p99": times[int(len(times) * 0.99)] * 1000 if times else 0.0,
+        "completed_depths": dict(sorted(stats["completed_depths"].items())),
+    }
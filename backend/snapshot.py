@@ -0,0 +1,186 @@
+"""
+Session snapshot files, for warm restarts.
+
+On shutdown the engine streams every live session into one file (see
+`GameEngine.save_snapshot`); on startup the next process memory-maps it and
+restores each session only when it is first looked up, so startup costs the
+same with ten sessions or fifty thousand.
+
+Layout::
+
+    magic line
+    record … record            one compact JSON object per session (GameSession.to_record)
+    index                      fixed-width entries, sorted by session id:
+                               id (NUL-padded to `width` bytes), offset, length
+    trailer                    index offset, entry count, width
+
+Records are written one at a time through a buffered file, to a temporary
+name replaced atomically at the end, so a crash mid-write leaves any older
+snapshot intact.  A lookup is a binary search over the mapped index.
+
+Under serve.py each worker keeps its own file (`snapshot_path`), holding the
+sessions it owns.  Restarted with fewer workers, the router sends the
+sessions of the workers that are gone to others; `rebalance_snapshots` moves
+their records into those workers' files before any worker starts.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"BALLANTRO-SESSIONS 1\n"
+_TRAILER = struct.Struct("<QQI")  # index offset, entries, id width
+_WORKER_SNAPSHOT = re.compile(r"^sessions-w(\d+)\.snapshot$")
+
+
+def _entry_struct(width: int) -> struct.Struct:
+    return struct.Struct(f"<{width}sQI")
+
+
+def snapshot_path(data_dir: str, worker_id: Optional[Any] = None) -> str:
+    """Where a serve.py worker – or, with no id, a single-process server – keeps its snapshot"""
+    return os.path.join(data_dir, "sessions.snapshot" if worker_id is None else f"sessions-w{worker_id}.snapshot")
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_snapshot(path: str, records: Iterable[Tuple[str, bytes]]) -> int:
+    """Stream (session id, encoded record) pairs into a snapshot at `path`; returns the count"""
+    index: List[Tuple[bytes, int, int]] = []
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        offset = len(SNAPSHOT_MAGIC)
+        for session_id, body in records:
+            index.append((session_id.encode("utf-8"), offset, len(body)))
+            f.write(body)
+            offset += len(body)
+        index.sort()
+        width = max((len(key) for key, _, _ in index), default=1)
+        entry = _entry_struct(width)
+        for key, start, length in index:
+            f.write(entry.pack(key, start, length))
+        f.write(_TRAILER.pack(offset, len(index), width))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(index)
+
+
+class SessionSnapshot:
+    """A snapshot file, mapped read-only; each record can be taken once"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < len(SNAPSHOT_MAGIC) + _TRAILER.size:
+                raise ValueError(f"{path} is not a session snapshot")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a session snapshot (or an incompatible version)")
+        self._index_offset, self._count, width = _TRAILER.unpack_from(self._map, size - _TRAILER.size)
+        self._entry = _entry_struct(width)
+        self._width = width
+        self._taken: Set[str] = set()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _find(self, session_id: str) -> Optional[Tuple[int, int]]:
+        key = session_id.encode("utf-8")
+        if len(key) > self._width:
+            return None
+        key = key.ljust(self._width, b"\0")
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            found, start, length = self._entry.unpack_from(self._map, self._index_offset + mid * self._entry.size)
+            if found < key:
+                low = mid + 1
+            elif found > key:
+                high = mid
+            else:
+                return start, length
+        return None
+
+    def take(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The record of `session_id`, decoded – None if absent or already taken"""
+        if session_id in self._taken:
+            return None
+        location = self._find(session_id)
+        if location is None:
+            return None
+        self._taken.add(session_id)
+        start, length = location
+        return json.loads(self._map[start:start + length])
+
+    def _entries(self) -> Iterator[Tuple[str, int, int]]:
+        for i in range(self._count):
+            key, start, length = self._entry.unpack_from(self._map, self._index_offset + i * self._entry.size)
+            yield key.rstrip(b"\0").decode("utf-8"), start, length
+
+    def session_ids(self) -> Iterator[str]:
+        """Every session id in the file (taken or not), without reading the records"""
+        return (session_id for session_id, _, _ in self._entries())
+
+    def remaining(self, keep: Callable[[str], bool] = lambda session_id: True) -> Iterator[Tuple[str, bytes]]:
+        """
+        (session id, encoded record) for every record not taken – and whose id
+        passes `keep` – ready for `write_snapshot`
+        """
+        for session_id, start, length in self._entries():
+            if session_id not in self._taken and keep(session_id):
+                yield session_id, self._map[start:start + length]
+
+    def close(self):
+        self._map.close()
+
+
+def rebalance_snapshots(data_dir: str, workers: int, owner: Callable[[str], int]) -> int:
+    """
+    Move every record in the workers' snapshot files under `data_dir` to the
+    file of the worker that will own its session (`owner(session_id)`, below
+    `workers`), and remove the files of workers beyond `workers`.  Only files
+    with a misplaced record are rewritten.  Returns how many records moved.
+    """
+    snapshots: Dict[int, SessionSnapshot] = {}
+    for name in sorted(os.listdir(data_dir or ".")):
+        match = _WORKER_SNAPSHOT.match(name)
+        if not match:
+            continue
+        try:
+            snapshots[int(match.group(1))] = SessionSnapshot(os.path.join(data_dir, name))
+        except (OSError, ValueError) as e:
+            logger.error(f"Snapshot: ignoring {name}: {e}")
+    try:
+        moved = {worker: sum(1 for session_id in snapshot.session_ids() if owner(session_id) != worker)
+                 for worker, snapshot in snapshots.items()}
+        if not any(moved.values()):
+            return 0
+        # Records are streamed from the mapped files; a file being replaced stays mapped until closed
+        targets = sorted({owner(session_id) for snapshot in snapshots.values() for session_id in snapshot.session_ids()}
+                         | {worker for worker in snapshots if worker < workers})
+        for target in targets:
+            write_snapshot(snapshot_path(data_dir, target),
+                           chain.from_iterable(snapshot.remaining(lambda session_id: owner(session_id) == target)
+                                               for snapshot in snapshots.values()))
+        for worker in snapshots:
+            if worker >= workers:
+                os.unlink(snapshot_path(data_dir, worker))
+        logger.info(f"Snapshot: moved {sum(moved.values())} sessions to the files of the workers now owning them "
+                    f"({workers} workers)")
+        return sum(moved.values())
+    finally:
+        for snapshot in snapshots.values():
+            snapshot.close()
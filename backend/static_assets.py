@@ -0,0 +1,332 @@
+"""
+Startup-time static asset pipeline.
+
+Every file under `static/` is read once and content-hashed at startup; text
+types are compressed with gzip – and brotli, when the optional `brotli`
+package is installed – the first time a client asks for them, then kept.
+Assets are served from memory:
+
+* ``/static/css/base.<hash>.css`` – fingerprinted name, cached by browsers
+  for a year (`immutable`), never revalidated;
+* ``/static/css/base.css`` – original name, still works, but revalidates
+  through its ETag (`no-cache`) so edits are picked up.
+
+Single byte ranges are honoured (206, `Accept-Ranges: bytes`), so audio and
+video can seek; they are cut from the uncompressed body.
+
+References to `/static/...` inside HTML, CSS and JS are rewritten to the
+fingerprinted names.  Binary assets (images, sounds) are hashed first so the
+CSS / JS files that point at them get hashes reflecting those references.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.responses import Response
+
+try:  # optional dependency – gzip alone is fine
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+HASH_LENGTH = 10
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+# Text formats worth compressing / scanning for `/static/...` references
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".html", ".svg", ".json", ".txt", ".ico"}
+REWRITABLE_SUFFIXES = {".css", ".js", ".html"}
+MIN_COMPRESS_SIZE = 256
+IGNORED_SUFFIXES = {".old"}
+
+_STATIC_REF = re.compile(r"/static/([A-Za-z0-9_\-./]+)")
+
+
+@dataclass
+class StaticAsset:
+    path: str                 # original path relative to the static root ("css/base.css")
+    hashed_path: str          # fingerprinted path ("css/base.1a2b3c4d5e.css")
+    digest: str
+    content_type: str
+    body: bytes
+    compressible: bool = True
+    _variants: Optional[Dict[str, bytes]] = field(default=None, repr=False)
+
+    @property
+    def variants(self) -> Dict[str, bytes]:
+        """encoding → body; compressed lazily so startup only pays for hashing"""
+        if self._variants is None:
+            self._variants = compressed_variants(self.body) if self.compressible else {"identity": self.body}
+        return self._variants
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+
+def _hashed_name(path: str, digest: str) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest}{ext}"
+
+
+def compressed_variants(body: bytes) -> Dict[str, bytes]:
+    """identity + every precompressed encoding that actually saves bytes."""
+    variants = {"identity": body}
+    if len(body) < MIN_COMPRESS_SIZE:
+        return variants
+    gz = gzip.compress(body, compresslevel=9, mtime=0)
+    if len(gz) < len(body):
+        variants["gzip"] = gz
+    if brotli is not None:
+        br = brotli.compress(body, quality=11)
+        if len(br) < len(body):
+            variants["br"] = br
+    return variants
+
+
+def _negotiate(accept_encoding: str, available: Iterable[str]) -> str:
+    """Pick br > gzip > identity among the encodings the client accepts (q > 0)."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            accepted[token.lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return "identity"
+
+
+class AssetPipeline:
+    """In-memory, fingerprinted and precompressed copy of a static directory."""
+
+    def __init__(self, directory: str, url_prefix: str = "/static"):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip("/")
+        self.assets: Dict[str, StaticAsset] = {}       # original path → asset
+        self.by_hashed: Dict[str, StaticAsset] = {}    # hashed path → asset
+        self.manifest: Dict[str, str] = {}             # original path → hashed path
+
+    # ------------------------------------------------------------------ #
+    #  Build                                                             #
+    # ------------------------------------------------------------------ #
+    def build(self) -> "AssetPipeline":
+        files = sorted(self._walk())
+        leaves = [f for f in files if os.path.splitext(f)[1] not in REWRITABLE_SUFFIXES]
+        texts = [f for f in files if os.path.splitext(f)[1] in REWRITABLE_SUFFIXES]
+        # Leaves first so text files can reference their fingerprinted names.
+        for rel in leaves + texts:
+            with open(os.path.join(self.directory, rel), "rb") as f:
+                body = f.read()
+            if rel in texts:
+                body = self.rewrite(body.decode("utf-8")).encode("utf-8")
+            self._add(rel, body)
+        logger.info(
+            "Static asset pipeline: %d files, %d KiB raw%s",
+            len(self.assets),
+            sum(len(a.body) for a in self.assets.values()) // 1024,
+            "" if brotli is None else ", brotli enabled",
+        )
+        return self
+
+    def _walk(self) -> List[str]:
+        out = []
+        for root, _dirs, names in os.walk(self.directory):
+            for name in names:
+                if os.path.splitext(name)[1] in IGNORED_SUFFIXES:
+                    continue
+                out.append(os.path.relpath(os.path.join(root, name), self.directory).replace(os.sep, "/"))
+        return out
+
+    def _add(self, rel: str, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+        content_type = mimetypes.guess_type(rel)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        compressible = os.path.splitext(rel)[1] in COMPRESSIBLE_SUFFIXES
+        asset = StaticAsset(rel, _hashed_name(rel, digest), digest, content_type, body, compressible)
+        self.assets[rel] = asset
+        self.by_hashed[asset.hashed_path] = asset
+        self.manifest[rel] = asset.hashed_path
+
+    # ------------------------------------------------------------------ #
+    #  References                                                        #
+    # ------------------------------------------------------------------ #
+    def url_for(self, rel: str) -> str:
+        return f"{self.url_prefix}/{self.manifest.get(rel, rel)}"
+
+    def rewrite(self, text: str) -> str:
+        """Replace `/static/<known file>` references with fingerprinted URLs."""
+        def _sub(match: "re.Match[str]") -> str:
+            rel = match.group(1)
+            return self.url_for(rel) if rel in self.manifest else match.group(0)
+        return _STATIC_REF.sub(_sub, text)
+
+    # ------------------------------------------------------------------ #
+    #  Serving                                                           #
+    # ------------------------------------------------------------------ #
+    def lookup(self, path: str) -> Tuple[Optional[StaticAsset], bool]:
+        """(asset, is_fingerprinted) for a request path relative to the static root."""
+        asset = self.by_hashed.get(path)
+        if asset is not None:
+            return asset, True
+        return self.assets.get(path), False
+
+    def response(self, path: str, accept_encoding: str = "", if_none_match: str = "",
+                 head: bool = False, range_header: str = "", if_range: str = "") -> Optional[Response]:
+        asset, fingerprinted = self.lookup(path)
+        if asset is None:
+            return None
+        return _variant_response(asset, IMMUTABLE_CACHE if fingerprinted else REVALIDATE_CACHE,
+                                 accept_encoding, if_none_match, head, range_header, if_range)
+
+    def stats(self) -> Dict[str, int]:
+        """Total bytes per encoding (compresses every asset not yet compressed)"""
+        return {
+            "files": len(self.assets),
+            "bytes_identity": sum(len(a.variants["identity"]) for a in self.assets.values()),
+            "bytes_gzip": sum(len(a.variants.get("gzip", a.variants["identity"])) for a in self.assets.values()),
+            "bytes_br": sum(len(a.variants.get("br", a.variants.get("gzip", a.variants["identity"])))
+                            for a in self.assets.values()),
+        }
+
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (first, last) byte of a single `bytes=` range, None to ignore the header
+    (malformed, other units, several ranges); ValueError if unsatisfiable.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if not first:  # suffix: the last N bytes
+        if int(last) == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - int(last)), size - 1
+    start, end = int(first), int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise ValueError("range starts past the end")
+    return start, min(end, size - 1)
+
+
+def _variant_response(asset: StaticAsset, cache_control: str, accept_encoding: str,
+                      if_none_match: str, head: bool, range_header: str = "", if_range: str = "") -> Response:
+    """200 / 206 / 304 / 416 for the best encoding of `asset` the client accepts."""
+    # Ranges address the uncompressed body; If-Range only honours them for the current version
+    if range_header and if_range and if_range.strip() != asset.etag("identity"):
+        range_header = ""
+    encoding = "identity" if range_header else _negotiate(accept_encoding, asset.variants)
+    etag = asset.etag(encoding)
+    headers = {"Cache-Control": cache_control, "ETag": etag, "Accept-Ranges": "bytes"}
+    if len(asset.variants) > 1:
+        headers["Vary"] = "Accept-Encoding"
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    if if_none_match and etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    body = asset.variants[encoding]
+    if range_header:
+        try:
+            byte_range = _parse_range(range_header, len(body))
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{len(body)}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            if head:
+                headers["Content-Length"] = str(end - start + 1)
+                return Response(status_code=206, headers=headers, media_type=asset.content_type)
+            return Response(content=body[start:end + 1], status_code=206, headers=headers,
+                            media_type=asset.content_type)
+    if head:
+        headers["Content-Length"] = str(len(body))
+        return Response(status_code=200, headers=headers, media_type=asset.content_type)
+    return Response(content=body, headers=headers, media_type=asset.content_type)
+
+
+# ---------------------------------------------------------------------- #
+#  Pre-rendered pages                                                    #
+# ---------------------------------------------------------------------- #
+_STYLESHEET_LINK = re.compile(r'<link rel="stylesheet" href="/static/([^"]+)">')
+
+
+def inline_stylesheets(html: str, static_dir: str, only: Optional[Iterable[str]] = None) -> str:
+    """
+    Replace local `<link rel="stylesheet">` tags with `<style>` blocks so the
+    first paint needs no extra round trips.  `only` limits it to the given
+    paths relative to the static root (e.g. {"css/base.css"}); None = all.
+    Call this *before* fingerprint rewriting, while hrefs are still original.
+    """
+    wanted = set(only) if only is not None else None
+
+    def _sub(match: "re.Match[str]") -> str:
+        rel = match.group(1)
+        path = os.path.join(static_dir, rel)
+        if (wanted is not None and rel not in wanted) or not os.path.isfile(path):
+            return match.group(0)
+        with open(path, "r", encoding="utf-8") as f:
+            return f"<style>/* {rel} */\n{f.read()}</style>"
+    return _STYLESHEET_LINK.sub(_sub, html)
+
+
+class CachedPage:
+    """
+    A page rendered once into compressed bytes and re-rendered only when its
+    source template changes on disk.  Served with an ETag and `no-cache`, so
+    browsers revalidate it (it links to fingerprinted assets) at the cost of a
+    bodyless 304.
+    """
+
+    def __init__(self, render: Callable[[], str], source_path: Optional[str] = None,
+                 content_type: str = "text/html; charset=utf-8", name: Optional[str] = None):
+        self._render = render
+        self.source_path = source_path
+        self.name = name or source_path or "page"
+        self.content_type = content_type
+        self._asset: Optional[StaticAsset] = None
+        self._mtime: Optional[float] = None
+        self.renders = 0
+
+    def _source_mtime(self) -> Optional[float]:
+        if self.source_path is None:
+            return None
+        try:
+            return os.stat(self.source_path).st_mtime
+        except OSError:
+            return None
+
+    def get(self) -> StaticAsset:
+        mtime = self._source_mtime()
+        if self._asset is None or mtime != self._mtime:
+            body = self._render().encode("utf-8")
+            digest = hashlib.sha256(body).hexdigest()[:HASH_LENGTH]
+            self._asset = StaticAsset(self.source_path or "", "", digest, self.content_type, body)
+            self._mtime = mtime
+            self.renders += 1
+            logger.info("Pre-rendered %s (%d bytes, etag %s)", self.name, len(body), digest)
+        return self._asset
+
+    def response(self, accept_encoding: str = "", if_none_match: str = "", head: bool = False,
+                 cache_control: str = REVALIDATE_CACHE) -> Response:
+        return _variant_response(self.get(), cache_control, accept_encoding, if_none_match, head)
@@ -0,0 +1,71 @@
+"""
+Compact game transcripts: every successful action of a session, in order.
+
+Together with the session's `seed` (which fixes every shuffle, shop offer,
+boss and mystery-card outcome, see `GameSession._rng`) a transcript replays
+the game exactly – `backend.replay` uses it to verify saved highscores.
+
+A transcript starts with a version byte, `0xF0 | rules version`: a rule
+change that would play a recorded game differently bumps `RULES_VERSION`,
+and a game is only replayed under the rules it was recorded with.  Every
+action after it is one header byte, `opcode << 4 | argument count`, followed
+by its arguments (hand or shop indices, all below 256) as one byte each, so a
+whole game fits in a couple of hundred bytes.
+Highscores store transcripts as URL-safe base64 text.
+"""
+import base64
+from typing import Iterator, List, Sequence, Tuple
+
+DRAW, PLAY, REROLL, BUY, NEXT_ROUND = range(5)
+
+RULES_VERSION = 1    # the rules this build plays and records
+_VERSION_MARK = 0xF0  # opcode 15, never an action
+
+# Opcode → the GameSession method replaying it
+ACTION_METHODS = {
+    DRAW: "draw_cards",
+    PLAY: "play_hand",
+    REROLL: "reroll_shop",
+    BUY: "buy_card",
+    NEXT_ROUND: "proceed_to_next_round",
+}
+
+
+def encode_action(opcode: int, args: Sequence[int] = ()) -> bytes:
+    if len(args) > 15:
+        raise ValueError("Too many action arguments to record")
+    return bytes((opcode << 4 | len(args), *args))
+
+
+def header(version: int = RULES_VERSION) -> bytes:
+    """The version byte a new transcript starts with"""
+    return bytes((_VERSION_MARK | version,))
+
+
+def rules_version(transcript: bytes) -> int:
+    """The rules version `transcript` was recorded under"""
+    if not transcript or transcript[0] & 0xF0 != _VERSION_MARK or transcript[0] == _VERSION_MARK:
+        raise ValueError("Malformed transcript: no rules version")
+    return transcript[0] & 0x0F
+
+
+def decode(transcript: bytes) -> Iterator[Tuple[int, List[int]]]:
+    """(opcode, arguments) for every recorded action"""
+    rules_version(transcript)
+    pos = 1
+    while pos < len(transcript):
+        header = transcript[pos]
+        count = header & 0x0F
+        args = list(transcript[pos + 1:pos + 1 + count])
+        if len(args) != count or header >> 4 not in ACTION_METHODS:
+            raise ValueError(f"Malformed transcript at byte {pos}")
+        yield header >> 4, args
+        pos += 1 + count
+
+
+def to_text(transcript: bytes) -> str:
+    return base64.urlsafe_b64encode(transcript).decode("ascii")
+
+
+def from_text(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text.encode("ascii"))
@@ -4,15 +4,17 @@ A TurboChip is purchased once ($1) and stays active for the whole session.
 """
 from __future__ import annotations
 
+import inspect
 from typing import Callable, Dict, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 # ---------------------  Public Pydantic model  --------------------- #
 class TurboChip(BaseModel):
     name: str
     effect_id: str               # unique key
     description: str
-    apply_fn: Callable[[int], int]   # fn(total_score)->new_total_score
+    # fn(total_score)->new_total_score; server-side only, never serialised
+    apply_fn: Callable[[int], int] = Field(exclude=True)
 
 
 # --------------------------- Registry ------------------------------ #
@@ -88,3 +90,22 @@ _register(_make_suit_multiplier_chip("The Digger",      "mult_plus3_spades",   "
 _register(_make_suit_multiplier_chip("Cupido",          "mult_plus3_hearts",   "hearts"))
 
 AVAILABLE_TURBO_IDS: List[str] = list(TURBO_CHIP_REGISTRY.keys())
+
+# Chips whose apply_fn wants the HandResult and played cards (checked once, not per score)
+TURBO_TAKES_PLAYED_CARDS: Dict[str, bool] = {
+    chip_id: "played_cards" in inspect.signature(chip.apply_fn).parameters
+    for chip_id, chip in TURBO_CHIP_REGISTRY.items()
+}
+
+# ------------------------------------------------------------------ #
+#  Client catalog                                                   #
+# ------------------------------------------------------------------ #
+# Sessions, shop items and game states refer to chips by `effect_id`
+# only; clients resolve names / descriptions from this catalog, which
+# is served once (see `/api/catalog`).
+TURBO_CHIP_CATALOG: List[Dict[str, str]] = [chip.dict() for chip in TURBO_CHIP_REGISTRY.values()]
+
+
+def turbo_shop_item(chip_id: str) -> Dict[str, str]:
+    """Shop entry for a turbo chip: a registry reference, not a copy"""
+    return {"item_type": "turbo", "effect_id": chip_id}
@@ -0,0 +1,60 @@
+"""
+Balance testing with the expectimax autoplayer (`backend.autoplayer`).
+
+Plays `--games` full games through `GameEngine` (see `backend.simulation`:
+every draw / play decision comes from `suggest_move`, and in the shop the bot
+buys turbo chips while it can afford them).  Reports how far the bot gets
+(rounds cleared, losses per round, victories) and how fast it decides.
+The same run is available on a live server as an "autoplay" job (/api/jobs).
+
+    python -m benchmarks.autoplay --games 200
+    python -m benchmarks.autoplay --games 200 --depth 1 --json autoplay.json
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import warnings
+from typing import Any, Dict, List, Optional
+
+from backend.hand_tables import load_tables
+
+from .harness import environment_info, write_results
+
+
+def play_games(games: int, depth: int, max_nodes: int, time_budget: float, seed: int) -> Dict[str, Any]:
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    from backend.simulation import play_games as play, summarize
+
+    return summarize(play(games, depth, max_nodes, time_budget, seed))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ballantro autoplayer balance run")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=1, help="search depth (0 = greedy best play)")
+    parser.add_argument("--max-nodes", type=int, default=400, help="node budget per decision")
+    parser.add_argument("--time-ms", type=float, default=50, help="time budget per decision")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    args = parser.parse_args(argv)
+    load_tables()
+
+    result = play_games(args.games, args.depth, args.max_nodes, args.time_ms / 1000, args.seed)
+    print(f"{result['games']} games, depth {args.depth}, {args.max_nodes} nodes / {args.time_ms:g} ms per decision")
+    print(f"  victories                 {result['victories']:>10}")
+    print(f"  rounds cleared (mean)     {result['rounds_cleared_mean']:>10.2f}   (median {result['rounds_cleared_median']})")
+    print(f"  games lost, by round      {result['lost_in_round']}")
+    print(f"  decisions per second      {result['decisions_per_second']:>10.0f}   "
+          f"(p99 {result['decision_ms_p99']:.2f} ms, {result['decisions']} decisions)")
+    print(f"  completed search depths   {result['completed_depths']}")
+    if args.json:
+        write_results(args.json, {"meta": environment_info(args.seed), "results": result, "args": vars(args)})
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""
+Tiny, dependency-free benchmark harness shared by the scripts in this folder.
+
+A `Benchmark` is a pair of callables:
+
+* ``setup(n)``  – builds ``n`` independent inputs **outside** the timed region
+                  (fresh sessions, copied results, …) so that mutating
+                  operations such as ``play_hand`` can be measured repeatedly.
+* ``run(item)`` – the operation under test, called once per prepared input.
+
+Results are written as JSON so they can be diffed against a saved baseline:
+
+    python -m benchmarks.micro --json bench.json
+    python -m benchmarks.micro --compare bench.json --fail-on-regression
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+RESULTS_FORMAT_VERSION = 1
+
+
+@dataclass
+class Benchmark:
+    """A single named measurement (see module docstring)."""
+    name: str
+    setup: Callable[[int], List[Any]]
+    run: Callable[[Any], Any]
+    number: int = 200          # operations per repeat
+    repeat: int = 5            # timed repeats, min / median are reported
+    group: str = "misc"
+    unit: str = "op"
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+# ------------------------------------------------------------------ #
+#  Running                                                           #
+# ------------------------------------------------------------------ #
+def _time_once(bench: Benchmark, number: int, seed: int) -> float:
+    """Prepare `number` inputs, then time running all of them. Returns ns/op."""
+    random.seed(seed)
+    items = bench.setup(number)
+    run = bench.run
+    perf = time.perf_counter_ns
+    start = perf()
+    for item in items:
+        run(item)
+    elapsed = perf() - start
+    return elapsed / max(1, len(items))
+
+
+def run_benchmark(bench: Benchmark, seed: int, scale: float = 1.0) -> Dict[str, Any]:
+    """Run one benchmark (one warm-up + `repeat` timed passes)."""
+    number = max(1, int(bench.number * scale))
+    _time_once(bench, max(1, number // 10), seed)  # warm-up (caches, imports)
+    samples = [_time_once(bench, number, seed + i) for i in range(bench.repeat)]
+    return {
+        "group": bench.group,
+        "unit": bench.unit,
+        "number": number,
+        "repeat": bench.repeat,
+        "min_ns": min(samples),
+        "median_ns": statistics.median(samples),
+        "mean_ns": statistics.fmean(samples),
+        "stdev_ns": statistics.pstdev(samples),
+        "ops_per_sec": 1e9 / statistics.median(samples) if samples else 0.0,
+        **bench.extra,
+    }
+
+
+def run_suite(benchmarks: List[Benchmark], seed: int, scale: float = 1.0,
+              name_filter: Optional[str] = None, out=sys.stdout) -> Dict[str, Any]:
+    """Run every (matching) benchmark and return the machine-readable result dict."""
+    results: Dict[str, Any] = {}
+    for bench in benchmarks:
+        if name_filter and name_filter not in bench.name:
+            continue
+        res = run_benchmark(bench, seed, scale)
+        results[bench.name] = res
+        print(f"{bench.name:<48} {_fmt_ns(res['median_ns']):>12} / {bench.unit}"
+              f"   (min {_fmt_ns(res['min_ns'])}, n={res['number']}x{res['repeat']})", file=out)
+    return {
+        "format": RESULTS_FORMAT_VERSION,
+        "meta": environment_info(seed, scale),
+        "results": results,
+    }
+
+
+def environment_info(seed: int, scale: float = 1.0) -> Dict[str, Any]:
+    """Metadata stored next to the numbers so baselines can be sanity-checked."""
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        rev = None
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_rev": rev,
+        "seed": seed,
+        "scale": scale,
+    }
+
+
+# ------------------------------------------------------------------ #
+#  Baseline comparison                                               #
+# ------------------------------------------------------------------ #
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    tolerance: float = 0.10, out=sys.stdout) -> List[str]:
+    """
+    Print a side-by-side comparison of median timings and return the names of
+    benchmarks that got slower by more than `tolerance` (0.10 → 10 %).
+    """
+    regressions: List[str] = []
+    cur, base = current.get("results", {}), baseline.get("results", {})
+    print(f"\n{'benchmark':<48} {'baseline':>12} {'current':>12} {'change':>9}", file=out)
+    for name, res in cur.items():
+        if name not in base:
+            print(f"{name:<48} {'-':>12} {_fmt_ns(res['median_ns']):>12} {'new':>9}", file=out)
+            continue
+        old, new = base[name]["median_ns"], res["median_ns"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  << slower"
+        elif change < -tolerance:
+            flag = "  faster"
+        print(f"{name:<48} {_fmt_ns(old):>12} {_fmt_ns(new):>12} {change:>+8.1%}{flag}", file=out)
+    for name in base:
+        if name not in cur:
+            print(f"{name:<48} {_fmt_ns(base[name]['median_ns']):>12} {'-':>12} {'gone':>9}", file=out)
+    return regressions
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_results(path: str, data: Dict[str, Any]):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def _fmt_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:.2f} µs"
+    return f"{ns:.0f} ns"
+
+
+# ------------------------------------------------------------------ #
+#  Shared CLI                                                        #
+# ------------------------------------------------------------------ #
+def build_arg_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved results file")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative slowdown that counts as a regression (default 0.10)")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with status 1 if any benchmark regressed")
+    parser.add_argument("--filter", metavar="SUBSTR", help="only run benchmarks whose name contains SUBSTR")
+    parser.add_argument("--seed", type=int, default=1234, help="seed for the fixed corpora")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every benchmark's op count (e.g. 0.1 for a smoke run)")
+    parser.add_argument("--log", action="store_true",
+                        help="keep the engine's INFO logging enabled while measuring")
+    return parser
+
+
+def main(benchmarks_factory: Callable[[int], List[Benchmark]], description: str,
+         argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser(description).parse_args(argv)
+    if not args.log:
+        # The engine logs every action at INFO; measure the game logic, not the log handler.
+        logging.disable(logging.CRITICAL)
+    # The backend still uses the Pydantic v1 style `.dict()`; keep the table readable.
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    from backend.hand_tables import load_tables  # lazily: --url load runs never import the backend
+    load_tables()  # build the hand tables (if missing) before anything is timed
+
+    data = run_suite(benchmarks_factory(args.seed), seed=args.seed, scale=args.scale, name_filter=args.filter)
+
+    if args.json:
+        write_results(args.json, data)
+        print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        regressions = compare_results(data, load_results(args.compare), tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) slower than baseline by more than "
+                  f"{args.tolerance:.0%}: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                return 1
+    return 0
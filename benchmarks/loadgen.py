@@ -0,0 +1,518 @@
+"""
+Load generator that plays realistic full games against the FastAPI app.
+
+Each *virtual player* runs the real game loop – new game, preview spam while
+"thinking", draws, plays, shop visits (view / reroll / buy / next round) and a
+final `save_score` – and every request is timed per endpoint.
+
+Two transports, no third-party dependencies:
+
+* in-process (default): requests are dispatched straight into `main.app` via
+  the ASGI interface, so the numbers measure the application only;
+* ``--url http://127.0.0.1:8001``: a minimal keep-alive HTTP/1.1 client against
+  a running uvicorn (one connection per virtual player).
+
+Examples (from the repository root):
+
+    python -m benchmarks.loadgen --players 50 --games 2
+    python -m benchmarks.loadgen --players 200 --duration 60 --json load.json
+    python -m benchmarks.loadgen --url http://127.0.0.1:8001 --server-pid 4242
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import warnings
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .harness import environment_info, write_results
+
+
+# ------------------------------------------------------------------ #
+#  Transports                                                        #
+# ------------------------------------------------------------------ #
+class ASGITransport:
+    """Calls an ASGI app directly – no sockets, no server."""
+
+    def __init__(self, app):
+        self.app = app
+        self._lifespan_task: Optional[asyncio.Task] = None
+        self._lifespan_queue: Optional[asyncio.Queue] = None
+
+    async def start(self):
+        """Run the app's lifespan startup (if it implements one)."""
+        queue: asyncio.Queue = asyncio.Queue()
+        started = asyncio.get_running_loop().create_future()
+
+        async def receive():
+            return await queue.get()
+
+        async def send(message):
+            if message["type"].startswith("lifespan.startup") and not started.done():
+                started.set_result(message["type"])
+
+        await queue.put({"type": "lifespan.startup"})
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._lifespan_queue = queue
+        self._lifespan_task = asyncio.create_task(self.app(scope, receive, send))
+        done, _ = await asyncio.wait({self._lifespan_task, started}, return_when=asyncio.FIRST_COMPLETED)
+        if started.done() and started.result() == "lifespan.startup.failed":
+            raise RuntimeError("ASGI app failed to start")
+
+    async def close(self):
+        if self._lifespan_task and not self._lifespan_task.done():
+            await self._lifespan_queue.put({"type": "lifespan.shutdown"})
+            try:
+                await asyncio.wait_for(self._lifespan_task, timeout=10)
+            except asyncio.TimeoutError:
+                self._lifespan_task.cancel()
+
+    def connection(self) -> "ASGITransport":
+        return self
+
+    async def request(self, method: str, path: str, body: Optional[Any] = None) -> Tuple[int, Any]:
+        payload = b"" if body is None else json.dumps(body).encode()
+        headers = [(b"host", b"loadgen"), (b"content-length", str(len(payload)).encode())]
+        if body is not None:
+            headers.append((b"content-type", b"application/json"))
+        path_only, _, query = path.partition("?")
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+            "method": method, "scheme": "http", "path": path_only, "raw_path": path_only.encode(),
+            "query_string": query.encode(), "root_path": "", "headers": headers,
+            "client": ("127.0.0.1", 0), "server": ("loadgen", 80),
+        }
+        sent = False
+        status = 0
+        chunks: List[bytes] = []
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": payload, "more_body": False}
+            await asyncio.sleep(3600)  # never disconnects
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, _decode(b"".join(chunks))
+
+    async def aclose(self):
+        pass
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client (Content-Length and chunked bodies)."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, body: Optional[Any] = None) -> Tuple[int, Any]:
+        if self.writer is None or self.writer.is_closing():
+            await self._connect()
+        payload = b"" if body is None else json.dumps(body).encode()
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: keep-alive\r\n")
+        if body is not None:
+            head += "Content-Type: application/json\r\n"
+        self.writer.write(head.encode() + b"\r\n" + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("server closed the connection")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            data = bytearray()
+            while True:
+                size = int((await self.reader.readline()).strip() or b"0", 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                data += await self.reader.readexactly(size)
+                await self.reader.readline()
+            raw = bytes(data)
+        else:
+            raw = await self.reader.readexactly(int(headers.get("content-length", "0")))
+        if headers.get("connection", "").lower() == "close":
+            await self.aclose()
+        return status, _decode(raw)
+
+    async def aclose(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+            self.writer = None
+
+
+class HTTPTransport:
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def connection(self) -> HTTPConnection:
+        return HTTPConnection(self.host, self.port)
+
+
+def _decode(raw: bytes) -> Any:
+    try:
+        return json.loads(raw) if raw else None
+    except ValueError:
+        return None
+
+
+# ------------------------------------------------------------------ #
+#  Metrics                                                           #
+# ------------------------------------------------------------------ #
+class Metrics:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.games_started = 0
+        self.games_finished = 0
+        self.scores_saved = 0
+
+    def record(self, endpoint: str, seconds: float, status: int):
+        self.latencies[endpoint].append(seconds)
+        if status >= 400 or status == 0:
+            self.errors[endpoint] += 1
+
+    def summary(self, wall_seconds: float) -> Dict[str, Any]:
+        endpoints = {}
+        total = 0
+        for endpoint, samples in sorted(self.latencies.items()):
+            samples.sort()
+            total += len(samples)
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "errors": self.errors.get(endpoint, 0),
+                "rps": len(samples) / wall_seconds if wall_seconds else 0.0,
+                "p50_ms": _percentile(samples, 50) * 1e3,
+                "p95_ms": _percentile(samples, 95) * 1e3,
+                "p99_ms": _percentile(samples, 99) * 1e3,
+                "max_ms": samples[-1] * 1e3,
+            }
+        return {
+            "wall_seconds": wall_seconds,
+            "total_requests": total,
+            "total_errors": sum(self.errors.values()),
+            "throughput_rps": total / wall_seconds if wall_seconds else 0.0,
+            "games_started": self.games_started,
+            "games_finished": self.games_finished,
+            "scores_saved": self.scores_saved,
+            "endpoints": endpoints,
+        }
+
+
+def _percentile(sorted_samples: List[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, int(round(pct / 100 * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[rank]
+
+
+def peak_rss_kb(server_pid: Optional[int] = None) -> Optional[int]:
+    """Peak resident set size in KiB – of this process, or of `server_pid` via /proc."""
+    if server_pid is None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    try:
+        with open(f"/proc/{server_pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+# ------------------------------------------------------------------ #
+#  Virtual player                                                    #
+# ------------------------------------------------------------------ #
+RANK_ORDER = {r: i for i, r in enumerate(["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"])}
+
+
+class VirtualPlayer:
+    """Plays complete games with a simple greedy strategy, timing every call."""
+
+    def __init__(self, player_id: int, conn, metrics: Metrics, rng: random.Random,
+                 previews_per_action: int, max_rounds: int, debug_mode: bool, think_time: float,
+                 legacy_preview: bool = False):
+        self.player_id = player_id
+        self.conn = conn
+        self.metrics = metrics
+        self.rng = rng
+        self.previews_per_action = previews_per_action
+        self.max_rounds = max_rounds
+        self.debug_mode = debug_mode
+        self.think_time = think_time
+        self.legacy_preview = legacy_preview
+
+    async def call(self, endpoint: str, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+        start = time.perf_counter()
+        try:
+            status, data = await self.conn.request(method, path, body)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            status, data = 0, None
+        self.metrics.record(endpoint, time.perf_counter() - start, status)
+        return status, data
+
+    async def _think(self):
+        if self.think_time:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.think_time))
+
+    async def play_game(self):
+        status, data = await self.call("POST /api/new_game", "POST", "/api/new_game",
+                                       {"debug_mode": self.debug_mode})
+        if status != 200 or not data:
+            return
+        self.metrics.games_started += 1
+        state = data["game_state"]
+        sid = state["session_id"]
+
+        while not state["is_game_over"] and state["current_round"] <= self.max_rounds:
+            await self._think()
+            if state["in_shop"]:
+                state = await self._shop(sid, state) or state
+                continue
+
+            hand = state["hand"]
+            if not hand:
+                break
+            play_idx = self._choose_play(hand)
+            await self._preview_spam(sid, hand, play_idx)
+
+            draws_left = state["max_draws"] - state["draws_used"]
+            if draws_left > 0 and self._should_draw(hand, play_idx):
+                discard = [i for i in range(len(hand)) if i not in play_idx][:5] or [0]
+                status, data = await self.call("POST /api/draw_cards", "POST", "/api/draw_cards",
+                                               {"session_id": sid, "selected_cards": discard})
+                if status == 200:
+                    state = data["game_state"]
+                    continue
+
+            status, data = await self.call("POST /api/play_hand", "POST", "/api/play_hand",
+                                           {"session_id": sid, "selected_cards": play_idx})
+            if status != 200:
+                break
+            state = data["game_state"]
+
+        if state["is_game_over"]:
+            self.metrics.games_finished += 1
+            if not self.debug_mode:
+                status, _ = await self.call("POST /api/save_score", "POST", "/api/save_score",
+                                            {"name": f"loadgen-{self.player_id}", "session_id": sid})
+                if status == 200:
+                    self.metrics.scores_saved += 1
+        await self.call("GET /api/highscores", "GET", "/api/highscores")
+
+    async def _preview_spam(self, sid: str, hand: List[dict], final_selection: List[int]):
+        """Mimic PreviewManager: one preview per card toggle while building the selection."""
+        selection: List[int] = []
+        toggles = list(final_selection)
+        extra = max(0, self.previews_per_action - len(toggles))
+        toggles += [self.rng.randrange(len(hand)) for _ in range(extra)]
+        self.rng.shuffle(toggles)
+        for idx in toggles[:self.previews_per_action]:
+            if idx in selection:
+                selection.remove(idx)
+            elif len(selection) < 5:
+                selection.append(idx)
+            if selection:
+                if self.legacy_preview:
+                    await self.call("POST /api/preview_hand", "POST", "/api/preview_hand",
+                                    [hand[i] for i in selection])
+                else:
+                    await self.call("POST /api/preview/{id}", "POST", f"/api/preview/{sid}",
+                                    {"selected_cards": selection})
+
+    async def _shop(self, sid: str, state: dict) -> Optional[dict]:
+        status, data = await self.call("GET /api/shop/{id}", "GET", f"/api/shop/{sid}")
+        if status != 200:
+            return None
+        shop = data["shop_state"]
+        money = shop["money"]
+        if money >= 4 and self.rng.random() < 0.3:
+            status, data = await self.call("POST /api/shop/{id}/reroll", "POST", f"/api/shop/{sid}/reroll")
+            if status == 200:
+                shop["shop_items"], money = data["shop_items"], data["money"]
+        # Buy greedily from the back so indices stay valid after each purchase.
+        for idx in reversed(range(len(shop["shop_items"]))):
+            item = shop["shop_items"][idx]
+            cost = 1 if item.get("item_type") == "turbo" else shop["card_cost"]
+            if money >= cost and self.rng.random() < 0.7:
+                status, data = await self.call("POST /api/shop/{id}/buy/{idx}", "POST",
+                                               f"/api/shop/{sid}/buy/{idx}")
+                if status == 200:
+                    money = data["game_state"]["money"]
+        status, data = await self.call("POST /api/shop/{id}/next_round", "POST",
+                                       f"/api/shop/{sid}/next_round")
+        return data["game_state"] if status == 200 else None
+
+    @staticmethod
+    def _choose_play(hand: List[dict]) -> List[int]:
+        """Flush if five of a suit, else the biggest rank groups topped up with high cards."""
+        by_suit: Dict[str, List[int]] = defaultdict(list)
+        by_rank: Dict[str, List[int]] = defaultdict(list)
+        for i, c in enumerate(hand):
+            by_suit[c["suit"]].append(i)
+            by_rank[c["rank"]].append(i)
+        for idxs in by_suit.values():
+            if len(idxs) >= 5:
+                return sorted(idxs[:5])
+        groups = sorted(by_rank.items(), key=lambda kv: (len(kv[1]), RANK_ORDER[kv[0]]), reverse=True)
+        chosen: List[int] = []
+        for _, idxs in groups:
+            if len(idxs) >= 2 and len(chosen) + len(idxs) <= 5:
+                chosen += idxs
+        if not chosen:
+            chosen = groups[0][1][:1]
+        rest = sorted((i for i in range(len(hand)) if i not in chosen),
+                      key=lambda i: RANK_ORDER[hand[i]["rank"]], reverse=True)
+        chosen += rest[:5 - len(chosen)]
+        return sorted(chosen)
+
+    def _should_draw(self, hand: List[dict], play_idx: List[int]) -> bool:
+        ranks = Counter(hand[i]["rank"] for i in play_idx)
+        return max(ranks.values()) < 3 and self.rng.random() < 0.8
+
+
+# ------------------------------------------------------------------ #
+#  Driver                                                            #
+# ------------------------------------------------------------------ #
+async def run_load(args) -> Dict[str, Any]:
+    if args.url:
+        transport = HTTPTransport(args.url)
+    else:
+        import main as server  # imported lazily so --url runs never load the backend
+        # save_score rewrites the leaderboard file; never let a load run touch the real one.
+        scratch = tempfile.NamedTemporaryFile(prefix="loadgen-highscores-", suffix=".json", delete=False)
+        scratch.close()
+        os.unlink(scratch.name)
+        server.game_engine.highscores_file = scratch.name
+        transport = ASGITransport(server.app)
+    await transport.start()
+
+    metrics = Metrics()
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    async def player_task(pid: int):
+        rng = random.Random(args.seed + pid)
+        conn = transport.connection()
+        player = VirtualPlayer(pid, conn, metrics, rng, args.previews, args.max_rounds,
+                               debug_mode=rng.random() < args.debug_ratio, think_time=args.think_time,
+                               legacy_preview=args.legacy_preview)
+        games = 0
+        try:
+            while True:
+                if deadline is not None:
+                    if time.perf_counter() >= deadline:
+                        break
+                elif games >= args.games:
+                    break
+                await player.play_game()
+                games += 1
+        finally:
+            await conn.aclose()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(player_task(pid) for pid in range(args.players)))
+    wall = time.perf_counter() - start
+    await transport.close()
+
+    summary = metrics.summary(wall)
+    summary["players"] = args.players
+    summary["transport"] = args.url or "asgi-in-process"
+    summary["peak_rss_kb"] = peak_rss_kb(args.server_pid if args.url else None)
+    return summary
+
+
+def print_summary(summary: Dict[str, Any], out=sys.stdout):
+    print(f"\n{'endpoint':<34} {'reqs':>7} {'err':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}", file=out)
+    for endpoint, e in summary["endpoints"].items():
+        print(f"{endpoint:<34} {e['requests']:>7} {e['errors']:>5} {e['rps']:>9.1f} {e['p50_ms']:>8.2f} "
+              f"{e['p95_ms']:>8.2f} {e['p99_ms']:>8.2f} {e['max_ms']:>8.2f}", file=out)
+    rss = summary["peak_rss_kb"]
+    rss_text = f"{rss / 1024:.1f} MiB" if rss else "n/a"
+    print(f"\n{summary['players']} players via {summary['transport']}: {summary['total_requests']} requests "
+          f"in {summary['wall_seconds']:.2f}s = {summary['throughput_rps']:.1f} req/s, "
+          f"{summary['total_errors']} errors, {summary['games_finished']}/{summary['games_started']} games "
+          f"finished, peak RSS {rss_text}", file=out)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Ballantro full-game load generator")
+    parser.add_argument("--players", type=int, default=20, help="concurrent virtual players")
+    parser.add_argument("--games", type=int, default=1, help="games per player (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="run for this many seconds instead")
+    parser.add_argument("--url", help="target a running server, e.g. http://127.0.0.1:8001")
+    parser.add_argument("--server-pid", type=int, help="with --url: report this process's peak RSS")
+    parser.add_argument("--previews", type=int, default=4, help="preview requests per draw/play decision")
+    parser.add_argument("--legacy-preview", action="store_true",
+                        help="preview via /api/preview_hand (full card bodies) instead of /api/preview/{id}")
+    parser.add_argument("--max-rounds", type=int, default=12, help="abandon a game after this round")
+    parser.add_argument("--debug-ratio", type=float, default=0.0,
+                        help="fraction of players using debug sessions (rich, never game over)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean seconds between actions")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    parser.add_argument("--log", action="store_true", help="keep the server's INFO logging (in-process)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    if not args.log:
+        logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    summary = asyncio.run(run_load(args))
+    print_summary(summary)
+    if args.json:
+        write_results(args.json, {"meta": environment_info(args.seed), "load": summary,
+                                  "args": vars(args)})
+        print(f"Results written to {args.json}")
+    return 1 if summary["total_requests"] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
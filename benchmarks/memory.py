@@ -0,0 +1,141 @@
+"""
+Bytes per game session at scale.
+
+Creates `--sessions` concurrent sessions through `GameEngine.new_game` in a
+fresh interpreter and reports, per session:
+
+* traced Python heap growth (tracemalloc) – the ground truth;
+* RSS growth;
+* `GameEngine.session_footprint()` – the estimate served by
+  `/api/diagnostics/sessions`, to check it against the ground truth;
+
+plus the resulting sessions per GiB.  `--played N` first plays N actions in
+every session (draws / plays / shop visits) so decks, discard piles, shop
+items and inventories are populated like in a real game.
+
+    python -m benchmarks.memory --sessions 10000
+    python -m benchmarks.memory --sessions 10000 --played 30 --json memory.json
+    python -m benchmarks.memory --compare memory.json
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tracemalloc
+import warnings
+from typing import Any, Dict, List, Optional
+
+from backend.hand_tables import load_tables
+
+from .harness import environment_info, load_results, write_results
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _play(engine, session_id: str, actions: int, rng: random.Random):
+    """Greedy-ish scripted play: draw twice, play five, buy + continue in the shop."""
+    session = engine.sessions[session_id]
+    for _ in range(actions):
+        if session.is_game_over:
+            return
+        try:
+            if session.in_shop:
+                if session.shop_items and session.money >= session.turbo_chip_cost and rng.random() < 0.5:
+                    engine.buy_card(session_id, 0)
+                else:
+                    engine.proceed_to_next_round(session_id)
+            elif session.draws_used < 2:
+                engine.draw_cards(session_id, [0, 1])
+            else:
+                engine.play_hand(session_id, [0, 1, 2, 3, 4])
+        except ValueError:
+            if session.in_shop:
+                engine.proceed_to_next_round(session_id)
+            else:
+                return
+
+
+def measure(n_sessions: int, played: int, seed: int) -> Dict[str, Any]:
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    from backend.game_engine import GameEngine
+    from backend.models import card_pool_size
+
+    random.seed(seed)
+    rng = random.Random(seed)
+    engine = GameEngine()
+    _play(engine, engine.new_game().session_id, played, rng)  # warm lazy imports / the card pool
+    engine.sessions.clear()
+    gc.collect()
+
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    heap_before = tracemalloc.get_traced_memory()[0]
+    for _ in range(n_sessions):
+        session_id = engine.new_game().session_id
+        _play(engine, session_id, played, rng)
+    gc.collect()
+    heap_after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss_after = _rss_bytes()
+
+    heap_per_session = (heap_after - heap_before) / n_sessions
+    return {
+        "sessions": n_sessions,
+        "played_actions": played,
+        "heap_bytes_per_session": heap_per_session,
+        "rss_bytes_per_session": (rss_after - rss_before) / n_sessions,
+        "sessions_per_gib": int(2**30 // heap_per_session) if heap_per_session > 0 else None,
+        "footprint": engine.session_footprint(sample=1000),
+        "card_pool_size": card_pool_size(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ballantro bytes per session")
+    parser.add_argument("--sessions", type=int, default=10000, help="concurrent sessions to create")
+    parser.add_argument("--played", type=int, default=0, help="actions to play in every session first")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved results file")
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    load_tables()
+
+    if args.measure:
+        print(json.dumps(measure(args.sessions, args.played, args.seed)))
+        return 0
+
+    # Fresh interpreter, so earlier allocations in this process can't skew RSS
+    out = subprocess.run([sys.executable, "-m", "benchmarks.memory", "--measure", "--sessions", str(args.sessions),
+                          "--played", str(args.played), "--seed", str(args.seed)],
+                         capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    fp = result["footprint"]
+    print(f"{result['sessions']} sessions, {result['played_actions']} actions played each")
+    print(f"  heap per session          {result['heap_bytes_per_session']:>10.0f} B")
+    print(f"  RSS per session           {result['rss_bytes_per_session']:>10.0f} B")
+    print(f"  footprint estimate (avg)  {fp['avg_bytes']:>10} B   (max {fp['max_bytes']} B, {fp['sampled']} sampled)")
+    print(f"  sessions per GiB (heap)   {result['sessions_per_gib']:>10}")
+    print(f"  pooled cards              {result['card_pool_size']:>10}")
+    if args.compare:
+        base = load_results(args.compare)["results"]
+        old, new = base["heap_bytes_per_session"], result["heap_bytes_per_session"]
+        print(f"\nheap per session: {old:.0f} B -> {new:.0f} B ({(new - old) / old:+.1%})")
+    if args.json:
+        write_results(args.json, {"meta": environment_info(args.seed), "results": result, "args": vars(args)})
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+"""
+Microbenchmarks for the evaluator and the per-session game operations.
+
+Every corpus is generated from a fixed seed so numbers are comparable between
+runs and machines.  Run from the repository root:
+
+    python -m benchmarks.micro                          # print table
+    python -m benchmarks.micro --json base.json         # save a baseline
+    python -m benchmarks.micro --compare base.json      # diff against it
+    python -m benchmarks.micro --filter evaluate_hand --scale 0.2
+"""
+from __future__ import annotations
+
+import json
+import random
+import sys
+import uuid
+from typing import List, Optional
+
+from backend.models import Card, Suit, Rank
+from backend.card_codes import card_code, parse_card_code
+from backend.card_effects import AVAILABLE_EFFECT_NAMES
+from backend.poker_evaluator import PokerEvaluator
+from backend.turbo_chips import AVAILABLE_TURBO_IDS
+from backend.game_engine import GameEngine, GameSession
+from backend.autoplayer import suggest_move
+
+from .harness import Benchmark, main
+
+ALL_SUITS = list(Suit)
+ALL_RANKS = list(Rank)
+CORPUS_SIZE = 512          # distinct hands per corpus, cycled through by the timers
+MAX_INVENTORY = 8          # mirrors GameSession.buy_card's inventory cap
+
+ENGINE = GameEngine()      # owner of the benchmark sessions (never saves highscores)
+
+
+# ------------------------------------------------------------------ #
+#  Fixed corpora                                                     #
+# ------------------------------------------------------------------ #
+def random_card(rng: random.Random, with_effect: bool = False) -> Card:
+    effects = [rng.choice(AVAILABLE_EFFECT_NAMES)] if with_effect else []
+    return Card(suit=rng.choice(ALL_SUITS), rank=rng.choice(ALL_RANKS), effects=effects)
+
+
+def hand_corpus(size: int, n_cards: int, effect_ratio: float, seed: int) -> List[List[Card]]:
+    """`size` hands of `n_cards` cards; each card carries an effect with p=`effect_ratio`."""
+    rng = random.Random(seed)
+    return [[random_card(rng, rng.random() < effect_ratio) for _ in range(n_cards)]
+            for _ in range(size)]
+
+
+def _cycle(corpus: list, n: int) -> list:
+    return [corpus[i % len(corpus)] for i in range(n)]
+
+
+def full_inventory() -> List[str]:
+    """Eight turbo chip ids – every registered chip, repeated to fill the cap."""
+    return [AVAILABLE_TURBO_IDS[i % len(AVAILABLE_TURBO_IDS)] for i in range(MAX_INVENTORY)]
+
+
+def new_session(debug_mode: bool = False) -> GameSession:
+    return GameSession(str(uuid.uuid4()), ENGINE, is_debug_mode=debug_mode)
+
+
+# ------------------------------------------------------------------ #
+#  Benchmarks                                                        #
+# ------------------------------------------------------------------ #
+def _evaluate_hand_benchmarks(seed: int) -> List[Benchmark]:
+    benches = []
+    for n_cards in range(1, 6):
+        for label, ratio in (("plain", 0.0), ("effects", 0.6)):
+            corpus = hand_corpus(CORPUS_SIZE, n_cards, ratio, seed + n_cards)
+            benches.append(Benchmark(
+                name=f"evaluate_hand[{n_cards}-{label}]",
+                group="evaluator",
+                setup=lambda n, c=corpus: _cycle(c, n),
+                run=PokerEvaluator.evaluate_hand,
+                number=300,
+            ))
+    return benches
+
+
+def _evaluate_preview_benchmarks(seed: int) -> List[Benchmark]:
+    benches = []
+    for n_cards in (2, 4, 5):
+        corpus = hand_corpus(CORPUS_SIZE, n_cards, 0.3, seed + 100 + n_cards)
+        benches.append(Benchmark(
+            name=f"evaluate_preview_hand[{n_cards}]",
+            group="evaluator",
+            setup=lambda n, c=corpus: _cycle(c, n),
+            run=PokerEvaluator.evaluate_preview_hand,
+            number=300,
+        ))
+    return benches
+
+
+def _apply_turbo_benchmark(seed: int) -> Benchmark:
+    inventory = full_inventory()
+    corpus = hand_corpus(CORPUS_SIZE, 5, 0.3, seed + 200)
+    results = [(cards, PokerEvaluator.evaluate_hand(cards)) for cards in corpus]
+
+    def setup(n):
+        # _apply_turbo mutates the HandResult, so every call gets its own copy.
+        return [(cards, res.model_copy(deep=True)) for cards, res in _cycle(results, n)]
+
+    return Benchmark(
+        name="apply_turbo[full-inventory]",
+        group="evaluator",
+        setup=setup,
+        run=lambda item: PokerEvaluator._apply_turbo(inventory, item[1], item[0]),
+        number=1000,
+    )
+
+
+def _draw_cards_benchmark() -> Benchmark:
+    return Benchmark(
+        name="session.draw_cards[3]",
+        group="session",
+        setup=lambda n: [new_session() for _ in range(n)],
+        run=lambda s: s.draw_cards([0, 1, 2]),
+        number=200,
+    )
+
+
+def _play_hand_benchmark(seed: int) -> Benchmark:
+    def setup(n):
+        rng = random.Random(seed + 300)
+        sessions = []
+        for _ in range(n):
+            s = new_session()
+            s.inventory_ids = full_inventory()
+            sessions.append((s, sorted(rng.sample(range(len(s.hand)), 5))))
+        return sessions
+
+    return Benchmark(
+        name="session.play_hand[5]",
+        group="session",
+        setup=setup,
+        run=lambda item: item[0].play_hand(list(item[1])),
+        number=200,
+    )
+
+
+def _next_round_benchmark(seed: int, purchased: int) -> Benchmark:
+    def setup(n):
+        rng = random.Random(seed + 400)
+        sessions = []
+        for _ in range(n):
+            s = new_session()
+            s.purchased_cards = [random_card(rng, with_effect=True) for _ in range(purchased)]
+            s.in_shop = True
+            sessions.append(s)
+        return sessions
+
+    return Benchmark(
+        name=f"session.proceed_to_next_round[{purchased}-purchased]",
+        group="session",
+        setup=setup,
+        run=lambda s: s.proceed_to_next_round(),
+        number=100,
+    )
+
+
+def _get_state_benchmarks() -> List[Benchmark]:
+    def setup_shop(n):
+        sessions = []
+        for _ in range(n):
+            s = new_session()
+            s.inventory_ids = full_inventory()
+            s.in_shop = True
+            s.shop_items = ENGINE.generate_shop_items(3)
+            sessions.append(s)
+        return sessions
+
+    return [
+        Benchmark(
+            name="session.get_state().dict()[fresh]",
+            group="session",
+            setup=lambda n: _cycle([new_session() for _ in range(min(n, 64))], n),
+            run=lambda s: s.get_state().dict(),
+            number=1000,
+        ),
+        Benchmark(
+            name="session.get_state().dict()[shop+inventory]",
+            group="session",
+            setup=lambda n: _cycle(setup_shop(min(n, 64)), n),
+            run=lambda s: s.get_state().dict(),
+            number=1000,
+        ),
+    ]
+
+
+def _decode_request_benchmarks(seed: int) -> List[Benchmark]:
+    """Decoding a 5-card `/api/preview_hand` body: Card objects vs compact codes."""
+    corpus = hand_corpus(CORPUS_SIZE, 5, 0.3, seed + 500)
+    bodies = {
+        "model": [json.dumps([c.dict() for c in cards]).encode() for cards in corpus],
+        "code": [json.dumps([card_code(c) for c in cards]).encode() for cards in corpus],
+    }
+    decoders = {
+        "model": lambda body: [Card(**c) for c in json.loads(body)],
+        "code": lambda body: [parse_card_code(c) for c in json.loads(body)],
+    }
+    return [
+        Benchmark(
+            name=f"decode_request[5-{fmt}]",
+            group="codec",
+            setup=lambda n, b=bodies[fmt]: _cycle(b, n),
+            run=decoders[fmt],
+            number=1000,
+        )
+        for fmt in ("model", "code")
+    ]
+
+
+def _autoplayer_benchmarks() -> List[Benchmark]:
+    """One hint decision for a freshly dealt hand (greedy, and one ply of expectimax)."""
+    return [
+        Benchmark(
+            name=f"suggest_move[depth={depth}]",
+            group="autoplayer",
+            setup=lambda n: [new_session() for _ in range(n)],
+            run=lambda s, d=depth: suggest_move(s, depth=d, time_budget=1.0),
+            number=number,
+        )
+        for depth, number in ((0, 500), (1, 100))
+    ]
+
+
+def build_benchmarks(seed: int = 1234) -> List[Benchmark]:
+    benches: List[Benchmark] = []
+    benches += _evaluate_hand_benchmarks(seed)
+    benches += _evaluate_preview_benchmarks(seed)
+    benches.append(_apply_turbo_benchmark(seed))
+    benches.append(_draw_cards_benchmark())
+    benches.append(_play_hand_benchmark(seed))
+    benches.append(_next_round_benchmark(seed, purchased=0))
+    benches.append(_next_round_benchmark(seed, purchased=250))
+    benches += _get_state_benchmarks()
+    benches += _decode_request_benchmarks(seed)
+    benches += _autoplayer_benchmarks()
+    return benches
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    return main(build_benchmarks, "Ballantro evaluator / session microbenchmarks", argv)
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,140 @@
+"""
+Requests and bytes per page load, with and without the static asset pipeline.
+
+Simulates a browser loading `/` and every `/static/...` file the page links,
+first with an empty cache (cold) and then again with everything cached (warm):
+responses marked `immutable` are reused without a request, everything else is
+revalidated with `If-None-Match` / `If-Modified-Since`.
+
+    python -m benchmarks.page_load
+    python -m benchmarks.page_load --json page.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from .harness import environment_info, write_results
+
+ACCEPT_ENCODING = "gzip, deflate, br"
+_REF = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+
+async def _get(app, path: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+    status, resp_headers, chunks = 0, {}, []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            resp_headers.update({k.decode().lower(): v.decode() for k, v in message.get("headers", [])})
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, resp_headers, b"".join(chunks)
+
+
+def _decompress(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "br":
+        import brotli  # only negotiated when the server has it installed
+        return brotli.decompress(body)
+    return body
+
+
+async def _page_load(app, cache: Dict[str, Dict[str, str]]) -> Dict[str, Any]:
+    requests = bytes_in = not_modified = 0
+
+    async def fetch(path: str) -> Optional[bytes]:
+        nonlocal requests, bytes_in, not_modified
+        cached = cache.get(path)
+        headers = {"accept-encoding": ACCEPT_ENCODING}
+        if cached is not None:
+            if "immutable" in cached.get("cache-control", ""):
+                return None  # served from the browser cache, no request at all
+            if "etag" in cached:
+                headers["if-none-match"] = cached["etag"]
+            if "last-modified" in cached:
+                headers["if-modified-since"] = cached["last-modified"]
+        status, resp_headers, body = await _get(app, path, headers)
+        requests += 1
+        bytes_in += len(body)
+        if status == 304:
+            not_modified += 1
+        elif status == 200:
+            cache[path] = resp_headers
+        return _decompress(body, resp_headers.get("content-encoding", ""))
+
+    html = await fetch("/")
+    if html is None:
+        html = b""
+    refs = _REF.findall(html.decode("utf-8", "replace")) if html else cache.get("/", {}).get("_refs", [])
+    if html:
+        cache.setdefault("/", {})["_refs"] = refs
+    for ref in refs:
+        await fetch(ref)
+    return {"requests": requests, "bytes": bytes_in, "not_modified": not_modified, "assets": len(refs)}
+
+
+def measure_current() -> Dict[str, Any]:
+    logging.disable(logging.CRITICAL)
+    import main as server
+
+    async def run():
+        cache: Dict[str, Dict[str, str]] = {}
+        cold = await _page_load(server.app, cache)
+        warm = await _page_load(server.app, cache)
+        return {"cold": cold, "warm": warm}
+
+    return asyncio.run(run())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ballantro page-load requests / bytes")
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    parser.add_argument("--measure-current", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure_current:
+        print(json.dumps(measure_current()))
+        return 0
+
+    results = {}
+    for label, flag in (("disk", "0"), ("pipeline", "1")):
+        env = dict(os.environ, BALLANTRO_ASSET_PIPELINE=flag)
+        out = subprocess.run([sys.executable, "-m", "benchmarks.page_load", "--measure-current"],
+                             env=env, capture_output=True, text=True, check=True).stdout
+        results[label] = json.loads(out.strip().splitlines()[-1])
+
+    print(f"{'mode':<10} {'visit':<6} {'requests':>9} {'304s':>6} {'KiB':>9}")
+    for label, res in results.items():
+        for visit in ("cold", "warm"):
+            r = res[visit]
+            print(f"{label:<10} {visit:<6} {r['requests']:>9} {r['not_modified']:>6} {r['bytes'] / 1024:>9.1f}")
+    if args.json:
+        write_results(args.json, {"meta": environment_info(0), "results": results})
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Replay verification (`backend.replay`): check a leaderboard, or measure how
+fast games are verified.
+
+With `--highscores`, every entry of that file is replayed and the failures
+are listed (exit status 1 if there are any).  Otherwise `--games` games are
+played by the autoplayer first and then verified, in-process and over
+`--workers` processes, reporting replays per second.
+
+    python -m benchmarks.replay --highscores highscores.json --workers 4
+    python -m benchmarks.replay --games 500 --workers 4 --json replay.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import warnings
+from typing import Any, Dict, List, Optional
+
+from backend.hand_tables import load_tables
+
+from .harness import environment_info, write_results
+
+
+def _timed_verify(entries: List[Dict[str, Any]], workers: int) -> Dict[str, Any]:
+    from backend.replay import summarize, verify_entries
+
+    started = time.perf_counter()
+    results = verify_entries(entries, workers=workers)
+    elapsed = time.perf_counter() - started
+    return {**summarize(results), "workers": workers, "seconds": elapsed,
+            "replays_per_second": len(results) / elapsed if elapsed else 0.0}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ballantro replay verification")
+    parser.add_argument("--highscores", metavar="PATH", help="verify the entries of this highscores file")
+    parser.add_argument("--games", type=int, default=200, help="autoplayer games to verify (without --highscores)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    args = parser.parse_args(argv)
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    load_tables()
+
+    if args.highscores:
+        with open(args.highscores) as f:
+            entries = json.load(f)
+        result = _timed_verify(entries, args.workers)
+        print(f"{result['verified']}/{result['entries']} highscores verified, {result['skipped']} skipped "
+              f"(no transcript or newer rules; {result['replays_per_second']:.0f} replays/s, {args.workers} workers)")
+        for failure in result["failed"]:
+            print(f"  {failure['name']!r} ({failure['claimed']}, {failure['timestamp']}): {failure['reason']}")
+        return 1 if result["failed"] else 0
+
+    from backend.simulation import play_games
+
+    entries: List[Dict[str, Any]] = []
+    play_games(args.games, depth=0, max_nodes=1, time_budget=0.05, seed=args.seed, record=entries)
+    results = {"single": _timed_verify(entries, 1)}
+    if args.workers > 1:
+        results["parallel"] = _timed_verify(entries, args.workers)
+    for name, result in results.items():
+        print(f"  {name:<10} {result['replays_per_second']:>8.0f} replays/s   "
+              f"({result['verified']}/{result['entries']} verified, {result['workers']} workers)")
+    if args.json:
+        write_results(args.json, {"meta": environment_info(args.seed), "results": results, "args": vars(args)})
+        print(f"Results written to {args.json}")
+    return 0 if all(not r["failed"] for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Throughput vs. worker count for the session-sharded launcher (`serve.py`).
+
+For each worker count the launcher is started on a free port, several
+`benchmarks.loadgen --url` client processes hammer it for a fixed time, and
+the combined req/s is compared with the single-worker run:
+
+    efficiency = rps(N) / (N × rps(1))
+
+Clients run in their own processes so the load generator isn't the
+bottleneck; on a machine with fewer cores than workers + clients the numbers
+mostly measure contention.
+
+    python -m benchmarks.scaling --workers 1 2 4 --clients 4 --duration 15
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from urllib.request import urlopen
+
+from .harness import environment_info, write_results
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urlopen(f"{url}/api/highscores", timeout=2) as resp:
+                if resp.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not come up")
+
+
+def run_point(workers: int, args) -> Dict[str, Any]:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--routers", str(args.routers or max(1, workers // 2))],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_ready(url)
+        out_dir = tempfile.mkdtemp(prefix="ballantro-scaling-")
+        clients = []
+        for c in range(args.clients):
+            out = os.path.join(out_dir, f"client-{c}.json")
+            cmd = [sys.executable, "-m", "benchmarks.loadgen", "--url", url,
+                   "--players", str(args.players), "--duration", str(args.duration),
+                   "--seed", str(args.seed + c), "--json", out]
+            clients.append((subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=subprocess.DEVNULL), out))
+        total_rps = total_requests = total_errors = 0.0
+        for proc, out in clients:
+            proc.wait()
+            with open(out) as f:
+                load = json.load(f)["load"]
+            total_rps += load["throughput_rps"]
+            total_requests += load["total_requests"]
+            total_errors += load["total_errors"]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return {"workers": workers, "rps": total_rps, "requests": int(total_requests), "errors": int(total_errors)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ballantro req/s scaling across serve.py worker counts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--routers", type=int, default=None, help="router processes (default: workers / 2)")
+    parser.add_argument("--clients", type=int, default=4, help="load-generator processes")
+    parser.add_argument("--players", type=int, default=25, help="virtual players per client")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per data point")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    args = parser.parse_args(argv)
+
+    points = []
+    for workers in args.workers:
+        point = run_point(workers, args)
+        points.append(point)
+        print(f"{workers} worker(s): {point['rps']:.1f} req/s ({point['errors']} errors)", flush=True)
+
+    base = next((p["rps"] for p in points if p["workers"] == 1), None)
+    print(f"\n{'workers':>7} {'req/s':>10} {'speedup':>8} {'efficiency':>10}")
+    for p in points:
+        if base:
+            p["speedup"] = p["rps"] / base
+            p["efficiency"] = p["speedup"] / p["workers"]
+            print(f"{p['workers']:>7} {p['rps']:>10.1f} {p['speedup']:>7.2f}x {p['efficiency']:>9.0%}")
+        else:
+            print(f"{p['workers']:>7} {p['rps']:>10.1f}")
+    print(f"(cores available: {os.cpu_count()})")
+    if args.json:
+        write_results(args.json, {"meta": environment_info(args.seed), "results": points, "args": vars(args)})
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Import-time and startup-time benchmark: how long a fresh process takes to be useful.
+
+Every sample is a brand-new interpreter (nothing cached in `sys.modules`), as
+in a container cold start or a `--reload` cycle:
+
+* ``import_main``     – `import main` inside the child;
+* ``first_response``  – `import main` + ASGI lifespan startup + first `GET /`
+  + first `POST /api/new_game`, in-process;
+* ``uvicorn_ready``   – spawning `python -m uvicorn main:app` until it answers
+  `GET /` over TCP (includes interpreter start-up).
+
+Results use the harness format, so `--compare baseline.json` works:
+
+    python -m benchmarks.startup --repeat 10 --json startup.json
+    python -m benchmarks.startup --importtime 15     # slowest imports
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from urllib.request import urlopen
+
+from .harness import RESULTS_FORMAT_VERSION, compare_results, environment_info, load_results, write_results
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line of phase timings (seconds).
+_CHILD = r"""
+import asyncio, json, logging, time, warnings
+t0 = time.perf_counter()
+logging.disable(logging.CRITICAL)
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+import main
+t_import = time.perf_counter()
+from benchmarks.loadgen import ASGITransport
+
+async def first_requests():
+    transport = ASGITransport(main.app)
+    await transport.start()
+    conn = transport.connection()
+    status, _ = await conn.request("GET", "/")
+    assert status == 200, status
+    status, data = await conn.request("POST", "/api/new_game", {"debug_mode": False})
+    assert status == 200 and data["success"], status
+    await transport.close()
+
+asyncio.run(first_requests())
+t_first = time.perf_counter()
+print(json.dumps({"import_main": t_import - t0, "first_response": t_first - t0}))
+"""
+
+
+def _child_sample() -> Dict[str, float]:
+    out = subprocess.run([sys.executable, "-c", _CHILD], cwd=REPO_ROOT, capture_output=True,
+                         text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _uvicorn_sample(timeout: float = 60.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port),
+                             "--log-level", "error"], cwd=REPO_ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urlopen(f"http://127.0.0.1:{port}/", timeout=2) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("uvicorn did not become ready")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def _summarise(samples: List[float]) -> Dict[str, Any]:
+    ns = [s * 1e9 for s in samples]
+    return {
+        "group": "startup",
+        "unit": "process",
+        "number": 1,
+        "repeat": len(ns),
+        "min_ns": min(ns),
+        "median_ns": statistics.median(ns),
+        "mean_ns": statistics.fmean(ns),
+        "stdev_ns": statistics.pstdev(ns),
+        "ops_per_sec": 1e9 / statistics.median(ns),
+    }
+
+
+def import_profile(top: int) -> List[Dict[str, Any]]:
+    """Slowest modules by cumulative import time (`python -X importtime`)."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=REPO_ROOT,
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = (p.strip() for p in line[len("import time:"):].split("|"))
+        rows.append({"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    rows.sort(key=lambda r: r["cumulative_us"], reverse=True)
+    return rows[:top]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ballantro import / startup time")
+    parser.add_argument("--repeat", type=int, default=7, help="fresh processes per measurement")
+    parser.add_argument("--no-uvicorn", action="store_true", help="skip the uvicorn-ready measurement")
+    parser.add_argument("--importtime", type=int, metavar="N", help="also list the N slowest imports")
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved results file")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit 1 if any measurement is slower than the baseline beyond --tolerance")
+    args = parser.parse_args(argv)
+
+    _child_sample()  # warm the OS page cache / .pyc files so run 1 isn't an outlier
+    child = [_child_sample() for _ in range(args.repeat)]
+    results = {
+        "startup.import_main": _summarise([c["import_main"] for c in child]),
+        "startup.first_response": _summarise([c["first_response"] for c in child]),
+    }
+    if not args.no_uvicorn:
+        results["startup.uvicorn_ready"] = _summarise([_uvicorn_sample() for _ in range(args.repeat)])
+
+    print(f"{'measurement':<28} {'min ms':>9} {'median ms':>10} {'stdev ms':>9}")
+    for name, r in results.items():
+        print(f"{name:<28} {r['min_ns'] / 1e6:>9.1f} {r['median_ns'] / 1e6:>10.1f} {r['stdev_ns'] / 1e6:>9.1f}")
+
+    data = {"format": RESULTS_FORMAT_VERSION, "meta": environment_info(0), "results": results}
+    if args.importtime:
+        data["import_profile"] = import_profile(args.importtime)
+        print(f"\n{'module':<44} {'cumulative ms':>14} {'self ms':>9}")
+        for row in data["import_profile"]:
+            print(f"{row['module']:<44} {row['cumulative_us'] / 1e3:>14.1f} {row['self_us'] / 1e3:>9.1f}")
+    regressions: List[str] = []
+    if args.compare:
+        regressions = compare_results(data, load_results(args.compare), args.tolerance)
+    if args.json:
+        write_results(args.json, data)
+        print(f"Results written to {args.json}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
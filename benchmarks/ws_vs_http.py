@@ -0,0 +1,291 @@
+"""
+Actions per second per core: WebSocket channel vs. one HTTP request per action.
+
+Both transports replay the same scripted game loop (preview → draw → preview
+→ play, `next_round` whenever the shop opens, a fresh game when one ends) so
+the only difference is how each action travels to the engine.
+
+* in-process (default): ASGI calls straight into `main.app`; CPU time is this
+  process, i.e. the application plus a negligible driver.
+* ``--url http://127.0.0.1:8001 --server-pid PID``: real sockets against a
+  running uvicorn; CPU time is read from the server's /proc entry.
+
+    python -m benchmarks.ws_vs_http --sessions 8 --actions 4000
+    python -m benchmarks.ws_vs_http --url http://127.0.0.1:8001 --server-pid 4242 --json ws.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import os
+import sys
+import time
+import warnings
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .harness import environment_info, write_results
+from .loadgen import ASGITransport, HTTPTransport
+
+
+# ------------------------------------------------------------------ #
+#  WebSocket clients                                                 #
+# ------------------------------------------------------------------ #
+class ASGIWebSocket:
+    """In-process WebSocket connection to an ASGI app."""
+
+    def __init__(self, app, path: str):
+        self.app, self.path = app, path
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        scope = {"type": "websocket", "asgi": {"version": "3.0"}, "scheme": "ws", "path": self.path,
+                 "raw_path": self.path.encode(), "query_string": b"", "root_path": "",
+                 "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0),
+                 "server": ("bench", 80), "subprotocols": []}
+        self._task = asyncio.create_task(self.app(scope, self._inbox.get, self._outbox.put))
+        await self._inbox.put({"type": "websocket.connect"})
+        message = await self._outbox.get()
+        if message["type"] != "websocket.accept":
+            raise ConnectionError(f"WebSocket rejected: {message}")
+
+    async def send_text(self, text: str):
+        await self._inbox.put({"type": "websocket.receive", "text": text})
+
+    async def receive_text(self) -> str:
+        message = await self._outbox.get()
+        if message["type"] != "websocket.send":
+            raise ConnectionError(f"WebSocket closed: {message}")
+        return message.get("text") or message.get("bytes", b"").decode()
+
+    async def close(self):
+        await self._inbox.put({"type": "websocket.disconnect", "code": 1000})
+        if self._task:
+            await asyncio.wait_for(self._task, timeout=5)
+
+
+class SocketWebSocket:
+    """Minimal RFC 6455 client (text frames, no extensions) over asyncio streams."""
+
+    def __init__(self, host: str, port: int, path: str):
+        self.host, self.port, self.path = host, port, path
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.writer.write((f"GET {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                           f"Upgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n"
+                           f"Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        await self.writer.drain()
+        status = await self.reader.readline()
+        if b" 101 " not in status:
+            raise ConnectionError(f"WebSocket upgrade failed: {status!r}")
+        while (await self.reader.readline()) not in (b"\r\n", b""):
+            pass
+
+    async def send_text(self, text: str, opcode: int = 0x1):
+        data = text.encode() if isinstance(text, str) else text
+        n = len(data)
+        header = bytearray([0x80 | opcode])
+        if n < 126:
+            header.append(0x80 | n)
+        elif n < 1 << 16:
+            header += bytes([0x80 | 126]) + n.to_bytes(2, "big")
+        else:
+            header += bytes([0x80 | 127]) + n.to_bytes(8, "big")
+        mask = os.urandom(4)
+        repeated = (mask * (n // 4 + 1))[:n]
+        masked = (int.from_bytes(data, "big") ^ int.from_bytes(repeated, "big")).to_bytes(n, "big")
+        self.writer.write(bytes(header) + mask + masked)
+        await self.writer.drain()
+
+    async def receive_text(self) -> str:
+        while True:
+            b0, b1 = await self.reader.readexactly(2)
+            opcode, n = b0 & 0x0F, b1 & 0x7F
+            if n == 126:
+                n = int.from_bytes(await self.reader.readexactly(2), "big")
+            elif n == 127:
+                n = int.from_bytes(await self.reader.readexactly(8), "big")
+            payload = await self.reader.readexactly(n)
+            if opcode == 0x8:
+                raise ConnectionError("WebSocket closed by server")
+            if opcode == 0x9:
+                await self.send_text(payload, opcode=0xA)  # pong
+                continue
+            return payload.decode()
+
+    async def close(self):
+        if self.writer is not None:
+            try:
+                await self.send_text(b"\x03\xe8", opcode=0x8)
+            except Exception:
+                pass
+            self.writer.close()
+
+
+# ------------------------------------------------------------------ #
+#  Uniform "run one action" adapters                                 #
+# ------------------------------------------------------------------ #
+class HTTPActions:
+    def __init__(self, conn, sid: str):
+        self.conn, self.sid = conn, sid
+
+    async def __call__(self, action: str, cards: Optional[List[int]] = None) -> Dict[str, Any]:
+        sid = self.sid
+        if action == "state":
+            status, data = await self.conn.request("GET", f"/api/game_state/{sid}")
+        elif action == "preview":
+            status, data = await self.conn.request("POST", f"/api/preview/{sid}", {"selected_cards": cards})
+        elif action in ("draw", "play"):
+            path = "/api/draw_cards" if action == "draw" else "/api/play_hand"
+            status, data = await self.conn.request("POST", path, {"session_id": sid, "selected_cards": cards})
+        elif action == "next_round":
+            status, data = await self.conn.request("POST", f"/api/shop/{sid}/next_round")
+        else:
+            raise ValueError(action)
+        return data if status == 200 and data else {"success": False}
+
+    async def close(self):
+        pass
+
+
+class WSActions:
+    def __init__(self, ws, sid: str):
+        self.ws, self.sid, self.seq = ws, sid, 0
+
+    async def __call__(self, action: str, cards: Optional[List[int]] = None) -> Dict[str, Any]:
+        self.seq += 1
+        message = {"id": self.seq, "action": action}
+        if cards is not None:
+            message["cards"] = cards
+        await self.ws.send_text(json.dumps(message, separators=(",", ":")))
+        return json.loads(await self.ws.receive_text())
+
+    async def close(self):
+        await self.ws.close()
+
+
+# ------------------------------------------------------------------ #
+#  Workload                                                          #
+# ------------------------------------------------------------------ #
+async def scripted_session(run, state: Dict[str, Any], budget: int) -> int:
+    """Play until the game ends or `budget` actions were sent; returns actions sent."""
+    sent = 0
+    while sent < budget and not state["is_game_over"]:
+        if state["in_shop"]:
+            reply = await run("next_round")
+            sent += 1
+        else:
+            hand_size = len(state["hand"])
+            if hand_size < 5:
+                break
+            await run("preview", [0, 1])
+            sent += 1
+            if state["draws_used"] < state["max_draws"]:
+                reply = await run("draw", [0, 1])
+            else:
+                await run("preview", [0, 1, 2, 3, 4])
+                sent += 1
+                reply = await run("play", [0, 1, 2, 3, 4])
+            sent += 1
+        if not reply.get("success"):
+            break
+        state = reply["game_state"]
+    return sent
+
+
+async def run_transport(kind: str, args) -> Dict[str, Any]:
+    if args.url:
+        transport = HTTPTransport(args.url)
+        parts = urlsplit(args.url)
+    else:
+        import main as server
+        transport = ASGITransport(server.app)
+    await transport.start()
+
+    per_session = args.actions // args.sessions
+    totals = {"actions": 0, "games": 0}
+
+    async def worker():
+        conn = transport.connection()
+        while totals["actions"] < args.actions:
+            status, data = await conn.request("POST", "/api/new_game", {"debug_mode": False})
+            state = data["game_state"]
+            sid = state["session_id"]
+            if kind == "ws":
+                ws = (SocketWebSocket(parts.hostname, parts.port or 80, f"/ws/{sid}") if args.url
+                      else ASGIWebSocket(server.app, f"/ws/{sid}"))
+                await ws.connect()
+                run = WSActions(ws, sid)
+            else:
+                run = HTTPActions(conn, sid)
+            sent = await scripted_session(run, state, per_session)
+            await run.close()
+            totals["actions"] += sent
+            totals["games"] += 1
+        await conn.aclose()
+
+    cpu_start = _cpu_seconds(args.server_pid if args.url else None)
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.sessions)))
+    wall = time.perf_counter() - wall_start
+    cpu = _cpu_seconds(args.server_pid if args.url else None) - cpu_start
+    await transport.close()
+    return {
+        "transport": kind,
+        "actions": totals["actions"],
+        "games": totals["games"],
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "actions_per_sec": totals["actions"] / wall if wall else 0.0,
+        "actions_per_cpu_sec": totals["actions"] / cpu if cpu else 0.0,
+    }
+
+
+def _cpu_seconds(pid: Optional[int]) -> float:
+    if pid is None:
+        return time.process_time()
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="WebSocket vs HTTP actions per second per core")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions / connections")
+    parser.add_argument("--actions", type=int, default=3000, help="actions per transport")
+    parser.add_argument("--url", help="target a running server, e.g. http://127.0.0.1:8001")
+    parser.add_argument("--server-pid", type=int, help="with --url: PID whose CPU time is measured")
+    parser.add_argument("--json", metavar="PATH", help="write machine-readable results to PATH")
+    parser.add_argument("--log", action="store_true", help="keep the server's INFO logging (in-process)")
+    args = parser.parse_args(argv)
+    if args.url and not args.server_pid:
+        parser.error("--url needs --server-pid to measure CPU per action")
+    if not args.log:
+        logging.disable(logging.CRITICAL)
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+    results = [asyncio.run(run_transport(kind, args)) for kind in ("http", "ws")]
+    print(f"{'transport':<10} {'actions':>8} {'wall s':>8} {'cpu s':>8} {'act/s':>10} {'act/cpu-s':>10}")
+    for r in results:
+        print(f"{r['transport']:<10} {r['actions']:>8} {r['wall_seconds']:>8.2f} {r['cpu_seconds']:>8.2f} "
+              f"{r['actions_per_sec']:>10.1f} {r['actions_per_cpu_sec']:>10.1f}")
+    http, ws = results
+    if http["actions_per_cpu_sec"]:
+        print(f"\nWebSocket / HTTP actions per core: {ws['actions_per_cpu_sec'] / http['actions_per_cpu_sec']:.2f}x")
+    if args.json:
+        write_results(args.json, {"meta": environment_info(0), "results": results, "args": vars(args)})
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,29 @@
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, WebSocket, WebSocketDisconnect, Header
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse
-import uvicorn
+from fastapi.responses import HTMLResponse, FileResponse, Response, JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
 import os, random # random for debug deck
+import json
 import logging
+from typing import Callable, Literal, Optional
 from pydantic import BaseModel
 
 from backend.game_engine import GameEngine
-from backend.models import GameAction, GameState, Card, SaveScoreRequest
+from backend.game_actions import dispatch_action, run_batch, MUTATING_ACTIONS
+from backend.static_assets import AssetPipeline, CachedPage, IMMUTABLE_CACHE, REVALIDATE_CACHE, inline_stylesheets
+from backend.models import GameAction, GameState, Card, SaveScoreRequest, PreviewRequest, BatchRequest, JobRequest
+from backend.poker_evaluator import PokerEvaluator
+from backend.catalog import CATALOG_JSON, CATALOG_VERSION, catalog_url
+from backend.card_codes import card_code, compact_cards, parse_card_code
+from backend.preview_cache import PreviewCache, canonical_selection_key, is_cacheable, serialize_preview
+from backend.idempotency import IdempotencyKeyReused, validate_key
+from backend.autoplayer import DEFAULT_DEPTH, DEFAULT_MAX_NODES, DEFAULT_TIME_BUDGET
+from backend.jobs import JobManager
+from backend.hand_tables import load_tables
+from backend.replay import verify_entry
+from backend.snapshot import snapshot_path
 
 app = FastAPI(title="Ballantro", description="Single-player poker card game")
 
@@ -26,75 +40,220 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Static files: fingerprinted + precompressed in memory at startup.
+# Set BALLANTRO_ASSET_PIPELINE=0 (e.g. while editing JS/CSS) to serve straight from disk.
+ASSET_PIPELINE_ENABLED = os.environ.get("BALLANTRO_ASSET_PIPELINE", "1") != "0"
+asset_pipeline = AssetPipeline("static").build() if ASSET_PIPELINE_ENABLED else None
+static_files = StaticFiles(directory="static")
 
-# Templates
-templates = Jinja2Templates(directory="templates")
+# Templates – Jinja is only needed to render the index page, so it is
+# imported on first render rather than at startup.
+_templates = None
 
-# Game engine instance
-game_engine = GameEngine()
+def get_templates():
+    global _templates
+    if _templates is None:
+        from fastapi.templating import Jinja2Templates
+        _templates = Jinja2Templates(directory="templates")
+    return _templates
+
+# Stylesheets to inline into the index page: "all", or comma-separated paths
+# relative to static/ (e.g. "css/base.css,css/layout.css"). Empty = link them.
+INLINE_CSS = os.environ.get("BALLANTRO_INLINE_CSS", "").strip()
+
+def _render_index() -> str:
+    """Render templates/index.html – it has no per-request data, so once is enough"""
+    html = get_templates().get_template("index.html").render({"catalog_url": catalog_url()})
+    if INLINE_CSS:
+        only = None if INLINE_CSS.lower() in ("1", "all") else [p.strip() for p in INLINE_CSS.split(",")]
+        html = inline_stylesheets(html, "static", only)
+    if asset_pipeline is not None:
+        html = asset_pipeline.rewrite(html)
+    return html
+
+# Rendered on the first request, re-rendered only when the template file changes
+index_page = CachedPage(_render_index, source_path=os.path.join("templates", "index.html"))
+
+# Effect / turbo chip / boss metadata, serialized once; states only carry ids
+catalog_page = CachedPage(lambda: CATALOG_JSON, content_type="application/json", name="catalog")
+
+# Everything the server writes and must keep across restarts – the highscores, their lock
+# file and score log, and the session snapshots – goes in BALLANTRO_DATA_DIR (default: the
+# working directory). Containers mount a volume there.
+DATA_DIR = os.environ.get("BALLANTRO_DATA_DIR", "")
+
+# The one game engine: every session, shop and highscore goes through it.
+# Highscores are loaded on first use, not here. Under serve.py every worker gets its own id, which
+# prefixes its session ids so the front router can find the owning worker.
+WORKER_ID = os.environ.get("BALLANTRO_WORKER_ID")
+game_engine = GameEngine(session_prefix=f"w{WORKER_ID}-" if WORKER_ID is not None else "",
+                         highscores_file=os.path.join(DATA_DIR, "highscores.json"))
+
+# Hand classification tables (backend.hand_tables): mapped – or, if missing, built – before the
+# first request is served; scoring never builds them. A failure here aborts startup.
+app.router.add_event_handler("startup", load_tables)
+
+# Simulations / deep searches, run in a small low-priority process pool started on first use
+job_manager = JobManager(game_engine, id_prefix=game_engine.session_prefix)
+app.router.add_event_handler("shutdown", job_manager.shutdown)
+
+# Warm restarts: live sessions are written to a snapshot on shutdown and restored,
+# lazily, by the next process (one file per serve.py worker; serve.py first moves each
+# record to the file of the worker that now owns its session, see rebalance_snapshots).
+# Uvicorn runs shutdown handlers only after in-flight requests have drained, and engine
+# actions never await, so the snapshot never sees a half-applied action. Set BALLANTRO_SNAPSHOT=""
+# to turn this off.
+SNAPSHOT_PATH = os.environ.get("BALLANTRO_SNAPSHOT", snapshot_path(DATA_DIR, WORKER_ID))
+if SNAPSHOT_PATH:
+    app.router.add_event_handler("startup", lambda: game_engine.load_snapshot(SNAPSHOT_PATH))
+    app.router.add_event_handler("shutdown", lambda: game_engine.save_snapshot(SNAPSHOT_PATH))
+
+# Preview responses keyed on the (order-independent) selected card multiset
+PREVIEW_CACHE_SIZE = 4096
+preview_cache = PreviewCache(maxsize=PREVIEW_CACHE_SIZE)
+EMPTY_PREVIEW_PAYLOAD = serialize_preview(None)
+
+# Card wire format: routes that return cards take `?cards=code` to get compact
+# codes ("AH", "10S", "KD+bonus_chips_50") instead of {suit, rank, effects} objects
+CardFormat = Literal["object", "code"]
+
+def with_card_format(payload: dict, cards: CardFormat) -> dict:
+    return compact_cards(payload) if cards == "code" else payload
+
+def run_idempotent(session_id: str, key: Optional[str], fingerprint: str, run: Callable[[], dict]):
+    """
+    Run a mutating action at most once per `Idempotency-Key` header.  Its
+    response – or 4xx error – is kept in the session's response ring and
+    replayed byte for byte to retries with the same key, without reaching the
+    engine.  `fingerprint` identifies the request, so a key reused for a
+    different one is rejected (422) instead of replayed.
+    """
+    if key is None:
+        return run()
+    try:
+        validate_key(key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session = game_engine.find_session(session_id)
+    if session is None:
+        return run()  # reports the unknown session
+    ring = session.response_ring()
+    try:
+        cached = ring.get(key, fingerprint)
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if cached is not None:
+        logger.info(f"API: replaying response for idempotency key {key!r} (session {session_id})")
+        status, body = cached
+        return Response(content=body, status_code=status, media_type="application/json",
+                        headers={"Idempotent-Replayed": "true"})
+    try:
+        response = JSONResponse(jsonable_encoder(run()))
+    except HTTPException as e:
+        if e.status_code < 500:
+            ring.put(key, fingerprint, e.status_code, JSONResponse({"detail": e.detail}).body)
+        raise
+    ring.put(key, fingerprint, response.status_code, response.body)
+    return response
 
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
     """Serve the favicon.ico file"""
     return FileResponse("static/favicon.ico")
 
-@app.get("/", response_class=HTMLResponse)
+@app.api_route("/static/{asset_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_static(asset_path: str, request: Request):
+    """Serve a static file, preferring the precompressed in-memory copy"""
+    if asset_pipeline is not None:
+        response = asset_pipeline.response(
+            asset_path,
+            accept_encoding=request.headers.get("accept-encoding", ""),
+            if_none_match=request.headers.get("if-none-match", ""),
+            head=request.method == "HEAD",
+            range_header=request.headers.get("range", ""),
+            if_range=request.headers.get("if-range", ""),
+        )
+        if response is not None:
+            return response
+    return await static_files.get_response(asset_path, request.scope)
+
+@app.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse)
 async def read_root(request: Request):
-    """Serve the main game page"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    """Serve the main game page (pre-rendered and precompressed)"""
+    return index_page.response(
+        accept_encoding=request.headers.get("accept-encoding", ""),
+        if_none_match=request.headers.get("if-none-match", ""),
+        head=request.method == "HEAD",
+    )
+
+@app.api_route("/api/catalog", methods=["GET", "HEAD"])
+async def get_catalog(request: Request, v: str = ""):
+    """Card effects, turbo chips and bosses, keyed by the ids used in game states"""
+    # The versioned URL (?v=<current version>) never changes content, so it may be cached for good
+    return catalog_page.response(
+        accept_encoding=request.headers.get("accept-encoding", ""),
+        if_none_match=request.headers.get("if-none-match", ""),
+        head=request.method == "HEAD",
+        cache_control=IMMUTABLE_CACHE if v == CATALOG_VERSION else REVALIDATE_CACHE,
+    )
 
 class NewGameRequest(BaseModel):
     debug_mode: bool = False
 
 @app.post("/api/new_game")
-async def new_game(request_data: NewGameRequest = NewGameRequest()):
+async def new_game(request_data: NewGameRequest = NewGameRequest(), cards: CardFormat = "object"):
     """Start a new game session"""
     try:
         game_state = game_engine.new_game(debug_mode=request_data.debug_mode)
         log_msg = f"API: New game created. Session ID: {game_state.session_id}. Debug: {request_data.debug_mode}. Initial hand: {[str(c) for c in game_state.hand]}"
         logger.info(log_msg)
-        return {"success": True, "game_state": game_state.dict()}
+        return with_card_format({"success": True, "game_state": game_state.dict()}, cards)
     except Exception as e:
         logger.error(f"API Error: /api/new_game - {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/draw_cards")
-async def draw_cards(action: GameAction):
+async def draw_cards(action: GameAction, cards: CardFormat = "object", idempotency_key: Optional[str] = Header(None)):
     """Draw new cards by discarding selected ones"""
     logger.info(f"API: /api/draw_cards called for session {action.session_id} with cards {action.selected_cards}")
-    try:
-        game_state = game_engine.draw_cards(action.session_id, action.selected_cards)
-        logger.info(f"API: /api/draw_cards response for session {action.session_id}. New hand: {[str(c) for c in game_state.hand]}")
-        return {"success": True, "game_state": game_state.dict()}
-    except Exception as e:
-        logger.error(f"API Error: /api/draw_cards - {str(e)}", exc_info=True)
-        raise HTTPException(status_code=400, detail=str(e))
+    def run():
+        try:
+            game_state = game_engine.draw_cards(action.session_id, action.selected_cards)
+            logger.info(f"API: /api/draw_cards response for session {action.session_id}. New hand: {[str(c) for c in game_state.hand]}")
+            return with_card_format({"success": True, "game_state": game_state.dict()}, cards)
+        except Exception as e:
+            logger.error(f"API Error: /api/draw_cards - {str(e)}", exc_info=True)
+            raise HTTPException(status_code=400, detail=str(e))
+    return run_idempotent(action.session_id, idempotency_key, f"draw_cards {action.selected_cards} {cards}", run)
 
 @app.post("/api/play_hand")
-async def play_hand(action: GameAction):
+async def play_hand(action: GameAction, cards: CardFormat = "object", idempotency_key: Optional[str] = Header(None)):
     """Play the selected cards and calculate score"""
     logger.info(f"API: /api/play_hand called for session {action.session_id} with cards {action.selected_cards}")
-    try:
-        result = game_engine.play_hand(action.session_id, action.selected_cards)
-        logger.info(f"API: /api/play_hand response for session {action.session_id}. Result hand: {[str(c) for c in result['game_state']['hand']]}. Hand type: {result['hand_result']['hand_type']}")
-        return {"success": True, **result}
-    except Exception as e:
-        logger.error(f"API Error: /api/play_hand - {str(e)}", exc_info=True)
-        raise HTTPException(status_code=400, detail=str(e))
+    def run():
+        try:
+            result = game_engine.play_hand(action.session_id, action.selected_cards)
+            logger.info(f"API: /api/play_hand response for session {action.session_id}. Result hand: {[str(c) for c in result['game_state']['hand']]}. Hand type: {result['hand_result']['hand_type']}")
+            return with_card_format({"success": True, **result}, cards)
+        except Exception as e:
+            logger.error(f"API Error: /api/play_hand - {str(e)}", exc_info=True)
+            raise HTTPException(status_code=400, detail=str(e))
+    return run_idempotent(action.session_id, idempotency_key, f"play_hand {action.selected_cards} {cards}", run)
 
 @app.get("/api/game_state/{session_id}")
-async def get_game_state(session_id: str):
-    """Get current game state"""
+async def get_game_state(session_id: str, request: Request, cards: CardFormat = "object"):
+    """Get current game state (cached bytes between mutations; revalidate with If-None-Match)"""
     logger.info(f"API: /api/game_state/{session_id} called")
     try:
-        game_state = game_engine.get_game_state(session_id)
-        logger.info(f"API: /api/game_state/{session_id} response. Current hand: {[str(c) for c in game_state.hand]}")
-        return {"success": True, "game_state": game_state.dict()}
-    except Exception as e:
-        logger.error(f"API Error: /api/game_state/{session_id} - {str(e)}", exc_info=True)
+        session = game_engine._get_session(session_id)
+    except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    etag = f'"{session.state_version}-{cards}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in (t.strip() for t in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+    body = b'{"success":true,"game_state":' + session.state_json(cards) + b'}'
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @app.post("/api/save_score")
 async def save_score(score_data: SaveScoreRequest):
@@ -103,10 +262,11 @@ async def save_score(score_data: SaveScoreRequest):
     try:
         # The score is no longer sent from the client.
         # The game engine will look up the score from the session ID.
-        result = game_engine.save_score(
-            session_id=score_data.session_id, name=score_data.name
-        )
-        return {"success": True, "highscores": result}
+        entry = game_engine.score_entry(session_id=score_data.session_id, name=score_data.name)
+        # Replaying the game takes milliseconds of CPU: not on the event loop
+        check = await run_in_threadpool(verify_entry, entry)
+        highscores, placement = game_engine.record_score(score_data.session_id, entry, check)
+        return {"success": True, "highscores": highscores, "placement": placement}
     except Exception as e:
         logger.error(f"API Error: /api/save_score - {str(e)}", exc_info=True)
         raise HTTPException(status_code=400, detail=str(e))
@@ -122,31 +282,174 @@ async def get_highscores():
         logger.error(f"API Error: /api/highscores - {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/leaderboard/rank")
+async def leaderboard_rank(score: int):
+    """Where a score would stand among every saved score (not just the top 10); `total` includes it"""
+    try:
+        return {"success": True, **game_engine.leaderboard_placement(score)}
+    except Exception as e:
+        logger.error(f"API Error: /api/leaderboard/rank - {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/leaderboard/percentile")
+async def leaderboard_percentile(top: float = 10.0):
+    """The score needed to be within the best `top` percent of every saved score"""
+    try:
+        return {"success": True, **game_engine.leaderboard_threshold(top)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"API Error: /api/leaderboard/percentile - {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/preview_hand")
-async def preview_hand(cards: list[Card]):
-    """Evaluate a partial hand for live preview"""
+async def preview_hand(request: Request):
+    """Evaluate a partial hand for live preview (cards as objects or codes like "AH"; served from the preview LRU cache when possible)"""
+    try:
+        raw_cards = await request.json()
+        if not isinstance(raw_cards, list):
+            raise ValueError("Expected a list of cards")
+        key = canonical_selection_key(raw_cards)
+    except ValueError as e:
+        logger.warning(f"API: /api/preview_hand - invalid body: {str(e)}")
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if not key: # Handle empty selection
+        logger.info(f"API: /api/preview_hand - empty card list, returning no preview.")
+        return Response(content=EMPTY_PREVIEW_PAYLOAD, media_type="application/json")
+
+    cacheable = is_cacheable(key)
+    if cacheable:
+        payload = preview_cache.get(key)
+        if payload is not None:
+            logger.info(f"API: /api/preview_hand cache hit for {len(key)} cards")
+            return Response(content=payload, media_type="application/json")
+    else:
+        preview_cache.uncacheable += 1
+
+    try:
+        cards = [parse_card_code(c) if isinstance(c, str) else Card(**c) for c in raw_cards]
+    except ValueError as e: # Pydantic validation error / bad card code
+        raise HTTPException(status_code=422, detail=str(e))
     logger.info(f"API: /api/preview_hand called with cards: {[str(c) for c in cards]}")
     try:
-        if not cards: # Handle empty selection
-            logger.info(f"API: /api/preview_hand - empty card list, returning no preview.")
-            return {"success": True, "preview": None}
-        # The PokerEvaluator needs to be imported or accessed.
-        # Assuming it's accessible via game_engine or directly.
-        from backend.poker_evaluator import PokerEvaluator # Direct import for simplicity here
         preview_result = PokerEvaluator.evaluate_preview_hand(cards)
         logger.info(f"API: /api/preview_hand response: {preview_result}")
-        return {"success": True, "preview": preview_result}
     except Exception as e:
         logger.error(f"API Error: /api/preview_hand - {str(e)}", exc_info=True)
         raise HTTPException(status_code=400, detail=str(e))
 
+    payload = serialize_preview(preview_result)
+    if cacheable:
+        preview_cache.put(key, payload)
+    return Response(content=payload, media_type="application/json")
+
+@app.post("/api/preview/{session_id}")
+async def preview_session_hand(session_id: str, request_data: PreviewRequest):
+    """Preview the selected hand cards with the session's real boss and turbo chips"""
+    logger.info(f"API: /api/preview/{session_id} called with cards {request_data.selected_cards}")
+    try:
+        preview_result = game_engine.preview_hand(session_id, request_data.selected_cards)
+        return {"success": True, "preview": preview_result}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"API Error: /api/preview/{session_id} - {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/hint/{session_id}")
+async def get_hint(session_id: str, depth: int = DEFAULT_DEPTH, max_nodes: int = DEFAULT_MAX_NODES,
+                   time_ms: float = DEFAULT_TIME_BUDGET * 1000):
+    """Suggested next move from the autoplayer: draw or play, and which hand cards"""
+    logger.info(f"API: /api/hint/{session_id} called (depth={depth}, max_nodes={max_nodes}, time_ms={time_ms})")
+    try:
+        hint = game_engine.get_hint(session_id, depth=depth, max_nodes=max_nodes, time_budget=time_ms / 1000)
+        return {"success": True, "hint": hint}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"API Error: /api/hint/{session_id} - {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/jobs")
+async def submit_job(request: JobRequest):
+    """
+    Start a background job: an "autoplay" balance run, a deep "hint" search, or
+    "verify_scores" – a replay of the top 10 highscores that carry transcripts
+    """
+    logger.info(f"API: /api/jobs called for a {request.kind!r} job")
+    params = dict(request.params)
+    if request.session_id is not None:
+        params["session_id"] = request.session_id
+    try:
+        job = job_manager.submit(request.kind, params, request.time_limit, request.cpu_limit)
+        return {"success": True, "job": job.summary()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"API Error: /api/jobs - {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/jobs")
+async def list_jobs():
+    return {"success": True, "jobs": [job.summary() for job in job_manager.jobs.values()]}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, after: Optional[int] = None):
+    """Status, progress and result so far; `after=N` adds the partial results from index N"""
+    try:
+        return {"success": True, "job": job_manager.get(job_id).summary(after)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    """Partial results as newline-delimited JSON while the job runs, ending with its summary"""
+    try:
+        job_manager.get(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def lines():
+        async for event in job_manager.stream(job_id):
+            yield json.dumps(jsonable_encoder(event)) + "\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a job; results of its finished chunks are kept"""
+    logger.info(f"API: DELETE /api/jobs/{job_id} called")
+    try:
+        return {"success": True, "job": job_manager.cancel(job_id).summary()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/diagnostics/preview_cache")
+async def get_preview_cache_stats():
+    """Hit-rate metrics for the /api/preview_hand LRU cache"""
+    return {"success": True, "preview_cache": preview_cache.stats()}
+
+@app.get("/api/diagnostics/sessions")
+async def get_session_footprint(sample: int = 1000):
+    """
+    Live session count and approximate bytes per session (capacity planning).
+    This process's sessions only; under serve.py the router asks every worker
+    and merges their replies (`scope: "all workers"`).
+    """
+    if sample < 1:
+        raise HTTPException(status_code=400, detail="sample must be at least 1")
+    return {"success": True, "sessions": game_engine.session_footprint(sample), "scope": "worker",
+            "worker": {"id": int(WORKER_ID) if WORKER_ID is not None else None, "pid": os.getpid()}}
+
 @app.get("/api/remaining_deck/{session_id}")
-async def get_remaining_deck(session_id: str):
+async def get_remaining_deck(session_id: str, cards: CardFormat = "object"):
     """Get the list of cards remaining in the deck for a session"""
     logger.info(f"API: /api/remaining_deck/{session_id} called")
     try:
         session = game_engine._get_session(session_id) # Access session directly
         remaining_cards = session.get_remaining_deck_cards()
+        if cards == "code":
+            return {"success": True, "remaining_cards": [card_code(card) for card in remaining_cards]}
         return {"success": True, "remaining_cards": [card.dict() for card in remaining_cards]}
     except ValueError as e: # Session not found
         raise HTTPException(status_code=404, detail=str(e))
@@ -155,12 +458,12 @@ async def get_remaining_deck(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/shop/{session_id}")
-async def get_shop_state(session_id: str):
+async def get_shop_state(session_id: str, cards: CardFormat = "object"):
     """Get the current shop state for a session"""
     logger.info(f"API: /api/shop/{session_id} called")
     try:
         shop_state = game_engine.get_shop_state(session_id)
-        return {"success": True, "shop_state": shop_state}
+        return with_card_format({"success": True, "shop_state": shop_state}, cards)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -168,43 +471,151 @@ async def get_shop_state(session_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/shop/{session_id}/reroll")
-async def reroll_shop(session_id: str):
+async def reroll_shop(session_id: str, cards: CardFormat = "object", idempotency_key: Optional[str] = Header(None)):
     """Reroll the shop cards for $1"""
     logger.info(f"API: /api/shop/{session_id}/reroll called")
-    try:
-        result = game_engine.reroll_shop(session_id)
-        return {"success": True, **result}
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"API Error: /api/shop/{session_id}/reroll - {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    def run():
+        try:
+            result = game_engine.reroll_shop(session_id)
+            return with_card_format({"success": True, **result}, cards)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"API Error: /api/shop/{session_id}/reroll - {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=str(e))
+    return run_idempotent(session_id, idempotency_key, f"reroll {cards}", run)
 
 @app.post("/api/shop/{session_id}/buy/{card_index}")
-async def buy_card(session_id: str, card_index: int):
+async def buy_card(session_id: str, card_index: int, cards: CardFormat = "object",
+                   idempotency_key: Optional[str] = Header(None)):
     """Buy a card from the shop for $3"""
     logger.info(f"API: /api/shop/{session_id}/buy/{card_index} called")
-    try:
-        result = game_engine.buy_card(session_id, card_index)
-        return {"success": True, **result}
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"API Error: /api/shop/{session_id}/buy/{card_index} - {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+    def run():
+        try:
+            result = game_engine.buy_card(session_id, card_index)
+            return with_card_format({"success": True, **result}, cards)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"API Error: /api/shop/{session_id}/buy/{card_index} - {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=str(e))
+    return run_idempotent(session_id, idempotency_key, f"buy {card_index} {cards}", run)
 
 @app.post("/api/shop/{session_id}/next_round")
-async def proceed_to_next_round(session_id: str):
+async def proceed_to_next_round(session_id: str, cards: CardFormat = "object", idempotency_key: Optional[str] = Header(None)):
     """Proceed to the next round after shopping"""
     logger.info(f"API: /api/shop/{session_id}/next_round called")
+    def run():
+        try:
+            result = game_engine.proceed_to_next_round(session_id)
+            return with_card_format({"success": True, **result}, cards)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"API Error: /api/shop/{session_id}/next_round - {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=str(e))
+    return run_idempotent(session_id, idempotency_key, f"next_round {cards}", run)
+
+@app.post("/api/batch/{session_id}")
+async def batch_actions(session_id: str, request: BatchRequest, cards: CardFormat = "object",
+                        idempotency_key: Optional[str] = Header(None)):
+    """
+    Apply several actions (e.g. a whole shop phase) in order in one request.
+    Stops at the first failing action; with `atomic` (default) the session is
+    then rolled back.  Returns the per-action results and the final game state.
+    """
+    logger.info(f"API: /api/batch/{session_id} called with {len(request.actions)} actions (atomic={request.atomic})")
+    def run():
+        try:
+            result = run_batch(game_engine, session_id, request.actions, request.atomic)
+            return with_card_format(result, cards)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"API Error: /api/batch/{session_id} - {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=str(e))
+    fingerprint = f"batch {json.dumps(request.actions, sort_keys=True)} {request.atomic} {cards}"
+    return run_idempotent(session_id, idempotency_key, fingerprint, run)
+
+def _ws_reply(request_id, body: str) -> str:
+    """Prefix a serialised reply object with its request id"""
+    return '{"id":' + json.dumps(request_id) + ("," + body[1:] if len(body) > 2 else "}")
+
+@app.websocket("/ws/{session_id}")
+async def game_channel(websocket: WebSocket, session_id: str):
+    """
+    Persistent per-session channel accepting the same actions as the HTTP routes.
+
+    Client → server: {"id": 1, "action": "play", "cards": [0, 2, 4]}
+    Server → client: {"id": 1, "success": true, ...same body as the HTTP route...}
+    Actions: state, draw, play, preview, hint, shop, reroll, buy (with "index"), next_round, batch.
+    Mutating actions accept an idempotency "key"; a retry with the same key gets the first reply.
+    Every reply to a mutating action carries the updated `game_state`.
+    Connect to `/ws/{session_id}?cards=code` for compact card codes in replies.
+    """
+    compact = websocket.query_params.get("cards") == "code"
+    await websocket.accept()
     try:
-        result = game_engine.proceed_to_next_round(session_id)
-        return {"success": True, **result}
+        game_engine._get_session(session_id)
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        logger.error(f"API Error: /api/shop/{session_id}/next_round - {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        await websocket.send_text(json.dumps({"id": None, "success": False, "detail": str(e)}))
+        await websocket.close(code=4404)
+        return
+    logger.info(f"API: /ws/{session_id} connected")
+
+    while True:
+        try:
+            message = json.loads(await websocket.receive_text())
+        except WebSocketDisconnect:
+            logger.info(f"API: /ws/{session_id} disconnected")
+            return
+        except ValueError:
+            await websocket.send_text(json.dumps({"id": None, "success": False, "detail": "Invalid JSON"}))
+            continue
+        if not isinstance(message, dict):
+            await websocket.send_text(json.dumps({"id": None, "success": False, "detail": "Expected an object"}))
+            continue
+
+        request_id = message.get("id")
+        action = message.get("action")
+        # Mutating actions may carry an idempotency "key": a retry (e.g. after a reconnect)
+        # gets the recorded reply, re-addressed to its new id, without running again
+        key = message.get("key") if action in MUTATING_ACTIONS else None
+        ring = fingerprint = None
+        if key is not None:
+            try:
+                validate_key(key)
+            except ValueError as e:
+                await websocket.send_text(json.dumps({"id": request_id, "success": False, "detail": str(e)}))
+                continue
+            ring = game_engine._get_session(session_id).response_ring()
+            fingerprint = "ws " + json.dumps({k: v for k, v in message.items() if k not in ("id", "key")}, sort_keys=True)
+            try:
+                cached = ring.get(key, fingerprint)
+            except IdempotencyKeyReused as e:
+                await websocket.send_text(json.dumps({"id": request_id, "success": False, "detail": str(e)}))
+                continue
+            if cached is not None:
+                await websocket.send_text(_ws_reply(request_id, cached[1].decode("utf-8")))
+                continue
+
+        cacheable = True
+        try:
+            result = dispatch_action(game_engine, session_id, action, message)
+            reply = {"success": True, **(compact_cards(result) if compact else result)}
+            if action in MUTATING_ACTIONS:
+                logger.info(f"API: /ws/{session_id} {action} applied")
+        except ValueError as e:
+            reply = {"success": False, "detail": str(e)}
+        except Exception as e:
+            logger.error(f"API Error: /ws/{session_id} {action} - {str(e)}", exc_info=True)
+            reply = {"success": False, "detail": str(e)}
+            cacheable = False
+        body = json.dumps(reply, ensure_ascii=False, separators=(",", ":"))
+        if ring is not None and cacheable:
+            ring.put(key, fingerprint, 200 if reply["success"] else 400, body.encode("utf-8"))
+        await websocket.send_text(_ws_reply(request_id, body))
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
@@ -0,0 +1,527 @@
+"""
+Production entry point: one game-engine worker per core behind a session router.
+
+Sessions live in each worker's in-process `GameEngine.sessions`, so plain
+uvicorn `--workers` would scatter a player's requests across processes that
+don't know their session.  Instead:
+
+* N workers run `main:app` on private Unix sockets.  Worker *i* is started
+  with ``BALLANTRO_WORKER_ID=i`` and prefixes every session id it creates
+  with ``w<i>-``.
+* One or more front-router processes share the public port (SO_REUSEPORT)
+  and forward each request to the worker encoded in its session id – taken
+  from the URL (`/api/shop/{id}/…`, `/ws/{id}`) or the JSON body
+  (`{"session_id": …}`).  Ids without a prefix fall back to a stable hash.
+* `/api/new_game` and session-less requests (page, static files,
+  highscores) are spread round-robin.
+* Diagnostics about every worker's sessions (`/api/diagnostics/sessions`)
+  are asked of all workers and merged by the router.
+* Before the workers start, the session snapshots they left are rebalanced
+  (`backend.snapshot.rebalance_snapshots`): after a restart with fewer
+  workers, the sessions of the dropped ones are restored by their new owners.
+
+Usage:
+
+    python serve.py --host 0.0.0.0 --port 8001              # workers = cores
+    python serve.py --workers 4 --routers 2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.snapshot import rebalance_snapshots
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - ROUTER: %(levelname)s - %(message)s')
+logger = logging.getLogger("serve")
+
+MAX_HEAD_BYTES = 64 * 1024
+# Pooled upstream connections idle longer than this are not reused: uvicorn closes
+# keep-alive connections after 5 s, and a request lost to that race is only resent
+# when resending is safe (see Router._forward).
+UPSTREAM_IDLE_REUSE = 2.0
+# Methods a client may expect to be repeated; other requests are retried only with an Idempotency-Key
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+_PATH_SESSION = re.compile(r"^/(?:api/(?:game_state|remaining_deck|shop|preview|batch|hint|jobs)|ws)/([^/?]+)")
+_WORKER_PREFIX = re.compile(r"^w(\d+)-")
+# Routes whose session id travels in the JSON body
+_BODY_SESSION_PATHS = ("/api/draw_cards", "/api/play_hand", "/api/save_score", "/api/jobs")
+
+
+# ------------------------------------------------------------------ #
+#  Routing                                                           #
+# ------------------------------------------------------------------ #
+def worker_for_session(session_id: str, n_workers: int) -> int:
+    """Owner of `session_id`: its `w<i>-` prefix, else a stable hash."""
+    match = _WORKER_PREFIX.match(session_id)
+    if match and int(match.group(1)) < n_workers:
+        return int(match.group(1))
+    return zlib.crc32(session_id.encode()) % n_workers
+
+
+def session_id_for_request(path: str, body: bytes) -> Optional[str]:
+    match = _PATH_SESSION.match(path)
+    if match:
+        return match.group(1)
+    if body and path.startswith(_BODY_SESSION_PATHS):
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return None
+        if isinstance(data, dict) and isinstance(data.get("session_id"), str):
+            return data["session_id"]
+    return None
+
+
+def merge_session_footprints(replies: List[Dict]) -> Dict:
+    """One `/api/diagnostics/sessions` reply for all workers, from each worker's reply"""
+    footprints = [reply["sessions"] for reply in replies]
+    sampled = sum(f["sampled"] for f in footprints)
+    avg = sum(f["avg_bytes"] * f["sampled"] for f in footprints) / sampled if sampled else 0.0
+    return {
+        "success": True,
+        "sessions": {
+            "sessions": sum(f["sessions"] for f in footprints),
+            "sampled": sampled,
+            "avg_bytes": round(avg),
+            "max_bytes": max((f["max_bytes"] for f in footprints), default=0),
+            "estimated_total_bytes": sum(f["estimated_total_bytes"] for f in footprints),
+            "sessions_per_gb": int(2**30 // avg) if avg else None,
+        },
+        "scope": "all workers",
+        "workers": [{**reply["worker"], "sessions": reply["sessions"]} for reply in replies],
+    }
+
+
+# Session-less GETs answered by every worker, merged here rather than sent round-robin
+_FANOUT_PATHS = {"/api/diagnostics/sessions": merge_session_footprints}
+
+
+# ------------------------------------------------------------------ #
+#  Minimal HTTP/1.1 plumbing                                         #
+# ------------------------------------------------------------------ #
+def _parse_head(head: bytes) -> Tuple[str, Dict[str, str]]:
+    lines = head.decode("latin-1").split("\r\n")
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    return lines[0], headers
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    body = bytearray()
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.split(b";")[0].strip() or b"0", 16)
+        if size < 0:
+            raise ValueError("negative chunk size")
+        if size == 0:
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass  # trailers
+            return bytes(body)
+        body += await reader.readexactly(size)
+        await reader.readline()
+
+
+class UpstreamPool:
+    """Idle keep-alive connections to each worker's Unix socket."""
+
+    def __init__(self, socket_paths: List[str]):
+        self.socket_paths = socket_paths
+        # (reader, writer, released at) per worker, most recently released last
+        self._idle: List[List[Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]]] = [[] for _ in socket_paths]
+
+    async def acquire(self, worker: int, fresh: bool = False):
+        idle = self._idle[worker]
+        while idle and not fresh:
+            reader, writer, released = idle.pop()
+            if (not writer.is_closing() and not reader.at_eof()
+                    and time.monotonic() - released < UPSTREAM_IDLE_REUSE):
+                return reader, writer
+            writer.close()
+        return await asyncio.open_unix_connection(self.socket_paths[worker], limit=MAX_HEAD_BYTES * 4)
+
+    def release(self, worker: int, conn):
+        if len(self._idle[worker]) < 64 and not conn[1].is_closing():
+            self._idle[worker].append((conn[0], conn[1], time.monotonic()))
+        else:
+            conn[1].close()
+
+
+class Router:
+    def __init__(self, socket_paths: List[str]):
+        self.n_workers = len(socket_paths)
+        self.pool = UpstreamPool(socket_paths)
+        self._round_robin = itertools.cycle(range(self.n_workers))
+        # Graceful stop: no new requests once draining; connections waiting for one are closed
+        self.draining = False
+        self._clients = 0
+        self._waiting: set = set()  # client writers between requests
+        self._all_closed = asyncio.Event()
+
+    def drain(self):
+        """Stop taking requests; those in flight still get their responses"""
+        self.draining = True
+        for writer in list(self._waiting):
+            writer.close()
+        if not self._clients:
+            self._all_closed.set()
+
+    async def wait_closed(self):
+        await self._all_closed.wait()
+
+    def pick_worker(self, path: str, body: bytes) -> int:
+        session_id = session_id_for_request(path, body)
+        if session_id is None:
+            return next(self._round_robin)
+        return worker_for_session(session_id, self.n_workers)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients += 1
+        try:
+            while not self.draining:
+                self._waiting.add(writer)
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    writer.write(b"HTTP/1.1 431 Request Header Fields Too Large\r\nContent-Length: 0\r\n"
+                                 b"Connection: close\r\n\r\n")
+                    return
+                finally:
+                    self._waiting.discard(writer)
+                request_line, headers = _parse_head(head)
+                parts = request_line.split(" ")
+                if len(parts) != 3:
+                    return
+                method, target, version = parts
+
+                try:
+                    if headers.get("transfer-encoding", "").lower() == "chunked":
+                        body = await _read_chunked(reader)
+                        head = _rewrite_chunked_request(head, len(body))
+                    else:
+                        length = int(headers.get("content-length", "0") or 0)
+                        if length < 0:
+                            raise ValueError("negative Content-Length")
+                        body = await reader.readexactly(length)
+                except ValueError:  # malformed Content-Length or chunk size
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    return
+                except asyncio.IncompleteReadError:
+                    return
+
+                path = target.split("?", 1)[0]
+                if method == "GET" and path in _FANOUT_PATHS:
+                    keep_alive = await self._fan_out(target, _FANOUT_PATHS[path], writer)
+                else:
+                    worker = self.pick_worker(path, body)
+
+                    if headers.get("upgrade", "").lower() == "websocket":
+                        await self._tunnel(worker, head, reader, writer)
+                        return
+
+                    retry_safe = method in _IDEMPOTENT_METHODS or "idempotency-key" in headers
+                    keep_alive = await self._forward(worker, method, head + body, writer, retry_safe)
+                client_close = (headers.get("connection", "").lower() == "close"
+                                or (version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive"))
+                if not keep_alive or client_close:
+                    return
+        finally:
+            writer.close()
+            self._clients -= 1
+            if self.draining and not self._clients:
+                self._all_closed.set()
+
+    async def _forward(self, worker: int, method: str, request: bytes, client: asyncio.StreamWriter,
+                       retry_safe: bool = False) -> bool:
+        """
+        Send one request upstream and stream the response back. Returns keep-alive.
+        A pooled connection can turn out to be closed; the request is then resent
+        on a new one only if `retry_safe` – the worker may already have applied it.
+        """
+        for attempt in range(2):
+            up_reader, up_writer = await self.pool.acquire(worker, fresh=attempt > 0)
+            try:
+                up_writer.write(request)
+                await up_writer.drain()
+                head = await up_reader.readuntil(b"\r\n\r\n")
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                up_writer.close()
+                if attempt or not retry_safe:
+                    client.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                    return False
+
+        status_line, headers = _parse_head(head)
+        status = int(status_line.split(" ")[1])
+        client.write(head[:len(status_line) + 2] + f"X-Ballantro-Worker: {worker}\r\n".encode()
+                     + head[len(status_line) + 2:])
+
+        upstream_reusable = headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            pass
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining:
+                chunk = await up_reader.read(min(remaining, 65536))
+                if not chunk:
+                    raise ConnectionError("worker closed mid-body")
+                client.write(chunk)
+                remaining -= len(chunk)
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await up_reader.readline()
+                client.write(size_line)
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while True:
+                        line = await up_reader.readline()
+                        client.write(line)
+                        if line in (b"\r\n", b""):
+                            break
+                    break
+                client.write(await up_reader.readexactly(size + 2))
+        else:
+            while chunk := await up_reader.read(65536):  # body delimited by close
+                client.write(chunk)
+            upstream_reusable = False
+        await client.drain()
+
+        if upstream_reusable:
+            self.pool.release(worker, (up_reader, up_writer))
+        else:
+            up_writer.close()
+        return upstream_reusable or "content-length" in headers or "transfer-encoding" in headers
+
+    async def _fan_out(self, target: str, merge: Callable[[List[Dict]], Dict], client: asyncio.StreamWriter) -> bool:
+        """GET `target` from every worker and answer with `merge` of their JSON replies. Returns keep-alive."""
+        request = f"GET {target} HTTP/1.1\r\nHost: worker\r\nConnection: close\r\n\r\n".encode()
+        replies = []
+        for worker in range(self.n_workers):
+            try:
+                up_reader, up_writer = await self.pool.acquire(worker, fresh=True)
+                up_writer.write(request)
+                await up_writer.drain()
+                response = await up_reader.read()
+                up_writer.close()
+            except ConnectionError:
+                response = b""
+            head, _, body = response.partition(b"\r\n\r\n")
+            status_line, _ = _parse_head(head)
+            if not status_line.startswith("HTTP/1.1 200"):
+                # Relay a worker's error (e.g. a bad query) and close; a dead worker is a 502
+                client.write(response or b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\n\r\n")
+                await client.drain()
+                return False
+            replies.append(json.loads(body))
+        body = json.dumps(merge(replies)).encode()
+        client.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                     + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await client.drain()
+        return True
+
+    async def _tunnel(self, worker: int, head: bytes, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """WebSocket upgrade: dedicated upstream connection, bytes piped both ways."""
+        up_reader, up_writer = await self.pool.acquire(worker, fresh=True)
+        up_writer.write(head)
+        await up_writer.drain()
+
+        async def pipe(src: asyncio.StreamReader, dst: asyncio.StreamWriter):
+            try:
+                while chunk := await src.read(65536):
+                    dst.write(chunk)
+                    await dst.drain()
+            except ConnectionError:
+                pass
+            finally:
+                dst.close()
+
+        await asyncio.gather(pipe(reader, up_writer), pipe(up_reader, writer))
+
+
+def _rewrite_chunked_request(head: bytes, length: int) -> bytes:
+    lines = [l for l in head.decode("latin-1").split("\r\n")
+             if l and not l.lower().startswith(("transfer-encoding:", "content-length:"))]
+    return ("\r\n".join(lines) + f"\r\nContent-Length: {length}\r\n\r\n").encode("latin-1")
+
+
+def run_router(host: str, port: int, socket_paths: List[str], router_index: int,
+               listener_closed: "multiprocessing.synchronize.Event"):
+    """
+    Entry point of one front-router process.  SIGTERM stops it accepting
+    (then sets `listener_closed`); it exits once the requests in flight have
+    been answered.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the supervisor handles Ctrl+C
+
+    async def main():
+        router = Router(socket_paths)
+        # Offset round-robin so several routers don't all start on worker 0
+        for _ in range(router_index % max(1, len(socket_paths))):
+            next(router._round_robin)
+        stopping = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+        server = await asyncio.start_server(router.handle_client, host, port, reuse_port=True,
+                                            limit=MAX_HEAD_BYTES, backlog=2048)
+        await stopping.wait()
+        server.close()
+        listener_closed.set()
+        router.drain()
+        await router.wait_closed()
+
+    asyncio.run(main())
+
+
+# ------------------------------------------------------------------ #
+#  Supervisor                                                        #
+# ------------------------------------------------------------------ #
+class Supervisor:
+    def __init__(self, args):
+        self.args = args
+        self.own_socket_dir = args.socket_dir is None
+        self.socket_dir = args.socket_dir or tempfile.mkdtemp(prefix="ballantro-")
+        self.socket_paths = [os.path.join(self.socket_dir, f"worker-{i}.sock") for i in range(args.workers)]
+        self.workers: List[Optional[subprocess.Popen]] = [None] * args.workers
+        self.routers: List[multiprocessing.Process] = []
+        self.listeners_closed: List["multiprocessing.synchronize.Event"] = []
+        self.stopping = False
+
+    def start_worker(self, i: int):
+        path = self.socket_paths[i]
+        if os.path.exists(path):
+            os.unlink(path)
+        env = dict(os.environ, BALLANTRO_WORKER_ID=str(i))
+        cmd = [sys.executable, "-m", "uvicorn", "main:app", "--uds", path,
+               "--log-level", self.args.log_level, "--no-access-log"]
+        self.workers[i] = subprocess.Popen(cmd, env=env)
+        logger.info(f"Started worker {i} (pid {self.workers[i].pid}) on {path}")
+
+    def wait_for_sockets(self, timeout: float = 30.0):
+        deadline = time.monotonic() + timeout
+        for path in self.socket_paths:
+            while True:
+                try:
+                    with socket.socket(socket.AF_UNIX) as s:
+                        s.connect(path)
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f"worker socket {path} did not come up")
+                    time.sleep(0.05)
+
+    def start_routers(self):
+        for r in range(self.args.routers):
+            listener_closed = multiprocessing.Event()
+            self.listeners_closed.append(listener_closed)
+            proc = multiprocessing.Process(target=run_router, name=f"router-{r}",
+                                           args=(self.args.host, self.args.port, self.socket_paths, r,
+                                                 listener_closed))
+            proc.start()
+            self.routers.append(proc)
+        logger.info(f"{self.args.routers} router(s) listening on http://{self.args.host}:{self.args.port} "
+                    f"for {self.args.workers} worker(s)")
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        # Workers map the shared hand tables; build them once here rather than in every worker
+        if subprocess.run([sys.executable, "-m", "backend.hand_tables"]).returncode != 0:
+            logger.error("Could not build the hand tables (backend/hand_tables.py); not starting")
+            self.shutdown()
+            return 1
+        if "BALLANTRO_SNAPSHOT" not in os.environ:  # each worker keeps its own file (see main.py)
+            n_workers = self.args.workers
+            try:
+                rebalance_snapshots(os.environ.get("BALLANTRO_DATA_DIR", ""), n_workers,
+                                    lambda session_id: worker_for_session(session_id, n_workers))
+            except OSError as e:
+                logger.error(f"Could not rebalance the session snapshots ({e}); sessions of dropped workers are lost")
+        for i in range(self.args.workers):
+            self.start_worker(i)
+        self.wait_for_sockets()
+        self.start_routers()
+        try:
+            while not self.stopping:
+                time.sleep(0.5)
+                for i, proc in enumerate(self.workers):
+                    if proc is not None and proc.poll() is not None and not self.stopping:
+                        logger.warning(f"Worker {i} exited with {proc.returncode}; restarting "
+                                       f"(its sessions are lost)")
+                        self.start_worker(i)
+                for proc in self.routers:
+                    if not proc.is_alive() and not self.stopping:
+                        logger.error(f"{proc.name} died; shutting down")
+                        self.stopping = True
+        finally:
+            self.shutdown()
+        return 0
+
+    def shutdown(self):
+        # 1. Routers stop accepting; requests already in flight are still relayed
+        for proc in self.routers:
+            proc.terminate()
+        for proc, listener_closed in zip(self.routers, self.listeners_closed):
+            if proc.is_alive():
+                listener_closed.wait(timeout=5)
+        # 2. Workers drain: uvicorn answers in-flight requests, then writes its session snapshot
+        for proc in self.workers:
+            if proc is not None and proc.poll() is None:
+                proc.send_signal(signal.SIGTERM)
+        for proc in self.workers:
+            if proc is not None:
+                try:
+                    proc.wait(timeout=self.args.graceful_timeout)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+        # 3. Routers exit by themselves once the last responses are out
+        for proc in self.routers:
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.kill()
+        for path in self.socket_paths:
+            if os.path.exists(path):
+                os.unlink(path)
+        if self.own_socket_dir:
+            os.rmdir(self.socket_dir)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Ballantro production server (session-sharded workers)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="game-engine worker processes (default: one per core)")
+    parser.add_argument("--routers", type=int, default=max(1, (os.cpu_count() or 1) // 4),
+                        help="front-router processes sharing the port (default: cores / 4)")
+    parser.add_argument("--socket-dir", help="directory for worker Unix sockets (default: a temp dir)")
+    parser.add_argument("--log-level", default="warning", help="uvicorn log level for workers")
+    parser.add_argument("--graceful-timeout", type=float, default=20.0,
+                        help="seconds to wait for workers to drain on shutdown")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(Supervisor(build_arg_parser().parse_args()).run())
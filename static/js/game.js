@@ -31,6 +31,9 @@ class PokerGame {
         // Connect settings manager to sound manager
         this.soundManager.setSettingsManager(this.settingsManager);
 
+        // Effect / turbo chip / boss names and descriptions (states only carry ids)
+        this.catalogReady = window.loadGameCatalog(this.apiClient);
+
         // Initialize event listeners and show startup screen
         this.eventManager.initializeEventListeners();
         this.screenManager.showScreen('startup');
@@ -57,6 +60,7 @@ class PokerGame {
         this.settingsManager.initialize();
 
         try {
+            await this.catalogReady;
             const data = await this.apiClient.newGame(debugMode);
             if (data.success) {
                 console.log("CLIENT: New game started. Initial game state received:", data.game_state);
@@ -1,6 +1,32 @@
 class ApiClient {
     constructor() {
         this.baseUrl = '';
+        this.maxActionRetries = 2;
+    }
+
+    /**
+     * POST a game action with an Idempotency-Key. If the request fails on the
+     * network (e.g. a mobile timeout) it is retried with the same key, so the
+     * server applies it at most once and answers the retry from its cache.
+     */
+    async _postAction(url, body) {
+        const key = (window.crypto && crypto.randomUUID)
+            ? crypto.randomUUID()
+            : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+        const headers = { 'Idempotency-Key': key };
+        if (body !== undefined) headers['Content-Type'] = 'application/json';
+        for (let attempt = 0; ; attempt++) {
+            try {
+                return await fetch(url, {
+                    method: 'POST',
+                    headers,
+                    body: body === undefined ? undefined : JSON.stringify(body)
+                });
+            } catch (error) {
+                if (attempt >= this.maxActionRetries) throw error;
+                console.warn(`CLIENT: ${url} failed (${error.message}), retrying with the same idempotency key`);
+            }
+        }
     }
 
     async newGame(debugMode = false) {
@@ -20,13 +46,9 @@ class ApiClient {
 
     async drawCards(sessionId, selectedCards) {
         try {
-            const response = await fetch('/api/draw_cards', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    session_id: sessionId,
-                    selected_cards: selectedCards
-                })
+            const response = await this._postAction('/api/draw_cards', {
+                session_id: sessionId,
+                selected_cards: selectedCards
             });
             return await response.json();
         } catch (error) {
@@ -37,13 +59,9 @@ class ApiClient {
 
     async playHand(sessionId, selectedCards) {
         try {
-            const response = await fetch('/api/play_hand', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({
-                    session_id: sessionId,
-                    selected_cards: selectedCards
-                })
+            const response = await this._postAction('/api/play_hand', {
+                session_id: sessionId,
+                selected_cards: selectedCards
             });
             return await response.json();
         } catch (error) {
@@ -90,6 +108,40 @@ class ApiClient {
         }
     }
 
+    async previewSelection(sessionId, selectedCards) {
+        try {
+            const response = await fetch(`/api/preview/${sessionId}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ selected_cards: selectedCards })
+            });
+            return await response.json();
+        } catch (error) {
+            console.error('Error fetching session hand preview:', error);
+            throw error;
+        }
+    }
+
+    async getCatalog() {
+        // Static metadata: fetched once per page. The page links the versioned URL,
+        // which the browser may cache indefinitely.
+        if (!this._catalogPromise) {
+            const meta = document.querySelector('meta[name="ballantro-catalog"]');
+            const url = (meta && meta.content) || '/api/catalog';
+            this._catalogPromise = fetch(url)
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+                    return response.json();
+                })
+                .catch(error => {
+                    this._catalogPromise = null; // allow a retry
+                    console.error('Error fetching catalog:', error);
+                    throw error;
+                });
+        }
+        return this._catalogPromise;
+    }
+
     async getRemainingDeck(sessionId) {
         try {
             const response = await fetch(`/api/remaining_deck/${sessionId}`);
@@ -112,9 +164,7 @@ class ApiClient {
 
     async rerollShop(sessionId) {
         try {
-            const response = await fetch(`/api/shop/${sessionId}/reroll`, {
-                method: 'POST'
-            });
+            const response = await this._postAction(`/api/shop/${sessionId}/reroll`);
             return await response.json();
         } catch (error) {
             console.error('Error rerolling shop:', error);
@@ -124,9 +174,7 @@ class ApiClient {
 
     async buyCard(sessionId, cardIndex) {
         try {
-            const response = await fetch(`/api/shop/${sessionId}/buy/${cardIndex}`, {
-                method: 'POST'
-            });
+            const response = await this._postAction(`/api/shop/${sessionId}/buy/${cardIndex}`);
             return await response.json();
         } catch (error) {
             console.error('Error buying card:', error);
@@ -136,15 +184,24 @@ class ApiClient {
 
     async proceedToNextRound(sessionId) {
         try {
-            const response = await fetch(`/api/shop/${sessionId}/next_round`, {
-                method: 'POST'
-            });
+            const response = await this._postAction(`/api/shop/${sessionId}/next_round`);
             return await response.json();
         } catch (error) {
             console.error('Error proceeding to next round:', error);
             throw error;
         }
     }
+
+    // actions: [{ action: 'buy', index: 0 }, { action: 'next_round' }, ...]
+    async runBatch(sessionId, actions, atomic = true) {
+        try {
+            const response = await this._postAction(`/api/batch/${sessionId}`, { actions, atomic });
+            return await response.json();
+        } catch (error) {
+            console.error('Error running action batch:', error);
+            throw error;
+        }
+    }
 }
 
 // Export for use in other modules
@@ -10,19 +10,11 @@ class BossManager {
         this.soundManager = game.soundManager;
     }
 
-    showBossSelection() {
+    async showBossSelection() {
         this.soundManager.initialize();
         
-        const bosses = [
-            { type: "thief", name: "The Thief", emoji: "🥷", description: "Every time you click draw or play, he steals 1 card from your deck (it disappears forever)." },
-            { type: "vampire", name: "The Vampire", emoji: "🧛", description: "Heart cards don't score any points. Your romantic cards are powerless against this creature of the night." },
-            { type: "vip_only", name: "VIP Only", emoji: "🎩", description: "Club cards don't score any points. This exclusive establishment doesn't recognize your club membership." },
-            { type: "frozen_ground", name: "Frozen Ground", emoji: "❄️", description: "Spade cards don't score any points. The frozen earth makes digging impossible." },
-            { type: "blonde_vixen", name: "Blonde Vixen", emoji: "💎", description: "Diamond cards don't score any points. She's already taken all the diamonds for herself." },
-            { type: "drunk", name: "The Drunk", emoji: "🍺", description: "All scoring is reduced by 25%. His intoxication affects your concentration and performance." },
-            { type: "baron", name: "The Baron", emoji: "👑", description: "Costs $5 to play any hand. This greedy noble demands payment for every action you take." },
-            { type: "death", name: "Death", emoji: "💀", description: "Your hand size is reduced by 2 cards. The grim reaper limits your options in life and cards." }
-        ];
+        await this.game.catalogReady;
+        const bosses = Object.values(window.BossCatalog);
         
         const bossListContainer = document.getElementById('boss-list');
         bossListContainer.innerHTML = '';
@@ -35,7 +27,7 @@ class BossManager {
                     <div class="boss-emoji">${boss.emoji}</div>
                     <h3 class="boss-name">${boss.name}</h3>
                 </div>
-                <p class="boss-description">${boss.description}</p>
+                <p class="boss-description">${boss.flavor || boss.description}</p>
             `;
             
             bossCard.addEventListener('click', () => {
@@ -52,6 +44,7 @@ class BossManager {
         try {
             this.cardManager.clearSelection();
             
+            await this.game.catalogReady;
             const data = await this.apiClient.newGame(true); // Debug mode
             if (data.success) {
                 console.log("CLIENT: New boss fight started. Initial game state received:", data.game_state);
@@ -62,11 +55,7 @@ class BossManager {
                 this.cardManager.resetMapping(this.gameState.getHand().length);
                 
                 this.gameState.gameState.is_boss_round = true;
-                this.gameState.gameState.active_boss = {
-                    type: selectedBoss.type,
-                    name: selectedBoss.name,
-                    description: selectedBoss.description
-                };
+                this.gameState.gameState.active_boss = selectedBoss.type;
                 
                 this.gameState.gameState.current_round = 3;
                 this.gameState.gameState.round_target = 1250;
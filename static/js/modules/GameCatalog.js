@@ -0,0 +1,47 @@
+// /static/js/modules/GameCatalog.js
+
+/**
+ * @file GameCatalog.js
+ * Client copy of the server's static game metadata (`/api/catalog`).
+ * Game states, cards and shop items only carry ids – card effect names,
+ * turbo chip `effect_id`s and the active boss `type` – which are resolved
+ * against these tables.  The catalog is fetched once per page.
+ */
+
+// card effect id → { name, description }
+const EffectDescriptions = {};
+// turbo chip `effect_id` → { effect_id, name, description }
+const TurboChipCatalog = {};
+// boss `type` → { type, name, description, emoji, flavor }
+const BossCatalog = {};
+
+let catalogVersion = null;
+
+async function loadGameCatalog(apiClient) {
+    if (catalogVersion) return catalogVersion;
+    try {
+        const data = await apiClient.getCatalog();
+        (data.effects || []).forEach(effect => { EffectDescriptions[effect.effect_id] = effect; });
+        (data.turbo_chips || []).forEach(chip => { TurboChipCatalog[chip.effect_id] = chip; });
+        (data.bosses || []).forEach(boss => { BossCatalog[boss.type] = boss; });
+        catalogVersion = data.version;
+    } catch (error) {
+        console.warn('CLIENT: Catalog unavailable, showing ids only.', error);
+    }
+    return catalogVersion;
+}
+
+function turboChipInfo(effectId) {
+    return TurboChipCatalog[effectId] || { effect_id: effectId, name: effectId, description: '' };
+}
+
+function bossInfo(type) {
+    return BossCatalog[type] || { type: type, name: type, description: '', emoji: '', flavor: '' };
+}
+
+window.EffectDescriptions = EffectDescriptions;
+window.TurboChipCatalog = TurboChipCatalog;
+window.BossCatalog = BossCatalog;
+window.loadGameCatalog = loadGameCatalog;
+window.turboChipInfo = turboChipInfo;
+window.bossInfo = bossInfo;
@@ -37,12 +37,13 @@ class PreviewManager {
             return;
         }
 
-        // Translate visual indices → actual `Card` objects using CardManager
-        const cardsForPreview = Array.from(selectedCards)
-            .map(idx => this.cardManager.getCardByVisualIndex(gameState, idx))
-            .filter(card => card);
+        // Translate visual indices → backend hand indices using CardManager.
+        // The server scores them against its own copy of the hand (boss + turbo chips included).
+        const handIndices = Array.from(selectedCards)
+            .map(idx => this.cardManager.visualToLogical[idx])
+            .filter(idx => idx !== undefined && idx < (gameState.hand || []).length);
 
-        if (cardsForPreview.length === 0) {
+        if (handIndices.length === 0 || handIndices.length > 5) {
             this.previewHandTypeElement.textContent = '-';
             this.previewBaseScoreElement.textContent = '-';
             this.previewDescriptionElement.textContent = 'Select cards to see a preview.';
@@ -50,7 +51,7 @@ class PreviewManager {
         }
 
         try {
-            const data = await this.apiClient.previewHand(cardsForPreview);
+            const data = await this.apiClient.previewSelection(gameState.session_id, handIndices);
 
             if (data.success && data.preview) {
                 this.previewHandTypeElement.textContent = this._formatHandType(data.preview.hand_type);
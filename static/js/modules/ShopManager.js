@@ -117,7 +117,8 @@ class ShopManager {
         return cardElement;
     }
 
-    createTurboChipElement(chip, index) {
+    createTurboChipElement(item, index) {
+        const chip = window.turboChipInfo(item.effect_id);
         const el = document.createElement('div');
         el.className = 'shop-card turbo';
         el.dataset.index = index;
@@ -195,7 +196,7 @@ class ShopManager {
                     const cardSuit = boughtCardDetails.suit ? (boughtCardDetails.suit.charAt(0).toUpperCase() + boughtCardDetails.suit.slice(1)) : "";
                     const cardName = boughtCardDetails.item_type === "card"
                         ? `${this.game.formatCardRank(boughtCardDetails.rank)} of ${cardSuit}`
-                        : boughtCardDetails.name;
+                        : window.turboChipInfo(boughtCardDetails.effect_id).name;
                     const deckCount = this.gameState.getDeckRemaining();
                     console.log(`PURCHASE CONFIRMATION: Bought '${cardName}'. Added to deck. Total cards: ${deckCount}`);
                 } else {
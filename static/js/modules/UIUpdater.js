@@ -63,7 +63,7 @@ class UIUpdater {
         if (!this.elements.bossInfo) return;
         
         if (gameState.is_boss_round && gameState.active_boss) {
-            const boss = gameState.active_boss;
+            const boss = window.bossInfo(gameState.active_boss);
             this.elements.bossInfo.innerHTML = `
                 <div class="boss-alert">
                     <h3>BOSS ROUND: ${boss.name}</h3>
@@ -199,7 +199,8 @@ class UIUpdater {
         const cont=document.getElementById('inventory-slots');
         if(!cont) return;
         cont.innerHTML='';
-        inv.forEach(chip=>{
+        inv.forEach(chipId=>{
+            const chip=window.turboChipInfo(chipId);
             const d=document.createElement('div');
             d.className='turbo-chip'; // Will be styled as a square icon holder
             const iconChar =
@@ -0,0 +1,60 @@
+"""
+Shared fixtures.  The hand tables are mapped (or built, as the app's startup
+does) once per run; every engine keeps its highscores in a temporary
+directory, and no test writes the app's session snapshot.
+"""
+import logging
+import os
+
+import pytest
+
+os.environ.setdefault("BALLANTRO_SNAPSHOT", "")
+
+from backend.autoplayer import suggest_move
+from backend.game_engine import GameEngine, GameSession
+from backend.hand_tables import load_tables
+
+logging.getLogger("backend.game_engine").setLevel(logging.WARNING)  # it logs every action
+
+
+@pytest.fixture(scope="session", autouse=True)
+def hand_tables():
+    load_tables()
+
+
+@pytest.fixture
+def engine(tmp_path) -> GameEngine:
+    return GameEngine(highscores_file=str(tmp_path / "highscores.json"))
+
+
+def play_move(session: GameSession, buy_turbo: bool = False):
+    """One greedy autoplayer move (or leave the shop, buying the first affordable turbo chip with `buy_turbo`)"""
+    if session.in_shop:
+        for index, item in enumerate(session.shop_items):
+            if buy_turbo and item["item_type"] == "turbo" and session.money >= session.turbo_chip_cost:
+                session.buy_card(index)
+                break
+        session.proceed_to_next_round()
+        return
+    move = suggest_move(session, depth=0, max_nodes=1, time_budget=0.05)
+    (session.play_hand if move["action"] == "play" else session.draw_cards)(move["cards"])
+
+
+@pytest.fixture
+def play():
+    """`play(session, until, buy_turbo)` – greedy moves until `until(session)` holds or the game is over"""
+    def run(session: GameSession, until=lambda session: False, buy_turbo: bool = False) -> GameSession:
+        while not session.is_game_over and not until(session):
+            play_move(session, buy_turbo)
+        return session
+    return run
+
+
+@pytest.fixture
+def new_session(engine):
+    """`new_session(seed=…, is_debug_mode=…)` – a session registered with `engine`"""
+    def create(**options) -> GameSession:
+        session = GameSession(f"test-{len(engine.sessions)}", engine, **options)
+        engine.sessions[session.session_id] = session
+        return session
+    return create
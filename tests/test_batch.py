@@ -0,0 +1,93 @@
+import pytest
+
+from backend.game_actions import MAX_BATCH_ACTIONS, run_batch
+from backend.replay import verify_entry
+
+
+def snapshot(session):
+    """Everything a rolled-back batch must leave as it was"""
+    state = {k: v for k, v in session.get_state().dict().items() if not k.endswith("_version")}
+    return (state, session.transcript, list(session.deck.cards), session.rng_events,
+            session.money, session.total_score)
+
+
+def test_all_actions_apply(engine, new_session):
+    session = new_session(seed=21)
+    result = run_batch(engine, session.session_id, [{"action": "draw", "cards": [0]},
+                                                    {"action": "preview", "cards": [0, 1]},
+                                                    {"action": "play", "cards": [0, 1]}])
+    assert result["success"] and not result["rolled_back"]
+    assert result["applied"] == 3
+    assert [r["action"] for r in result["results"]] == ["draw", "preview", "play"]
+    assert all("game_state" not in r for r in result["results"])
+    assert result["game_state"]["hands_played"] == session.hands_played == 1
+    assert session.draws_used == 1
+
+
+def test_atomic_batch_rolls_back(engine, new_session):
+    session = new_session(seed=22)
+    before, version = snapshot(session), session.state_version
+    result = run_batch(engine, session.session_id, [{"action": "draw", "cards": [0, 1]},
+                                                    {"action": "play", "cards": [0]},
+                                                    {"action": "draw", "cards": [99]}])
+    assert not result["success"] and result["rolled_back"]
+    assert result["applied"] == 0
+    assert result["failed"]["index"] == 2 and result["failed"]["action"] == "draw"
+    assert len(result["results"]) == 2
+    assert snapshot(session) == before
+    assert session.state_version > version  # clients never see an old version number again
+
+
+def test_rolled_back_games_still_verify(engine, new_session, play):
+    session = play(new_session(seed=23), until=lambda s: s.in_shop)
+    if not session.in_shop:
+        pytest.skip("the greedy player lost before the first shop")
+    before = snapshot(session)
+    result = run_batch(engine, session.session_id, [{"action": "next_round"}, {"action": "buy", "index": 0}])
+    assert result["rolled_back"] and session.in_shop
+    assert snapshot(session) == before
+    play(session)
+    check = verify_entry(engine.score_entry(session.session_id, "tester"))
+    assert check["verified"], check["reason"]
+
+
+def test_non_atomic_batch_keeps_what_applied(engine, new_session):
+    session = new_session(seed=24)
+    result = run_batch(engine, session.session_id, [{"action": "draw", "cards": [0]},
+                                                    {"action": "nope"},
+                                                    {"action": "draw", "cards": [1]}], atomic=False)
+    assert not result["success"] and not result["rolled_back"]
+    assert result["applied"] == 1
+    assert result["failed"] == {"index": 1, "action": "nope", "detail": "Unknown action: 'nope'"}
+    assert session.draws_used == 1
+
+
+@pytest.mark.parametrize("step, detail", [
+    ({"action": "batch", "actions": [{"action": "state"}]}, "nested"),
+    ("draw", "must be an object"),
+    ({"action": "draw", "cards": "0"}, "list of hand indices"),
+    ({"action": "buy", "index": True}, "must be an integer"),
+])
+def test_invalid_entries_fail_the_batch(engine, new_session, step, detail):
+    session = new_session(seed=25)
+    before = snapshot(session)
+    result = run_batch(engine, session.session_id, [{"action": "draw", "cards": [0]}, step])
+    assert result["failed"]["index"] == 1 and detail in result["failed"]["detail"]
+    assert snapshot(session) == before
+
+
+@pytest.mark.parametrize("actions, atomic", [
+    ([], True), (None, True), ({"action": "state"}, True),
+    ([{"action": "state"}] * (MAX_BATCH_ACTIONS + 1), True),
+    ([{"action": "state"}], "yes"),
+])
+def test_invalid_batches_are_refused(engine, new_session, actions, atomic):
+    session = new_session(seed=26)
+    with pytest.raises(ValueError):
+        run_batch(engine, session.session_id, actions, atomic)
+
+
+def test_largest_batch(engine, new_session):
+    session = new_session(seed=27)
+    result = run_batch(engine, session.session_id, [{"action": "state"}] * MAX_BATCH_ACTIONS)
+    assert result["applied"] == MAX_BATCH_ACTIONS
@@ -0,0 +1,63 @@
+import pytest
+
+from backend.card_codes import card_code, compact_cards, format_card_code, parse_card_code
+from backend.deck import CardArray
+from backend.models import STANDARD_DECK, Card, Rank, Suit, card_from_id, card_id, intern_card
+
+ALL_CARDS = [intern_card(suit, rank) for suit in Suit for rank in Rank]
+
+
+@pytest.mark.parametrize("card", ALL_CARDS, ids=card_code)
+def test_every_card_round_trips(card):
+    code = card_code(card)
+    assert parse_card_code(code) is card
+    assert card_from_id(card_id(card)) is card
+
+
+def test_codes_are_canonical():
+    assert card_code(intern_card(Suit.HEARTS, Rank.ACE)) == "AH"
+    assert card_code(intern_card(Suit.SPADES, Rank.TEN)) == "10S"
+    assert card_code(intern_card(Suit.DIAMONDS, Rank.KING, ["bonus_chips_50"])) == "KD+bonus_chips_50"
+    assert len({card_code(card) for card in ALL_CARDS}) == 52
+
+
+@pytest.mark.parametrize("code", ["10S", "TS", "ts", "10spades", "10Spades", "tSPADES"])
+def test_aliases(code):
+    assert parse_card_code(code) is intern_card(Suit.SPADES, Rank.TEN)
+
+
+def test_effects_keep_their_order():
+    card = parse_card_code("qc+bonus_money_2+bonus_chips_50")
+    assert card.effects == ("bonus_money_2", "bonus_chips_50")
+    assert card_code(card) == "QC+bonus_money_2+bonus_chips_50"
+    assert parse_card_code(card_code(card)) is card
+    assert parse_card_code("QC+bonus_chips_50+bonus_money_2") is not card
+
+
+@pytest.mark.parametrize("code", ["", "1S", "11S", "AX", "A", "H", "AH+", "AH+nope", "AH+bonus_random+bonus_random",
+                                  " AH", 12, None])
+def test_malformed_codes(code):
+    with pytest.raises(ValueError):
+        parse_card_code(code)
+
+
+def test_pool_ids_pack_and_unpack():
+    cards = ALL_CARDS + [parse_card_code("2H+bonus_random")]
+    packed = CardArray(cards)
+    assert list(packed) == cards
+    assert all(a is b for a, b in zip(packed, cards))
+    assert list(CardArray.standard()) == list(STANDARD_DECK) == ALL_CARDS
+    assert card_id(Card(suit=Suit.HEARTS, rank=Rank.TWO, effects=["bonus_random"])) == card_id(cards[-1])
+
+
+def test_compact_cards():
+    card = intern_card(Suit.CLUBS, Rank.JACK, ["bonus_multiplier_5"])
+    payload = {"hand": [card.dict(), intern_card(Suit.HEARTS, Rank.TWO).dict()],
+               "shop_items": [{"item_type": "card", "price": 3, **card.dict()}],
+               "money": 4, "deck": {"remaining": [card.dict()]}}
+    assert compact_cards(payload) == {
+        "hand": ["JC+bonus_multiplier_5", "2H"],
+        "shop_items": [{"item_type": "card", "price": 3, "code": "JC+bonus_multiplier_5"}],
+        "money": 4, "deck": {"remaining": ["JC+bonus_multiplier_5"]},
+    }
+    assert format_card_code("hearts", "A") == "AH"  # plain JSON values format too
@@ -0,0 +1,90 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from backend.game_engine import GameEngine
+from backend.idempotency import IdempotencyKeyReused, ResponseRing
+
+
+def test_ring_replays_and_rejects_reused_keys():
+    ring = ResponseRing()
+    assert ring.get("k", "draw [0]") is None
+    ring.put("k", "draw [0]", 200, b"{}")
+    assert ring.get("k", "draw [0]") == (200, b"{}")
+    with pytest.raises(IdempotencyKeyReused):
+        ring.get("k", "draw [1]")
+
+
+def test_ring_evicts_the_oldest_key():
+    ring = ResponseRing(maxsize=3)
+    for i in range(4):
+        ring.put(f"k{i}", "f", 200, b"%d" % i)
+    assert len(ring) == 3
+    assert ring.get("k0", "f") is None
+    ring.put("k1", "f", 400, b"again")  # replacing a key doesn't evict another
+    assert [key for key, *_ in ring.items()] == ["k1", "k2", "k3"]
+
+
+def test_ring_items_round_trip():
+    ring = ResponseRing(maxsize=4)
+    for i in range(6):
+        ring.put(f"k{i}", f"f{i}", 200 + i, b"body %d" % i)
+    copy = ResponseRing.from_items(ring.items(), maxsize=4)
+    assert copy.items() == ring.items()
+    assert ResponseRing.from_items(ring.items(), maxsize=2).items() == ring.items()[-2:]
+
+
+# ---------------------------  HTTP  --------------------------- #
+@pytest.fixture
+def client(engine, monkeypatch):
+    monkeypatch.setattr(main, "game_engine", engine)
+    return TestClient(main.app)
+
+
+def draw(client, session_id, cards, key):
+    return client.post("/api/draw_cards", json={"session_id": session_id, "selected_cards": cards},
+                       headers={"Idempotency-Key": key})
+
+
+def test_retries_are_replayed_not_applied_again(client, engine):
+    session_id = client.post("/api/new_game").json()["game_state"]["session_id"]
+    first = draw(client, session_id, [0, 1], "retry-1")
+    retry = draw(client, session_id, [0, 1], "retry-1")
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.content == first.content
+    assert engine.find_session(session_id).draws_used == 1
+
+    assert draw(client, session_id, [2], "retry-1").status_code == 422
+    assert draw(client, session_id, [], "").status_code == 400
+
+    rejected = draw(client, session_id, [99], "bad-index")
+    assert rejected.status_code == 400
+    assert draw(client, session_id, [99], "bad-index").content == rejected.content
+
+
+def test_retries_are_replayed_after_a_restart(tmp_path, client, engine, monkeypatch):
+    session_id = client.post("/api/new_game").json()["game_state"]["session_id"]
+    first = draw(client, session_id, [0], "before-restart")
+    engine.save_snapshot(str(tmp_path / "sessions.bin"))
+    successor = GameEngine()
+    successor.load_snapshot(str(tmp_path / "sessions.bin"))
+    monkeypatch.setattr(main, "game_engine", successor)
+
+    retry = draw(client, session_id, [0], "before-restart")
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.content == first.content
+    assert successor.find_session(session_id).draws_used == 1
+
+
+def test_websocket_keys_are_checked_like_headers(client):
+    session_id = client.post("/api/new_game").json()["game_state"]["session_id"]
+    with client.websocket_connect(f"/ws/{session_id}") as ws:
+        for key in ("", "k" * 129, 7):
+            ws.send_json({"id": 1, "action": "draw", "cards": [0], "key": key})
+            reply = ws.receive_json()
+            assert not reply["success"] and "Idempotency key must be" in reply["detail"]
+        ws.send_json({"id": 2, "action": "draw", "cards": [0], "key": "k" * 128})
+        first = ws.receive_json()
+        ws.send_json({"id": 3, "action": "draw", "cards": [0], "key": "k" * 128})
+        assert {**ws.receive_json(), "id": 2} == first
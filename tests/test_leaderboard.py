@@ -0,0 +1,109 @@
+import os
+import random
+
+import pytest
+
+from backend.leaderboard import MAX_SCORE, MIN_CAPACITY, Leaderboard
+
+
+def brute_rank(scores, score):
+    return 1 + sum(s > score for s in scores)
+
+
+@pytest.fixture
+def scores():
+    rng = random.Random(50)
+    return [rng.choice((rng.randrange(5000), rng.randrange(MAX_SCORE - 3, MAX_SCORE + 3), rng.randrange(10**9)))
+            for _ in range(2000)]
+
+
+def test_built_and_incremental_match_brute_force(scores):
+    built = Leaderboard(scores)
+    grown = Leaderboard(scores[:100])
+    for score in scores[100:]:
+        grown.add(score)
+    ranked = sorted(scores, reverse=True)
+    for board in (built, grown):
+        assert len(board) == len(scores)
+        for probe in scores[:300] + [0, MAX_SCORE, MAX_SCORE + 1, 10**12]:
+            assert board.rank(probe) == brute_rank(scores, probe)
+            assert board.count_at_most(probe) == sum(s <= probe for s in scores)
+        for rank in range(1, len(scores) + 1, 13):
+            assert board.score_at_rank(rank) == ranked[rank - 1]
+
+
+def test_empty_board():
+    board = Leaderboard()
+    assert len(board) == 0
+    assert board.rank(123) == 1
+    assert board.score_at_rank(1) is None
+    assert board.threshold(10) == {"top_percent": 10, "score": None, "rank": 1, "total": 0}
+    assert board.placement(5, stored=False) == {"score": 5, "rank": 1, "total": 1, "top_percent": 100.0}
+
+
+def test_ties_share_the_better_rank():
+    board = Leaderboard([10, 20, 20, 30])
+    assert [board.rank(s) for s in (30, 20, 10)] == [1, 2, 4]
+    assert board.score_at_rank(3) == 20
+
+
+def test_rank_bounds():
+    board = Leaderboard([1, 2, 3])
+    assert board.score_at_rank(0) is None
+    assert board.score_at_rank(4) is None
+    assert board.score_at_rank(3) == 1
+    assert board.count_at_most(-1) == 0
+
+
+def test_growth_past_the_initial_capacity():
+    board = Leaderboard([1])
+    board.add(MIN_CAPACITY * 5)
+    board.add(MIN_CAPACITY - 1)
+    assert board.score_at_rank(1) == MIN_CAPACITY * 5
+    assert board.rank(MIN_CAPACITY) == 2
+    assert len(board) == 3
+
+
+def test_scores_beyond_the_tree_stay_exact():
+    board = Leaderboard([MAX_SCORE, MAX_SCORE + 1])
+    board.add(MAX_SCORE + 2)
+    assert [board.score_at_rank(r) for r in (1, 2, 3)] == [MAX_SCORE + 2, MAX_SCORE + 1, MAX_SCORE]
+    assert board.rank(MAX_SCORE + 1) == 2
+    assert board.threshold(100)["score"] == MAX_SCORE
+
+
+def test_placement_of_a_stored_and_an_unsaved_score():
+    board = Leaderboard([100, 200, 300])
+    assert board.placement(200) == {"score": 200, "rank": 2, "total": 3, "top_percent": 66.67}
+    assert board.placement(250, stored=False) == {"score": 250, "rank": 2, "total": 4, "top_percent": 50.0}
+
+
+def test_threshold():
+    board = Leaderboard(range(1, 101))
+    assert board.threshold(10) == {"top_percent": 10, "score": 91, "rank": 10, "total": 100}
+    assert board.threshold(0.001)["score"] == 100
+    assert board.threshold(100)["score"] == 1
+
+
+# ---------------------------  engine  --------------------------- #
+def test_each_game_is_saved_once(engine, new_session, play):
+    session = play(new_session(seed=7))
+    highscores, placement = engine.save_score(session.session_id, "first")
+    assert placement == {"score": session.total_score, "rank": 1, "total": 1, "top_percent": 100.0}
+    with pytest.raises(ValueError, match="already saved"):
+        engine.save_score(session.session_id, "again")
+    assert len(engine.leaderboard) == 1
+    assert engine.leaderboard_placement(session.total_score)["total"] == 2
+
+
+def test_score_log_rebuilds_and_restarts_when_replaced(engine, new_session, play):
+    for seed in (1, 2):
+        engine.save_score(play(new_session(seed=seed)).session_id, "p")
+    other = type(engine)(highscores_file=engine.highscores_file)
+    assert other.leaderboard_threshold(100)["total"] == 2
+
+    # A replaced (shorter) log is read from the start again, not from the old offset
+    with open(engine.scores_file, "r+b") as f:
+        f.truncate(8)
+    assert other.leaderboard_threshold(100)["total"] == 1
+    assert os.path.getsize(engine.scores_file) == 8
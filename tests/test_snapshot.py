@@ -0,0 +1,121 @@
+import json
+import os
+
+import pytest
+
+from backend.game_engine import GameEngine
+from backend.snapshot import SessionSnapshot, encode_record, rebalance_snapshots, snapshot_path, write_snapshot
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "sessions.bin")
+    records = {f"s{i}": {"n": i, "name": "ü" * i} for i in (3, 1, 22, 0)}
+    assert write_snapshot(path, ((key, encode_record(value)) for key, value in records.items())) == 4
+    snapshot = SessionSnapshot(path)
+    assert len(snapshot) == 4
+    assert snapshot.take("s22") == records["s22"]
+    assert snapshot.take("s22") is None  # each record is taken once
+    assert snapshot.take("s2") is None
+    assert snapshot.take("a-longer-id-than-any-stored") is None
+    assert {key: json.loads(body) for key, body in snapshot.remaining()} == \
+        {key: value for key, value in records.items() if key != "s22"}
+    snapshot.close()
+
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / "sessions.bin")
+    assert write_snapshot(path, []) == 0
+    snapshot = SessionSnapshot(path)
+    assert len(snapshot) == 0
+    assert snapshot.take("anything") is None
+    assert list(snapshot.remaining()) == []
+
+
+@pytest.mark.parametrize("content", [b"", b"not a snapshot at all, clearly", b"BALLANTRO-SESSIONS 9\n" + bytes(40)])
+def test_other_files_are_rejected(tmp_path, content):
+    path = tmp_path / "sessions.bin"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        SessionSnapshot(str(path))
+
+
+def test_failed_write_keeps_the_previous_snapshot(tmp_path):
+    path = str(tmp_path / "sessions.bin")
+    write_snapshot(path, [("old", b"{}")])
+
+    def records():
+        yield "new", b"{}"
+        raise RuntimeError("crashed mid-write")
+
+    with pytest.raises(RuntimeError):
+        write_snapshot(path, records())
+    assert [key for key, _ in SessionSnapshot(path).remaining()] == ["old"]
+
+
+# ---------------------------  engine  --------------------------- #
+def restarted(engine: GameEngine, path: str) -> GameEngine:
+    engine.save_snapshot(path)
+    successor = GameEngine(highscores_file=engine.highscores_file)
+    successor.load_snapshot(path)
+    return successor
+
+
+def test_sessions_resume_where_they_stopped(tmp_path, engine, new_session, play):
+    path = str(tmp_path / "sessions.bin")
+    shop = play(new_session(seed=11), until=lambda s: s.in_shop or s.hands_played >= 2)
+    fresh = new_session(seed=12)
+    successor = restarted(engine, path)
+    assert not os.path.exists(path)  # removed once mapped
+    assert successor.sessions == {}  # restored on first lookup
+
+    for session in (shop, fresh):
+        restored = successor.find_session(session.session_id)
+        assert restored.state_json() == session.state_json()
+        assert restored.transcript == session.transcript
+        # ... and both copies play on identically
+        play(session)
+        play(restored)
+        assert restored.state_json() == session.state_json()
+        assert restored.transcript == session.transcript
+    assert successor.find_session("unknown") is None
+
+
+def test_sessions_never_looked_up_are_carried_over(tmp_path, engine, new_session):
+    path = str(tmp_path / "sessions.bin")
+    sessions = [new_session(seed=seed) for seed in (1, 2, 3)]
+    first = restarted(engine, path)
+    first.find_session(sessions[0].session_id).draw_cards([0])
+    second = restarted(first, path)
+    assert len(second._snapshot) == 3
+    assert second.find_session(sessions[0].session_id).draws_used == 1
+    assert second.find_session(sessions[2].session_id).state_json() == sessions[2].state_json()
+
+
+# ---------------------------  serve.py workers  --------------------------- #
+def test_dropped_workers_sessions_move_to_their_new_owners(tmp_path):
+    from serve import worker_for_session
+    data_dir = str(tmp_path)
+    sessions = {worker: [f"w{worker}-{n}" for n in range(20)] for worker in range(3)}
+    for worker, ids in sessions.items():
+        write_snapshot(snapshot_path(data_dir, worker), ((sid, encode_record({"id": sid})) for sid in ids))
+    (tmp_path / "sessions-w7.snapshot").write_bytes(b"garbage")  # unreadable: left alone
+
+    def owner(session_id):
+        return worker_for_session(session_id, 2)
+
+    assert rebalance_snapshots(data_dir, 2, owner) == 20
+    assert not os.path.exists(snapshot_path(data_dir, 2))
+    found = {}
+    for worker in (0, 1):
+        snapshot = SessionSnapshot(snapshot_path(data_dir, worker))
+        for session_id, body in snapshot.remaining():
+            assert owner(session_id) == worker and json.loads(body) == {"id": session_id}
+            found[session_id] = found.get(session_id, 0) + 1
+        snapshot.close()
+    assert found == {sid: 1 for ids in sessions.values() for sid in ids}
+    assert (tmp_path / "sessions-w7.snapshot").read_bytes() == b"garbage"
+
+    # Nothing misplaced: no file is rewritten
+    before = {name: os.stat(tmp_path / name).st_ino for name in os.listdir(tmp_path)}
+    assert rebalance_snapshots(data_dir, 2, owner) == 0
+    assert {name: os.stat(tmp_path / name).st_ino for name in os.listdir(tmp_path)} == before
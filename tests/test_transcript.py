@@ -0,0 +1,102 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.replay import replay, summarize, verify_entry
+from backend.transcript import (BUY, DRAW, NEXT_ROUND, PLAY, REROLL, RULES_VERSION, decode, encode_action, from_text,
+                                header, rules_version, to_text)
+
+ACTIONS = [(DRAW, [0, 4, 7]), (PLAY, [1, 2, 3, 4, 5]), (REROLL, []), (BUY, [2]), (NEXT_ROUND, []),
+           (DRAW, list(range(15)))]
+
+
+def test_actions_round_trip():
+    transcript = header() + b"".join(encode_action(opcode, args) for opcode, args in ACTIONS)
+    assert list(decode(transcript)) == ACTIONS
+    assert rules_version(transcript) == RULES_VERSION
+    assert from_text(to_text(transcript)) == transcript
+    assert list(decode(header())) == []
+
+
+@pytest.mark.parametrize("transcript", [b"", header(0), encode_action(DRAW, [0])])
+def test_transcripts_need_a_rules_version(transcript):
+    with pytest.raises(ValueError, match="no rules version"):
+        list(decode(transcript))
+
+
+def test_malformed_transcripts():
+    with pytest.raises(ValueError, match="Too many"):
+        encode_action(DRAW, range(16))
+    with pytest.raises(ValueError, match="byte 1"):
+        list(decode(header() + encode_action(PLAY, [1, 2])[:2]))  # arguments cut off
+    with pytest.raises(ValueError, match="byte 2"):
+        list(decode(header() + encode_action(REROLL) + bytes((9 << 4,))))  # unknown opcode
+
+
+# ---------------------------  replay  --------------------------- #
+@pytest.fixture
+def finished(engine, new_session, play):
+    """`finished(seed, buy_turbo)` – the highscore entry of a game played to the end"""
+    def entry(seed, buy_turbo=False):
+        session = play(new_session(seed=seed), buy_turbo=buy_turbo)
+        return engine.score_entry(session.session_id, "tester")
+    return entry
+
+
+@pytest.mark.parametrize("seed", [3, 9])
+def test_finished_games_verify(finished, seed):
+    entry = finished(seed)
+    assert rules_version(from_text(entry["transcript"])) == RULES_VERSION
+    result = verify_entry(entry)
+    assert result["verified"], result["reason"]
+    assert result["replayed"] == entry["score"]
+
+
+def test_concurrent_replays_keep_their_own_turbo_chips(finished):
+    entries = [finished(seed, buy_turbo=True) for seed in (6, 8, 11, 25, 28, 0)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        with ThreadPoolExecutor(max_workers=len(entries)) as pool:
+            results = list(pool.map(verify_entry, entries * 4))
+    finally:
+        sys.setswitchinterval(interval)
+    assert all(r["verified"] for r in results), [r["reason"] for r in results if not r["verified"]]
+
+
+def test_tampered_entries_fail(finished):
+    entry = finished(4)
+    assert "differs" in verify_entry({**entry, "score": entry["score"] + 1})["reason"]
+    transcript = from_text(entry["transcript"])
+    assert verify_entry({**entry, "transcript": to_text(transcript[:-2])})["verified"] is False
+    assert verify_entry({**entry, "seed": entry["seed"] + 1})["verified"] is False
+    assert verify_entry({**entry, "transcript": "not base64 ✗"})["verified"] is False
+    assert verify_entry({**entry, "seed": "not a seed"})["reason"].startswith("replay failed")
+
+
+def test_unreplayable_entries_are_skipped(finished):
+    entry = finished(5)
+    future = to_text(header(RULES_VERSION + 1) + from_text(entry["transcript"])[1:])
+    results = [verify_entry(entry),
+               verify_entry({**entry, "transcript": None}),
+               verify_entry({**entry, "transcript": future}),
+               verify_entry({**entry, "score": -1})]
+    assert [r["skipped"] for r in results] == [False, True, True, False]
+    summary = summarize(results)
+    assert (summary["entries"], summary["verified"], summary["skipped"]) == (4, 1, 2)
+    assert summary["failed"] == [results[3]]
+
+
+def test_rejected_actions_are_not_recorded(new_session):
+    session = new_session(seed=6)
+    recorded = session.transcript
+    with pytest.raises(ValueError):
+        session.draw_cards([99])
+    with pytest.raises(ValueError):
+        session.play_hand([])
+    assert session.transcript == recorded
+    session.draw_cards([0])
+    assert list(decode(session.transcript)) == [(DRAW, [0])]
+    replayed = replay(session.seed, session.transcript)
+    assert (replayed.hand, list(replayed.deck.cards), replayed.draws_used) == (session.hand, list(session.deck.cards), 1)